@@ -3,12 +3,42 @@
 # This file is the sole property of Biasware LLC.
 # Unauthorized use, distribution, or reverse engineering is prohibited.
 
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.routers import videos
+from indexing import registry
+from indexing.db import close_async_pools, close_pools, get_pool
+from indexing.index_manager import warm_query_cache
+from indexing.query_cache import query_log
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Start filling the connection pool so searches don't pay for the handshake
+    get_pool()
+    # Load the embedding model before serving so the first search is not slow.
+    # EMBEDDING_WARMUP=0 defers loading to the first request instead.
+    if os.getenv("EMBEDDING_WARMUP", "1") != "0":
+        await run_in_threadpool(registry.warmup)
+        # Pre-encode the most frequent logged searches (QUERY_WARMUP_TOP=0 skips)
+        top_n = int(os.getenv("QUERY_WARMUP_TOP", 50))
+        if top_n > 0:
+            await run_in_threadpool(warm_query_cache, top_n)
+    yield
+    query_log.wait(timeout=5)
+    query_log.save()
+    registry.release()
+    close_pools()
+    await close_async_pools()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add middleware for vue frontend<->backend
 app.add_middleware(
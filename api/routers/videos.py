@@ -3,10 +3,15 @@
 # This file is the sole property of Biasware LLC.
 # Unauthorized use, distribution, or reverse engineering is prohibited.
 
-from fastapi import APIRouter
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Query
 from pydantic import BaseModel
 
-from indexing.index_manager import query_videos
+from indexing.db import pool_stats
+from indexing.index_manager import query_segments, query_videos
+from indexing.query_cache import query_cache
 
 router = APIRouter(
     prefix="/videos",  # all routes start with /videos
@@ -25,6 +30,67 @@ class VideoModel(BaseModel):
 
 
 @router.get("/search")
-def search_videos(query: str, limit: int = 5) -> list[VideoModel]:
-    (summaries, paths) = query_videos(query, limit)
+def search_videos(
+    query: str,
+    limit: int = 5,
+    probes: Optional[int] = Query(
+        None, ge=1, le=1000, description="ivfflat lists to scan (recall vs latency)"
+    ),
+    ef_search: Optional[int] = Query(
+        None, ge=1, le=1000, description="hnsw candidate list size (recall vs latency)"
+    ),
+    date_from: Optional[date] = Query(None, description="Earliest session date"),
+    date_to: Optional[date] = Query(None, description="Latest session date"),
+    session_type: Optional[str] = Query(
+        None, description="Session type from the folder name, e.g. tuesday_session"
+    ),
+    source: Optional[str] = Query(None, description="Folder the video was found in"),
+    min_duration: Optional[float] = Query(None, ge=0, description="Seconds"),
+    max_duration: Optional[float] = Query(None, ge=0, description="Seconds"),
+    hybrid: bool = Query(
+        False, description="Also rank exact-term (full-text) matches and fuse both"
+    ),
+) -> list[VideoModel]:
+    filters = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "session_type": session_type,
+        "source": source,
+        "min_duration": min_duration,
+        "max_duration": max_duration,
+    }
+    (summaries, paths) = query_videos(
+        query,
+        limit,
+        probes=probes,
+        ef_search=ef_search,
+        filters=filters,
+        hybrid=hybrid,
+    )
     return [VideoModel(summary=s, path=p) for (s, p) in zip(summaries, paths)]
+
+
+class SegmentModel(BaseModel):
+    path: str
+    start: float  # seconds from the start of the video
+    end: float
+    snippet: str
+
+
+@router.get("/segments/search")
+def search_segments(query: str, limit: int = 10) -> list[SegmentModel]:
+    return [
+        SegmentModel(
+            path=hit["path"],
+            start=hit["start_ms"] / 1000,
+            end=hit["end_ms"] / 1000,
+            snippet=hit["text"],
+        )
+        for hit in query_segments(query, limit)
+    ]
+
+
+@router.get("/search/metrics")
+def search_metrics() -> dict:
+    """Query embedding cache counters and database connection pool statistics."""
+    return {"query_cache": query_cache.stats(), "db_pools": pool_stats()}
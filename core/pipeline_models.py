@@ -13,6 +13,15 @@ from typing import Optional
 NL = "\n"
 INDENT = NL + "      "
 
+REDUCE_STRATEGIES = ("single", "tree")
+# "local" is any OpenAI-compatible server (vLLM, llama.cpp, Ollama, ...)
+SUPPORTED_PROVIDERS = ("openai", "local")
+DEFAULT_REDUCE_INSTRUCTIONS = (
+    "The following are summaries of consecutive parts of one rugby training session transcript.\n"
+    "Combine them into a single concise summary of the whole session, organized into key drills,\n"
+    "strategies, and coaching points. Remove repetition and keep the session order."
+)
+
 
 def _omit_empty(d: dict) -> dict:
     return {k: v for k, v in d.items() if v not in (None, "", [], {})}
@@ -45,6 +54,64 @@ class PromptModel:
         )
 
 
+# ------------------------
+# LLM Provider
+# ------------------------
+_PROVIDER_DEFAULTS: dict[str, dict] = {
+    "openai": {"base_url": "", "api_key_env": "OPENAI_API_KEY", "timeout": 120.0},
+    "local": {
+        "base_url": "http://localhost:8000/v1",
+        "api_key_env": "",
+        "timeout": 600.0,
+    },
+}
+
+
+class ProviderConfig:
+    """
+    Connection settings for the LLM provider selected by ``ai_provider``.
+    An empty base_url uses the SDK default (which honours OPENAI_BASE_URL).
+    Initialized from a configuration dictionary; defaults depend on the provider.
+    """
+
+    def __init__(self, name: str, provider_config: Optional[dict] = None):
+        provider_config = provider_config or {}
+        defaults = _PROVIDER_DEFAULTS.get(name, _PROVIDER_DEFAULTS["openai"])
+        self.name: str = name
+        self.base_url: str = provider_config.get("base_url", defaults["base_url"])
+        # Environment variable holding the API key (empty: no key needed)
+        self.api_key_env: str = provider_config.get(
+            "api_key_env", defaults["api_key_env"]
+        )
+        self.timeout: float = provider_config.get("timeout", defaults["timeout"])
+        # Size of the pooled HTTP connection pool shared by all worker threads
+        self.max_connections: int = provider_config.get("max_connections", 20)
+        # Requests in flight against this provider (0: limited only by batch_size)
+        self.max_concurrency: int = provider_config.get("max_concurrency", 0)
+        # Stream completions to measure time to first token; disable for
+        # servers that reject stream_options
+        self.stream: bool = provider_config.get("stream", True)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.base_url or '(default endpoint)'} "
+            f"(timeout {self.timeout}s, {self.max_connections} connections, "
+            f"concurrency {self.max_concurrency or 'unbounded'})"
+        )
+
+    def to_dict(self) -> dict:
+        return _omit_empty(
+            {
+                "base_url": self.base_url,
+                "api_key_env": self.api_key_env,
+                "timeout": self.timeout,
+                "max_connections": self.max_connections,
+                "max_concurrency": self.max_concurrency,
+                "stream": self.stream,
+            }
+        )
+
+
 # ------------------------
 # Video Processing Models
 # ------------------------
@@ -194,17 +261,74 @@ class IndexingConfig:
         indexing_config = indexing_config or {}
         self.ai_provider: str = indexing_config.get("ai_provider", "openai")
         self.model: str = indexing_config.get("model", "gpt-4o-mini")
+        self.provider: ProviderConfig = ProviderConfig(
+            self.ai_provider, indexing_config.get("provider", {})
+        )
+        # Number of summarization requests kept in flight concurrently
         self.batch_size: int = indexing_config.get("batch_size", 10)
+        self.requests_per_minute: int = indexing_config.get("requests_per_minute", 500)
+        self.tokens_per_minute: int = indexing_config.get("tokens_per_minute", 200000)
+        self.max_retries: int = indexing_config.get("max_retries", 5)
+        # "online" (concurrent requests) or "batch" (OpenAI Batch API backfills)
+        self.mode: str = indexing_config.get("mode", "online")
+        self.batch_dir: str = indexing_config.get("batch_dir", "./data/derived/batches")
+        self.batch_poll_interval: int = indexing_config.get("batch_poll_interval", 60)
+        # Long transcripts are split into chunks of this many tokens, summarized
+        # in parallel (map) and combined (reduce).
+        self.chunk_tokens: int = indexing_config.get("chunk_tokens", 6000)
+        self.reduce_strategy: str = indexing_config.get("reduce_strategy", "tree")
+        if self.reduce_strategy not in REDUCE_STRATEGIES:
+            raise ValueError(
+                f"Unsupported reduce_strategy: {self.reduce_strategy}. Expected one of {REDUCE_STRATEGIES}."
+            )
+        self.reduce_instructions: str = indexing_config.get(
+            "reduce_instructions", DEFAULT_REDUCE_INSTRUCTIONS
+        ).strip()
+        # Drop fillers, repeated/hallucinated lines and near-duplicates before prompting
+        self.compact_transcript: bool = indexing_config.get("compact_transcript", True)
+        # Reuse the summary of an earlier transcript in the same run when their
+        # MinHash-estimated Jaccard similarity reaches this value (0 disables).
+        self.dedup_threshold: float = indexing_config.get("dedup_threshold", 0.9)
+        # Summaries (and segment windows) embedded per forward pass
+        self.embed_batch_size: int = indexing_config.get("embed_batch_size", 64)
+        # Completed summaries are stored as soon as this many are pending, so an
+        # interrupted run loses at most this many paid LLM calls
+        self.write_batch_size: int = indexing_config.get("write_batch_size", 4)
+        # Transcripts are also indexed as windows of this many sentences in
+        # video_segments for moment-level search (0 disables).
+        self.segment_window: int = indexing_config.get("segment_window", 5)
+        # Sentences shared by consecutive windows
+        self.segment_overlap: int = indexing_config.get("segment_overlap", 1)
+        # Per-call LLM metrics are written here as JSON after each run ("" disables)
+        self.metrics_dir: str = indexing_config.get(
+            "metrics_dir", "./data/derived/metrics"
+        )
+        # USD per 1M tokens, {model: [input, cached_input, output]}; overrides built-ins
+        self.prices: dict = indexing_config.get("prices", {})
         self.prompt_model: PromptModel = PromptModel(
             indexing_config.get("prompt_model", {})
         )
 
     def __str__(self) -> str:
         res = (
-            f"  AI Provider   : {self.ai_provider}\n"
+            f"  AI Provider   : {self.ai_provider} @ {self.provider}\n"
             f"  Model         : {self.model}\n"
-            f"  Batch Size    : {self.batch_size}"
+            f"  Batch Size    : {self.batch_size}\n"
+            f"  Rate Limits   : {self.requests_per_minute} req/min, {self.tokens_per_minute} tok/min\n"
+            f"  Max Retries   : {self.max_retries}\n"
+            f"  Mode          : {self.mode}\n"
+            f"  Chunking      : {self.chunk_tokens} tokens/chunk, {self.reduce_strategy} reduce\n"
+            f"  Compaction    : {self.compact_transcript}\n"
+            f"  Dedup         : {self.dedup_threshold or 'off'}\n"
+            f"  Segments      : "
+            + (
+                f"{self.segment_window} sentences/window, {self.segment_overlap} overlap"
+                if self.segment_window
+                else "off"
+            )
         )
+        if self.mode == "batch":
+            res += f"\n  Batch Dir     : {self.batch_dir} (poll {self.batch_poll_interval}s)"
         pm = self.prompt_model
         if pm.system or pm.user or pm.instructions or pm.examples:
             res += "\n  Prompt Model:"
@@ -228,7 +352,27 @@ class IndexingConfig:
             {
                 "ai_provider": self.ai_provider,
                 "model": self.model,
+                "provider": self.provider.to_dict(),
                 "batch_size": self.batch_size,
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "max_retries": self.max_retries,
+                "mode": self.mode,
+                "batch_dir": self.batch_dir,
+                "batch_poll_interval": self.batch_poll_interval,
+                "chunk_tokens": self.chunk_tokens,
+                "reduce_strategy": self.reduce_strategy,
+                "reduce_instructions": self.reduce_instructions
+                if self.reduce_instructions != DEFAULT_REDUCE_INSTRUCTIONS
+                else "",
+                "compact_transcript": self.compact_transcript,
+                "dedup_threshold": self.dedup_threshold,
+                "embed_batch_size": self.embed_batch_size,
+                "write_batch_size": self.write_batch_size,
+                "segment_window": self.segment_window,
+                "segment_overlap": self.segment_overlap,
+                "metrics_dir": self.metrics_dir,
+                "prices": self.prices,
                 "prompt_model": self.prompt_model.to_dict(),
             }
         )
@@ -237,6 +381,52 @@ class IndexingConfig:
 # ------------------------
 # Transcription Model Configuration
 # ------------------------
+class RefinementConfig:
+    """
+    Configuration for the optional second transcription tier.
+    Low-confidence regions of the primary (fast) transcript are re-run with a larger model.
+    Initialized from a configuration dictionary; disabled unless model_size is set.
+    """
+
+    def __init__(self, refinement_config: Optional[dict] = None):
+        refinement_config = refinement_config or {}
+        self.model_size: str = refinement_config.get("model_size", "")
+        self.min_avg_logprob: float = refinement_config.get("min_avg_logprob", -1.0)
+        self.max_no_speech_prob: float = refinement_config.get(
+            "max_no_speech_prob", 0.6
+        )
+        self.max_compression_ratio: float = refinement_config.get(
+            "max_compression_ratio", 2.4
+        )
+        self.padding_ms: int = refinement_config.get("padding_ms", 250)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.model_size)
+
+    def __str__(self) -> str:
+        if not self.enabled:
+            return "(disabled)"
+        return (
+            f"{self.model_size} (logprob < {self.min_avg_logprob}, "
+            f"no_speech > {self.max_no_speech_prob}, "
+            f"compression > {self.max_compression_ratio})"
+        )
+
+    def to_dict(self) -> dict:
+        if not self.enabled:
+            return {}
+        return _omit_empty(
+            {
+                "model_size": self.model_size,
+                "min_avg_logprob": self.min_avg_logprob,
+                "max_no_speech_prob": self.max_no_speech_prob,
+                "max_compression_ratio": self.max_compression_ratio,
+                "padding_ms": self.padding_ms,
+            }
+        )
+
+
 class TranscriptionConfig:
     """
     Configuration for the transcription process, including model size and language settings.
@@ -254,6 +444,9 @@ class TranscriptionConfig:
                     - language (str): The language code for transcription (default: "en").
                     - output_dir (str): The directory where transcripts will be saved (default: "./transcripts").
                     - preserve_tree (bool): Whether to preserve the folder structure under output_dir (default: True).
+                    - batch_size (int): Clips transcribed per Whisper session, sharing one model load (default: 1).
+                    - parallel_workers (int): Whisper sessions run concurrently (default: 1).
+                    - refinement (dict): Optional second tier; see RefinementConfig (default: disabled).
         """
         transcription_config = transcription_config or {}
         self.model_size: str = transcription_config.get("model_size", "base")
@@ -261,6 +454,11 @@ class TranscriptionConfig:
         self.output_dir: str = transcription_config.get("output_dir", "./transcripts")
         self.preserve_tree: bool = transcription_config.get("preserve_tree", True)
         self.device: str = transcription_config.get("device", "cuda")
+        self.batch_size: int = transcription_config.get("batch_size", 1)
+        self.parallel_workers: int = transcription_config.get("parallel_workers", 1)
+        self.refinement: RefinementConfig = RefinementConfig(
+            transcription_config.get("refinement", {})
+        )
 
     def __str__(self) -> str:
         return (
@@ -268,7 +466,10 @@ class TranscriptionConfig:
             f"  Device     : {self.device}\n"
             f"  Language   : {self.language}\n"
             f"  Output Dir : {self.output_dir}\n"
-            f"  Preserve   : {self.preserve_tree}"
+            f"  Preserve   : {self.preserve_tree}\n"
+            f"  Batch Size : {self.batch_size}\n"
+            f"  Workers    : {self.parallel_workers}\n"
+            f"  Refinement : {self.refinement}"
         )
 
     def to_dict(self) -> dict:
@@ -279,6 +480,9 @@ class TranscriptionConfig:
                 "language": self.language,
                 "output_dir": self.output_dir,
                 "preserve_tree": self.preserve_tree,
+                "batch_size": self.batch_size,
+                "parallel_workers": self.parallel_workers,
+                "refinement": self.refinement.to_dict(),
             }
         )
 
@@ -3,6 +3,7 @@
 # This file is the sole property of Biasware LLC.
 # Unauthorized use, distribution, or reverse engineering is prohibited.
 
+import json
 import logging
 import os
 import subprocess
@@ -11,11 +12,26 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Callable, Optional, TypeVar
 
 from core.pipeline_models import VideoProcessingConfig
+from indexing.batch_summarizer import BatchSummarizer
+from indexing.dedup import group_near_duplicates
 from indexing.index_manager import (
+    store_segments,
+    store_summaries,
     summarize_srt_file,
-    vectorize_and_store_summary,
     video_file_indexed,
 )
+from indexing.llm_metrics import llm_metrics
+from indexing.moments import transcript_windows
+from indexing.rate_limit import RateLimiter
+from indexing.segments import (
+    low_confidence_regions,
+    merge_tiers,
+    segments_from_whisper,
+    segments_path_for,
+    write_segments,
+    write_srt,
+)
+from indexing.srt_parser import load_srt_text
 from ingest.video_finder import find_video_files
 
 # Use module-level logger; logging configured in CLI
@@ -107,6 +123,69 @@ def convert_mp4_to_wav(video_file: str, output_dir: Optional[str] = None) -> str
     return audio_file
 
 
+def extract_audio_slice(
+    audio_file: str, start_ms: int, end_ms: int, output_file: str
+) -> str:
+    """Cut [start_ms, end_ms) out of a WAV file using FFmpeg.
+    Args:
+        audio_file (str): Source WAV file.
+        start_ms (int): Slice start in milliseconds.
+        end_ms (int): Slice end in milliseconds.
+        output_file (str): Destination WAV file.
+    Returns:
+        str: Path to the written slice.
+    """
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-ss",
+            f"{start_ms / 1000:.3f}",
+            "-to",
+            f"{end_ms / 1000:.3f}",
+            "-i",
+            audio_file,
+            "-ar",
+            "16000",
+            "-ac",
+            "1",
+            output_file,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return output_file
+
+
+def read_whisper_json(audio_file: str, output_dir: str) -> Optional[dict]:
+    """Load (and remove) the JSON result Whisper wrote for ``audio_file``.
+
+    Returns:
+        Optional[dict]: The parsed result, or None if Whisper produced no output.
+    """
+    whisper_json = (
+        os.path.join(output_dir, os.path.splitext(os.path.basename(audio_file))[0])
+        + ".json"
+    )
+    if not os.path.exists(whisper_json):
+        return None
+    with open(whisper_json, encoding="utf-8") as f:
+        result = json.load(f)
+    os.remove(whisper_json)
+    return result
+
+
+def write_transcript_outputs(segments: list[dict], srt_file: str) -> None:
+    """Write transcript segments as an SRT file plus a segments sidecar.
+
+    Args:
+        segments (list[dict]): Segments as produced by ``segments_from_whisper``.
+        srt_file (str): Destination SRT path; the sidecar is written next to it.
+    """
+    write_srt(segments, srt_file)
+    write_segments(segments, segments_path_for(srt_file))
+
+
 class PipelineRunner:
     def __init__(self, config: VideoProcessingConfig) -> None:
         self.config = config
@@ -257,98 +336,271 @@ class PipelineRunner:
         return results
 
     def transcribe_to_srt(self, video_files: list[str]) -> list[str]:
-        """Transcribe video files to SRT format using Whisper model."""
+        """Transcribe video files to SRT format using Whisper model.
+
+        Clips are grouped into sessions of ``transcription_config.batch_size`` files
+        that share a single Whisper invocation (and therefore a single model load);
+        sessions run on up to ``transcription_config.parallel_workers`` workers.
+        """
         transcription_config = self.config.transcription_config
         logger.info(
             f"Transcribing videos to SRT using Whisper model (Size: {transcription_config.model_size}, Language: {transcription_config.language})..."
         )
-
-        # TODO: Need to parallelize, probably should parallelize once in convert videos
-        #       then downstream just inherits?
-        transcribed_files: list[str] = []
-
-        def find_source_base(path: str) -> Optional[str]:
-            for src in self.config.video_sources.sources:
-                if path.startswith(src.path):
-                    return src.path
-            return None
-
+        batch_size = max(1, int(transcription_config.batch_size or 1))
+        workers = max(1, int(transcription_config.parallel_workers or 1))
+        logger.info(f"   Clips per session: {batch_size} (workers: {workers})")
+
+        transcribed: dict[str, str] = {}
+        # Pending clips grouped by output directory: whisper writes every file of
+        # a session into one --output_dir.
+        pending: dict[str, list[tuple[str, str]]] = {}
         for video_file in video_files:
-            # Determine output path
-            if transcription_config.output_dir:
-                base = (
-                    find_source_base(video_file)
-                    if transcription_config.preserve_tree
-                    else None
-                )
-                if base:
-                    rel = os.path.relpath(video_file, base)
-                else:
-                    rel = os.path.basename(video_file)
-                rel_no_ext = os.path.splitext(rel)[0]
-                srt_out_dir = os.path.join(
-                    transcription_config.output_dir, os.path.dirname(rel_no_ext)
-                )
-                srt_file = os.path.join(
-                    transcription_config.output_dir, rel_no_ext + ".srt"
-                )
-            else:
-                # Fallback: next to the video
-                srt_out_dir = os.path.dirname(video_file)
-                srt_file = video_file.rsplit(".", 1)[0] + ".srt"
-
+            srt_out_dir, srt_file = self._transcript_paths(video_file)
             os.makedirs(srt_out_dir, exist_ok=True)
 
             # Skip if transcript already exists (idempotent / resume support)
             if os.path.exists(srt_file):
                 logger.info(f"Skipping transcription (already exists): {srt_file}")
-                transcribed_files.append(srt_file)
+                transcribed[video_file] = srt_file
                 continue
+            pending.setdefault(srt_out_dir, []).append((video_file, srt_file))
 
-            audio_file: Optional[str] = None
-            try:
-                audio_file = convert_mp4_to_wav(video_file, output_dir=srt_out_dir)
-
-                whisper_cmd = [
-                    "whisper",
-                    "--model",
-                    transcription_config.model_size,
-                    "--device",
-                    transcription_config.device,
-                    "--language",
-                    transcription_config.language,
-                    "--output_format",
-                    "srt",
-                    "--output_dir",
-                    srt_out_dir,
-                    audio_file,
+        batches = [
+            (out_dir, jobs[i : i + batch_size])
+            for out_dir, jobs in pending.items()
+            for i in range(0, len(jobs), batch_size)
+        ]
+        if workers == 1 or len(batches) <= 1:
+            for out_dir, jobs in batches:
+                transcribed.update(self._transcribe_batch(out_dir, jobs))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._transcribe_batch, out_dir, jobs)
+                    for out_dir, jobs in batches
                 ]
+                for fut in as_completed(futures):
+                    transcribed.update(fut.result())
+
+        return [transcribed[vf] for vf in video_files if vf in transcribed]
+
+    def _transcript_paths(self, video_file: str) -> tuple[str, str]:
+        """Return (output directory, SRT path) for a video file."""
+        transcription_config = self.config.transcription_config
+        if transcription_config.output_dir:
+            base = (
+                self._find_source_base(video_file)
+                if transcription_config.preserve_tree
+                else None
+            )
+            if base:
+                rel = os.path.relpath(video_file, base)
+            else:
+                rel = os.path.basename(video_file)
+            rel_no_ext = os.path.splitext(rel)[0]
+            srt_out_dir = os.path.join(
+                transcription_config.output_dir, os.path.dirname(rel_no_ext)
+            )
+            srt_file = os.path.join(
+                transcription_config.output_dir, rel_no_ext + ".srt"
+            )
+        else:
+            # Fallback: next to the video
+            srt_out_dir = os.path.dirname(video_file)
+            srt_file = video_file.rsplit(".", 1)[0] + ".srt"
+        return srt_out_dir, srt_file
+
+    def _find_source_base(self, path: str) -> Optional[str]:
+        for src in self.config.video_sources.sources:
+            if path.startswith(src.path):
+                return src.path
+        return None
+
+    def _transcribe_batch(
+        self, srt_out_dir: str, jobs: list[tuple[str, str]]
+    ) -> dict[str, str]:
+        """Transcribe a group of clips in one Whisper session.
+
+        Args:
+            srt_out_dir (str): Directory shared by every clip in the batch.
+            jobs (list[tuple[str, str]]): (video file, target SRT path) pairs.
 
-                logger.debug(f"Running Whisper command: {' '.join(whisper_cmd)}")
+        Returns:
+            dict[str, str]: Mapping of video file -> SRT path for clips that succeeded.
+        """
+        transcription_config = self.config.transcription_config
+        done: dict[str, str] = {}
+        audio_files: dict[str, str] = {}
+        try:
+            for video_file, _ in jobs:
+                try:
+                    audio_files[video_file] = convert_mp4_to_wav(
+                        video_file, output_dir=srt_out_dir
+                    )
+                except FileNotFoundError as e:
+                    logger.error(
+                        f"Required binary not found while transcribing {video_file}: {e}"
+                    )
+                except subprocess.CalledProcessError as e:
+                    stderr_msg = (
+                        e.stderr.decode(errors="ignore") if e.stderr else str(e)
+                    )
+                    logger.error(
+                        f"Audio extraction failed for {video_file}: {stderr_msg}"
+                    )
+            if not audio_files:
+                return done
+
+            whisper_cmd = self._whisper_cmd(
+                transcription_config.model_size, srt_out_dir, list(audio_files.values())
+            )
+
+            logger.debug(f"Running Whisper command: {' '.join(whisper_cmd)}")
+            try:
                 subprocess.run(
                     whisper_cmd,
                     check=True,
                     capture_output=True,
                 )
-                logger.debug(f"Generated SRT file: {srt_file}")
-                transcribed_files.append(srt_file)
             except FileNotFoundError as e:
                 logger.error(
-                    f"Required binary not found while transcribing {video_file}: {e}"
+                    f"Required binary not found while transcribing {len(audio_files)} clip(s): {e}"
                 )
+                return done
             except subprocess.CalledProcessError as e:
                 # Log stderr if available
                 stderr_msg = e.stderr.decode(errors="ignore") if e.stderr else str(e)
-                logger.error(f"Transcription failed for {video_file}: {stderr_msg}")
-            finally:
-                if audio_file and os.path.exists(audio_file):
+                logger.error(
+                    f"Transcription failed for {', '.join(audio_files)}: {stderr_msg}"
+                )
+                return done
+
+            # Whisper skips (and reports) individual files it cannot decode, so
+            # collect outputs per clip rather than trusting the exit status alone.
+            results: dict[str, dict] = {}
+            for video_file, _ in jobs:
+                audio_file = audio_files.get(video_file)
+                if audio_file is None:
+                    continue
+                result = read_whisper_json(audio_file, srt_out_dir)
+                if result is None:
+                    logger.error(f"Whisper produced no output for {video_file}")
+                    continue
+                results[video_file] = result
+
+            segments = self._refine_low_confidence(srt_out_dir, results, audio_files)
+            for video_file, srt_file in jobs:
+                if video_file not in segments:
+                    continue
+                write_transcript_outputs(segments[video_file], srt_file)
+                logger.debug(f"Generated SRT file: {srt_file}")
+                done[video_file] = srt_file
+            return done
+        finally:
+            for audio_file in audio_files.values():
+                if os.path.exists(audio_file):
                     try:
                         os.remove(audio_file)
                     except OSError:
                         # TODO: Best-effort cleanup
                         pass
 
-        return transcribed_files
+    def _whisper_cmd(
+        self, model_size: str, output_dir: str, audio_files: list[str]
+    ) -> list[str]:
+        transcription_config = self.config.transcription_config
+        return [
+            "whisper",
+            "--model",
+            model_size,
+            "--device",
+            transcription_config.device,
+            "--language",
+            transcription_config.language,
+            "--output_format",
+            "json",
+            "--output_dir",
+            output_dir,
+            *audio_files,
+        ]
+
+    def _refine_low_confidence(
+        self,
+        srt_out_dir: str,
+        results: dict[str, dict],
+        audio_files: dict[str, str],
+    ) -> dict[str, list[dict]]:
+        """Second transcription tier: re-run weak regions with a larger model.
+
+        Regions flagged by ``low_confidence_regions`` are cut out of each clip's
+        audio and transcribed in a single Whisper session with
+        ``refinement.model_size``; the results replace the tier-1 segments.
+
+        Args:
+            srt_out_dir (str): Working directory for slices and Whisper output.
+            results (dict[str, dict]): Tier-1 Whisper results keyed by video file.
+            audio_files (dict[str, str]): Extracted WAV per video file.
+
+        Returns:
+            dict[str, list[dict]]: Final segments keyed by video file.
+        """
+        refinement = self.config.transcription_config.refinement
+        segments = {vf: segments_from_whisper(r) for vf, r in results.items()}
+        if not refinement.enabled:
+            return segments
+
+        slices: list[tuple[str, tuple[int, int], str]] = []
+        try:
+            for video_file, result in results.items():
+                regions = low_confidence_regions(
+                    result,
+                    refinement.min_avg_logprob,
+                    refinement.max_no_speech_prob,
+                    refinement.max_compression_ratio,
+                    refinement.padding_ms,
+                )
+                stem = os.path.splitext(audio_files[video_file])[0]
+                for i, region in enumerate(regions):
+                    slice_file = extract_audio_slice(
+                        audio_files[video_file], *region, f"{stem}.refine{i}.wav"
+                    )
+                    slices.append((video_file, region, slice_file))
+            if not slices:
+                return segments
+
+            logger.info(
+                f"Re-transcribing {len(slices)} low-confidence region(s) with Whisper {refinement.model_size}"
+            )
+            subprocess.run(
+                self._whisper_cmd(
+                    refinement.model_size, srt_out_dir, [sf for _, _, sf in slices]
+                ),
+                check=True,
+                capture_output=True,
+            )
+            for video_file, region, slice_file in slices:
+                result = read_whisper_json(slice_file, srt_out_dir)
+                if result is None:
+                    continue
+                segments[video_file] = merge_tiers(
+                    segments[video_file],
+                    region,
+                    segments_from_whisper(result, tier=2, offset_ms=region[0]),
+                )
+        except (FileNotFoundError, subprocess.CalledProcessError) as e:
+            logger.warning(f"Refinement pass failed; keeping tier-1 segments: {e}")
+        finally:
+            for _, _, slice_file in slices:
+                for leftover in (
+                    slice_file,
+                    os.path.splitext(slice_file)[0] + ".json",
+                ):
+                    if os.path.exists(leftover):
+                        try:
+                            os.remove(leftover)
+                        except OSError:
+                            pass
+        return segments
 
     def build_index(self, video_files: list[str], transcribed_files: list[str]) -> None:
         """
@@ -359,6 +611,11 @@ class PipelineRunner:
         corresponding video file. The resulting index enables efficient semantic search and retrieval
         of video content based on the generated summaries.
 
+        Up to ``indexing_config.batch_size`` LLM requests (map-reduce chunk calls included)
+        are in flight at once under a shared requests/tokens-per-minute limiter; completed summaries are embedded and
+        stored in batches of ``indexing_config.embed_batch_size``.
+        With ``indexing_config.mode == "batch"`` the resumable OpenAI Batch API path is used instead.
+
         Note: It is required that the indices of the video_files and transcribed_files lists match.
 
         Args:
@@ -373,16 +630,163 @@ class PipelineRunner:
             raise ValueError("Mismatched video and transcription file counts.")
 
         ai_config = self.config.indexing_config
+        workers = max(1, int(ai_config.batch_size or 1))
 
         logger.info(
             f"Building index with {ai_config.ai_provider} ({ai_config.model})..."
         )
-        logger.info(f"   Batch size: {ai_config.batch_size}")
+        llm_metrics.reset()
+        if ai_config.mode == "batch":
+            logger.info(f"   Mode: batch (state in {ai_config.batch_dir})")
+            try:
+                BatchSummarizer(ai_config).run(video_files, transcribed_files)
+            finally:
+                self._report_llm_metrics()
+            self.index_segments(video_files, transcribed_files)
+            return
+
+        logger.info(f"   Concurrent requests: {workers}")
+        logger.info(
+            f"   Rate limits: {ai_config.requests_per_minute} req/min, {ai_config.tokens_per_minute} tok/min"
+        )
+
+        limiter = RateLimiter(
+            requests_per_minute=ai_config.requests_per_minute,
+            tokens_per_minute=ai_config.tokens_per_minute,
+            max_concurrency=workers,
+        )
+        representatives = self._near_duplicate_groups(transcribed_files)
+        duplicates: dict[int, list[int]] = {}
+        for i, rep in enumerate(representatives):
+            if rep != i:
+                duplicates.setdefault(rep, []).append(i)
+
+        failed = reused = 0
+        # Completed summaries are embedded and written a few at a time
+        pending: list[tuple[str, str]] = []
+        transcript_files = dict(zip(video_files, transcribed_files))
+
+        def flush() -> None:
+            if not pending:
+                return
+            records = pending[:]
+            pending.clear()
+            store_summaries(
+                records,
+                batch_size=ai_config.embed_batch_size,
+                summary_model=ai_config.model,
+                transcript_files=transcript_files,
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                future_map = {
+                    executor.submit(summarize_srt_file, ai_config, srt_file, limiter): i
+                    for i, srt_file in enumerate(transcribed_files)
+                    if representatives[i] == i
+                }
+                for fut in as_completed(future_map):
+                    i = future_map[fut]
+                    copies = duplicates.get(i, [])
+                    try:
+                        summary = fut.result()
+                    except Exception as e:  # noqa: BLE001
+                        failed += 1 + len(copies)
+                        logger.error(
+                            f"Summarization failed for {transcribed_files[i]}: {e}"
+                        )
+                        continue
+                    pending.append((summary, video_files[i]))
+                    for j in copies:
+                        logger.debug(
+                            f"Reusing summary of {transcribed_files[i]} for near-duplicate {transcribed_files[j]}"
+                        )
+                        pending.append((summary, video_files[j]))
+                        reused += 1
+                    if len(pending) >= max(1, ai_config.write_batch_size):
+                        flush()
+        finally:
+            # Store what completed even if the run is interrupted
+            flush()
+
+        if reused:
+            logger.info(
+                f"Reused summaries for {reused} near-duplicate transcripts ({reused} LLM calls saved)"
+            )
+        if failed:
+            logger.warning(f"{failed}/{len(transcribed_files)} summaries failed")
+        self._report_llm_metrics()
+        self.index_segments(video_files, transcribed_files)
+
+    def index_segments(
+        self, video_files: list[str], transcribed_files: list[str]
+    ) -> int:
+        """
+        Index timestamped transcript windows of each video in ``video_segments``.
+
+        Windows of ``indexing_config.segment_window`` sentences are embedded and
+        written together for as many whole videos as fit in one
+        ``embed_batch_size`` batch, replacing any windows stored for them before.
 
-        # TODO: Implement actual index building
-        for i, srt_file in enumerate(transcribed_files):
-            summary = summarize_srt_file(ai_config, srt_file)
-            vectorize_and_store_summary(summary, video_files[i])
+        Returns:
+            int: Number of segment rows written.
+        """
+        ai_config = self.config.indexing_config
+        if ai_config.segment_window <= 0:
+            return 0
+        stored = 0
+        pending: dict[str, list[dict]] = {}
+        pending_count = 0
+        for video_file, srt_file in zip(video_files, transcribed_files):
+            try:
+                windows = transcript_windows(
+                    srt_file, ai_config.segment_window, ai_config.segment_overlap
+                )
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not read segments from {srt_file}: {e}")
+                continue
+            if not windows:
+                continue
+            pending[video_file] = windows
+            pending_count += len(windows)
+            if pending_count >= ai_config.embed_batch_size:
+                stored += store_segments(pending, batch_size=ai_config.embed_batch_size)
+                pending, pending_count = {}, 0
+        if pending:
+            stored += store_segments(pending, batch_size=ai_config.embed_batch_size)
+        if stored:
+            logger.info(f"Indexed {stored} transcript segments")
+        return stored
+
+    def _report_llm_metrics(self) -> None:
+        """Log the end-of-run LLM report and write the per-call metrics file."""
+        if not llm_metrics.calls:
+            return
+        logger.info(llm_metrics.report())
+        metrics_dir = self.config.indexing_config.metrics_dir
+        if metrics_dir:
+            try:
+                path = llm_metrics.write(metrics_dir)
+                logger.info(f"LLM metrics written to {path}")
+            except OSError as e:
+                logger.warning(f"Could not write LLM metrics to {metrics_dir}: {e}")
+
+    def _near_duplicate_groups(self, transcribed_files: list[str]) -> list[int]:
+        """
+        Map each transcript to the index of the transcript whose summary it can reuse.
+
+        Unreadable transcripts are left to ``summarize_srt_file`` to report.
+        """
+        threshold = self.config.indexing_config.dedup_threshold
+        if not threshold or len(transcribed_files) < 2:
+            return list(range(len(transcribed_files)))
+        texts: list[Optional[str]] = []
+        for srt_file in transcribed_files:
+            try:
+                texts.append(load_srt_text(srt_file))
+            except (OSError, ValueError):
+                texts.append(None)
+        return group_near_duplicates(texts, threshold=threshold)
 
 
 def run_pipeline(config: Any, inputs: Any) -> Any:
@@ -0,0 +1,292 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""
+batch_summarizer.py
+-------------------
+Summarize many transcripts through the OpenAI Batch API for bulk backfills.
+
+All summary requests are written to a JSONL file, uploaded and submitted as a
+single batch; once the batch completes the results are embedded and stored in batches via
+``store_summaries``. Progress is checkpointed to a JSON state file
+after every step, so re-running with the same inputs resumes where the previous
+process stopped (no duplicate submission, no duplicate stores).
+
+The client defaults to the shared "openai" provider client, whose base URL
+(``indexing.provider.base_url`` or ``OPENAI_BASE_URL``) can point at a local
+stand-in server.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Optional
+
+from core.pipeline_models import IndexingConfig
+from indexing.index_manager import (
+    build_summary_request,
+    load_transcript_texts,
+    store_summaries,
+)
+from indexing.llm_metrics import llm_metrics
+from indexing.providers import get_provider
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+# OpenAI Batch API limit on requests per input file
+MAX_BATCH_REQUESTS = 50_000
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchSummarizer:
+    """
+    Resumable Batch API driver for the indexing stage.
+    """
+
+    def __init__(
+        self,
+        configuration: IndexingConfig,
+        client: Optional[Any] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if configuration.ai_provider != "openai":
+            raise ValueError(
+                f"Batch mode requires the 'openai' provider, got: {configuration.ai_provider}"
+            )
+        self.configuration = configuration
+        self._client = client
+        self._sleep = sleep
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = get_provider(self.configuration).client
+        return self._client
+
+    def state_path(self, video_files: list[str], transcribed_files: list[str]) -> str:
+        """Deterministic state file for a given set of inputs and model."""
+        digest = hashlib.sha1(
+            json.dumps(
+                [self.configuration.model, sorted(zip(video_files, transcribed_files))]
+            ).encode("utf-8")
+        ).hexdigest()[:16]
+        return os.path.join(self.configuration.batch_dir, f"batch_{digest}.json")
+
+    def run(self, video_files: list[str], transcribed_files: list[str]) -> int:
+        """
+        Submit (or resume) a batch for the given files and store its results.
+
+        Args:
+            video_files (list[str]): Video paths, index-aligned with transcribed_files.
+            transcribed_files (list[str]): Transcript paths to summarize.
+
+        Returns:
+            int: Number of summaries stored by this call.
+
+        Raises:
+            ValueError: If too many requests for one batch or inputs are mismatched.
+            RuntimeError: If the batch ends in a non-completed terminal status,
+                or some summaries could not be stored (rerun to store them).
+        """
+        if len(video_files) != len(transcribed_files):
+            raise ValueError("Mismatched video and transcription file counts.")
+        if len(video_files) > MAX_BATCH_REQUESTS:
+            raise ValueError(
+                f"Batch mode supports at most {MAX_BATCH_REQUESTS} requests per run"
+            )
+
+        os.makedirs(self.configuration.batch_dir, exist_ok=True)
+        state_file = self.state_path(video_files, transcribed_files)
+        state = self._load_state(state_file)
+        if state.get("status") == "done":
+            logger.info(f"Batch already processed (state: {state_file})")
+            return 0
+
+        if not state.get("batch_id"):
+            self._submit(state, state_file, video_files, transcribed_files)
+        else:
+            logger.info(f"Resuming batch {state['batch_id']} (state: {state_file})")
+
+        batch = self._wait(state["batch_id"])
+        if batch.status != "completed":
+            raise RuntimeError(
+                f"Batch {state['batch_id']} ended with status {batch.status}"
+            )
+
+        stored, unstored = self._store_results(
+            state, state_file, batch, dict(zip(video_files, transcribed_files))
+        )
+        if unstored:
+            # Leave the state resumable: a rerun fetches the results again
+            # and stores only what is missing, without a new (paid) batch
+            raise RuntimeError(
+                f"{unstored} summaries of batch {batch.id} could not be stored; "
+                f"rerun to retry (state: {state_file})"
+            )
+        state["status"] = "done"
+        self._save_state(state, state_file)
+        return stored
+
+    # ------------------------------------------------------------------
+    # Steps
+    # ------------------------------------------------------------------
+    def _submit(
+        self,
+        state: dict,
+        state_file: str,
+        video_files: list[str],
+        transcribed_files: list[str],
+    ) -> None:
+        input_path = os.path.splitext(state_file)[0] + ".input.jsonl"
+        videos: dict[str, str] = {}
+        with open(input_path, "w", encoding="utf-8") as f:
+            for i, (video_file, srt_file) in enumerate(
+                zip(video_files, transcribed_files)
+            ):
+                custom_id = f"req-{i}"
+                videos[custom_id] = video_file
+                transcript = " ".join(
+                    load_transcript_texts(self.configuration, srt_file)
+                )
+                request = build_summary_request(self.configuration, transcript)
+                line = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": request,
+                }
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        state.update({"videos": videos, "stored": []})
+
+        if not state.get("input_file_id"):
+            with open(input_path, "rb") as f:
+                uploaded = self.client.files.create(file=f, purpose="batch")
+            state["input_file_id"] = uploaded.id
+            self._save_state(state, state_file)
+            logger.info(f"Uploaded batch input ({len(videos)} requests): {uploaded.id}")
+
+        batch = self.client.batches.create(
+            input_file_id=state["input_file_id"],
+            endpoint=BATCH_ENDPOINT,
+            completion_window=COMPLETION_WINDOW,
+        )
+        state["batch_id"] = batch.id
+        self._save_state(state, state_file)
+        logger.info(f"Submitted batch {batch.id}")
+
+    def _wait(self, batch_id: str) -> Any:
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            counts = getattr(batch, "request_counts", None)
+            if counts is not None:
+                logger.info(
+                    f"Batch {batch_id}: {batch.status} "
+                    f"({counts.completed}/{counts.total} done, {counts.failed} failed)"
+                )
+            else:
+                logger.info(f"Batch {batch_id}: {batch.status}")
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            self._sleep(self.configuration.batch_poll_interval)
+
+    def _store_results(
+        self,
+        state: dict,
+        state_file: str,
+        batch: Any,
+        transcript_files: dict[str, str],
+    ) -> tuple[int, int]:
+        """Store the summaries of a completed batch; returns (stored, not stored)."""
+        if not batch.output_file_id:
+            logger.warning(f"Batch {batch.id} completed without an output file")
+            return 0, 0
+        content = self.client.files.content(batch.output_file_id).text
+        stored_ids = set(state.get("stored", []))
+        pending: list[tuple[str, str, str]] = []
+        stored = failed = unstored = 0
+
+        def flush() -> int:
+            nonlocal unstored
+            if not pending:
+                return 0
+            # Checkpoint only after the rows are written
+            written = store_summaries(
+                [(summary, video) for _, summary, video in pending],
+                batch_size=self.configuration.embed_batch_size,
+                summary_model=self.configuration.model,
+                transcript_files=transcript_files,
+            )
+            if written:
+                stored_ids.update(custom_id for custom_id, _, _ in pending)
+                state["stored"] = sorted(stored_ids)
+                self._save_state(state, state_file)
+            else:
+                unstored += len(pending)
+            pending.clear()
+            return written
+
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            custom_id = item.get("custom_id")
+            video_file = state["videos"].get(custom_id)
+            if video_file is None or custom_id in stored_ids:
+                continue
+            summary = _summary_from_result(item)
+            body = (item.get("response") or {}).get("body") or {}
+            llm_metrics.record(
+                body.get("model") or self.configuration.model,
+                "batch",
+                usage=body.get("usage"),
+                prices=self.configuration.prices,
+                batch=True,
+                error=None if summary is not None else "BatchRequestFailed",
+            )
+            if summary is None:
+                failed += 1
+                logger.error(f"Batch request {custom_id} failed for {video_file}")
+                continue
+            pending.append((custom_id, summary, video_file))
+            if len(pending) >= self.configuration.embed_batch_size:
+                stored += flush()
+        stored += flush()
+        if failed:
+            logger.warning(f"{failed} batch request(s) failed")
+        logger.info(f"Stored {stored} summaries from batch {batch.id}")
+        return stored, unstored
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _load_state(state_file: str) -> dict:
+        if not os.path.exists(state_file):
+            return {}
+        with open(state_file, encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _save_state(state: dict, state_file: str) -> None:
+        # Write-then-rename so a crash never leaves a truncated state file
+        tmp = state_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, state_file)
+
+
+def _summary_from_result(item: dict) -> Optional[str]:
+    response = item.get("response") or {}
+    if item.get("error") or response.get("status_code") != 200:
+        return None
+    choices = (response.get("body") or {}).get("choices") or []
+    if not choices:
+        return None
+    summary = (choices[0].get("message", {}).get("content") or "").strip()
+    return summary or None
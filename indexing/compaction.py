@@ -0,0 +1,83 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Transcript compaction before prompting.
+
+Whisper output on training footage contains long runs of hallucinated lines
+("Thank you." x40), filler words and near-identical consecutive segments. None
+of it helps a summary, but all of it costs prompt tokens. ``compact_segments``
+removes that noise while keeping segment order and wording intact.
+"""
+
+import re
+
+FILLER_WORDS = frozenset(
+    {"um", "umm", "uh", "uhh", "uhm", "erm", "er", "ah", "eh", "hmm", "mm", "mhm"}
+)
+
+_WS_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"[\w']+")
+_FILLER_RE = re.compile(
+    r"\b(?:" + "|".join(sorted(FILLER_WORDS, key=len, reverse=True)) + r")\b[,.]?\s*",
+    re.IGNORECASE,
+)
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse runs of whitespace into single spaces and strip the ends."""
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _words(text: str) -> list[str]:
+    return [w.lower() for w in _WORD_RE.findall(text)]
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def compact_segments(
+    texts: list[str],
+    min_words: int = 1,
+    max_repeats: int = 3,
+    similarity: float = 0.8,
+) -> list[str]:
+    """Remove noise from transcript segments.
+
+    * Filler words are removed and whitespace is normalized.
+    * Segments with fewer than ``min_words`` remaining words are dropped.
+    * A segment that is a near-duplicate (word-set Jaccard >= ``similarity``)
+      of the previous kept segment is dropped.
+    * An identical line is kept at most ``max_repeats`` times per transcript.
+
+    Args:
+        texts: Segment texts in transcript order.
+        min_words: Minimum words a segment needs to be kept.
+        max_repeats: Maximum occurrences of the same line.
+        similarity: Near-duplicate threshold for consecutive segments.
+
+    Returns:
+        The compacted segment texts, in order.
+    """
+    kept: list[str] = []
+    counts: dict[str, int] = {}
+    previous: set[str] = set()
+    for text in texts:
+        cleaned = normalize_whitespace(_FILLER_RE.sub("", text))
+        words = _words(cleaned)
+        if len(words) < min_words:
+            continue
+        key = " ".join(words)
+        current = set(words)
+        if kept and _jaccard(previous, current) >= similarity:
+            continue
+        if counts.get(key, 0) >= max_repeats:
+            continue
+        counts[key] = counts.get(key, 0) + 1
+        kept.append(cleaned)
+        previous = current
+    return kept
@@ -0,0 +1,238 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Pooled PostgreSQL connections shared by indexing, the API and ops scripts.
+
+Opening a connection (TCP + TLS + auth) costs more than a vector search, so
+every database access goes through a process-wide ``psycopg_pool`` pool per
+(database, application name). Connections are health-checked when handed out,
+recycled after ``DB_POOL_MAX_IDLE`` / ``DB_POOL_MAX_LIFETIME`` seconds, and
+waiting for a free one is bounded by ``DB_POOL_TIMEOUT``.
+
+``connection()`` behaves like ``with psycopg.connect(...) as conn``: the
+transaction is committed on success and rolled back on error, but the
+connection goes back to the pool instead of being closed. ``async_connection``
+is the asyncio equivalent for async code paths.
+"""
+
+import logging
+import os
+import threading
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Optional
+
+import psycopg
+from dotenv import load_dotenv
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_APPLICATION_NAME = "rugby"
+
+
+class DatabaseUnavailable(RuntimeError):
+    """No pooled connection could be obtained within the pool timeout."""
+
+
+def _int_env(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _float_env(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def connect_kwargs(
+    dbname: Optional[str] = None,
+    application_name: str = DEFAULT_APPLICATION_NAME,
+    options: str = "",
+) -> dict[str, Any]:
+    """``psycopg.connect`` keyword arguments from the ``DB_*`` environment."""
+    kwargs = {
+        "dbname": dbname or os.getenv("DB_NAME", "videos_db"),
+        "user": os.getenv("DB_USER", "postgres"),
+        "password": os.getenv("DB_PASS", "postgres"),
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": _int_env("DB_PORT", 5432),
+        "connect_timeout": _int_env("DB_CONNECT_TIMEOUT", 5),
+        "application_name": application_name,
+    }
+    if options:
+        kwargs["options"] = options
+    return kwargs
+
+
+def _reset(conn: psycopg.Connection) -> None:
+    # Callers may switch to autocommit (e.g. for CREATE INDEX CONCURRENTLY)
+    if conn.autocommit:
+        conn.autocommit = False
+
+
+_PoolKey = tuple[str, str, str]
+_pools: dict[_PoolKey, ConnectionPool] = {}
+_async_pools: dict[_PoolKey, AsyncConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_settings() -> dict[str, Any]:
+    max_size = max(1, _int_env("DB_POOL_MAX", 10))
+    return {
+        "min_size": min(max(0, _int_env("DB_POOL_MIN", 1)), max_size),
+        "max_size": max_size,
+        "timeout": _float_env("DB_POOL_TIMEOUT", 5.0),
+        "max_idle": _float_env("DB_POOL_MAX_IDLE", 300.0),
+        "max_lifetime": _float_env("DB_POOL_MAX_LIFETIME", 3600.0),
+    }
+
+
+def get_pool(
+    dbname: Optional[str] = None,
+    application_name: str = DEFAULT_APPLICATION_NAME,
+    options: str = "",
+) -> ConnectionPool:
+    """
+    Return the shared pool for ``dbname`` (default ``DB_NAME``), opening it on first use.
+
+    Args:
+        dbname (Optional[str]): Database to connect to.
+        application_name (str): Reported in ``pg_stat_activity``; each
+            application gets its own pool.
+        options (str): Server ``options`` string (e.g. ``-c statement_timeout=5s``).
+    """
+    kwargs = connect_kwargs(dbname, application_name, options)
+    key = (kwargs["dbname"], application_name, options)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                kwargs=kwargs,
+                check=ConnectionPool.check_connection,
+                reset=_reset,
+                name=f"{application_name}:{key[0]}",
+                open=False,
+                **_pool_settings(),
+            )
+            # Don't block on min_size connections; a down DB surfaces per request
+            pool.open(wait=False)
+            _pools[key] = pool
+            logger.debug(f"Opened connection pool {pool.name}")
+        return pool
+
+
+@contextmanager
+def connection(
+    dbname: Optional[str] = None,
+    application_name: str = DEFAULT_APPLICATION_NAME,
+    options: str = "",
+    timeout: Optional[float] = None,
+) -> Iterator[psycopg.Connection]:
+    """
+    Borrow a pooled connection for the duration of a ``with`` block.
+
+    Raises:
+        DatabaseUnavailable: If no connection is available within the timeout
+            (including when the server cannot be reached).
+    """
+    pool = get_pool(dbname, application_name, options)
+    try:
+        ctx = pool.connection(timeout=timeout)
+        conn = ctx.__enter__()
+    except PoolTimeout as e:
+        raise DatabaseUnavailable(
+            f"no database connection to {pool.name} within "
+            f"{pool.timeout if timeout is None else timeout}s: {e}"
+        ) from e
+    try:
+        yield conn
+    except BaseException as e:
+        if not ctx.__exit__(type(e), e, e.__traceback__):
+            raise
+    else:
+        ctx.__exit__(None, None, None)
+
+
+async def _async_reset(conn: psycopg.AsyncConnection) -> None:
+    if conn.autocommit:
+        await conn.set_autocommit(False)
+
+
+async def get_async_pool(
+    dbname: Optional[str] = None,
+    application_name: str = DEFAULT_APPLICATION_NAME,
+    options: str = "",
+) -> AsyncConnectionPool:
+    """Async counterpart of ``get_pool``; must be called from a running event loop."""
+    kwargs = connect_kwargs(dbname, application_name, options)
+    key = (kwargs["dbname"], application_name, options)
+    pool = _async_pools.get(key)
+    if pool is None:
+        pool = AsyncConnectionPool(
+            kwargs=kwargs,
+            check=AsyncConnectionPool.check_connection,
+            reset=_async_reset,
+            name=f"{application_name}:{key[0]}:async",
+            open=False,
+            **_pool_settings(),
+        )
+        _async_pools[key] = pool
+        await pool.open(wait=False)
+    return pool
+
+
+@asynccontextmanager
+async def async_connection(
+    dbname: Optional[str] = None,
+    application_name: str = DEFAULT_APPLICATION_NAME,
+    options: str = "",
+    timeout: Optional[float] = None,
+) -> AsyncIterator[psycopg.AsyncConnection]:
+    """
+    Borrow a pooled async connection for the duration of an ``async with`` block.
+
+    Raises:
+        DatabaseUnavailable: If no connection is available within the timeout.
+    """
+    pool = await get_async_pool(dbname, application_name, options)
+    try:
+        ctx = pool.connection(timeout=timeout)
+        conn = await ctx.__aenter__()
+    except PoolTimeout as e:
+        raise DatabaseUnavailable(
+            f"no database connection to {pool.name} within "
+            f"{pool.timeout if timeout is None else timeout}s: {e}"
+        ) from e
+    try:
+        yield conn
+    except BaseException as e:
+        if not await ctx.__aexit__(type(e), e, e.__traceback__):
+            raise
+    else:
+        await ctx.__aexit__(None, None, None)
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """``psycopg_pool`` statistics of every open pool, keyed by pool name."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.get_stats() for pool in [*pools, *_async_pools.values()]}
+
+
+def close_pools() -> None:
+    """Close every synchronous pool (e.g. at process shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+async def close_async_pools() -> None:
+    pools = list(_async_pools.values())
+    _async_pools.clear()
+    for pool in pools:
+        await pool.close()
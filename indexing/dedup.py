@@ -0,0 +1,159 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Near-duplicate transcript detection with MinHash and LSH.
+
+Clips from one session often carry (almost) the same transcript: a drill
+explanation repeated, or the same footage exported twice. Summarizing each of
+them costs an LLM call for no new information. ``group_near_duplicates`` maps
+every transcript to a representative whose summary can be reused when their
+estimated Jaccard similarity (over word shingles) meets a threshold.
+"""
+
+import hashlib
+import re
+import struct
+from typing import Optional
+
+# Mersenne prime used for the universal hash family (a * x + b) mod p
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"[\w']+")
+
+
+def shingles(text: str, size: int = 5) -> set[str]:
+    """Lower-cased word n-grams of ``text``; short texts yield a single shingle."""
+    words = [w.lower() for w in _WORD_RE.findall(text)]
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """
+    Computes fixed-length MinHash signatures of shingle sets.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1) -> None:
+        self.num_perm = num_perm
+        params = hashlib.sha256(f"minhash:{seed}".encode()).digest()
+        self._coeffs: list[tuple[int, int]] = []
+        counter = 0
+        while len(self._coeffs) < num_perm:
+            block = hashlib.sha256(params + struct.pack("<I", counter)).digest()
+            a, b = struct.unpack("<QQ", block[:16])
+            self._coeffs.append((a % (_PRIME - 1) + 1, b % _PRIME))
+            counter += 1
+
+    def signature(self, items: set[str]) -> tuple[int, ...]:
+        """MinHash signature of ``items`` (all-max for an empty set)."""
+        if not items:
+            return (_MAX_HASH,) * self.num_perm
+        hashes = [
+            struct.unpack(
+                "<Q", hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest()
+            )[0]
+            for item in items
+        ]
+        return tuple(
+            min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._coeffs
+        )
+
+
+def estimate_similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: the fraction of matching signature slots."""
+    if not sig_a:
+        return 0.0
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def lsh_params(threshold: float, num_perm: int) -> tuple[int, int]:
+    """Pick (bands, rows) with bands * rows <= num_perm whose S-curve knee
+    ``(1 / bands) ** (1 / rows)`` is closest to ``threshold``."""
+    best = (num_perm, 1)
+    best_err = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        err = abs((1 / bands) ** (1 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class LSHIndex:
+    """
+    Banded locality-sensitive hashing over MinHash signatures.
+    """
+
+    def __init__(self, threshold: float, num_perm: int = 128) -> None:
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self._buckets: list[dict[tuple[int, ...], list[int]]] = [
+            {} for _ in range(self.bands)
+        ]
+        self._signatures: dict[int, tuple[int, ...]] = {}
+
+    def _band_keys(self, signature: tuple[int, ...]) -> list[tuple[int, ...]]:
+        r = self.rows
+        return [signature[i * r : (i + 1) * r] for i in range(self.bands)]
+
+    def insert(self, key: int, signature: tuple[int, ...]) -> None:
+        self._signatures[key] = signature
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band, []).append(key)
+
+    def query(self, signature: tuple[int, ...]) -> Optional[tuple[int, float]]:
+        """Return the most similar stored key at or above the threshold, if any."""
+        candidates: set[int] = set()
+        for bucket, band in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band, ()))
+        best: Optional[tuple[int, float]] = None
+        for key in sorted(candidates):
+            sim = estimate_similarity(signature, self._signatures[key])
+            if sim >= self.threshold and (best is None or sim > best[1]):
+                best = (key, sim)
+        return best
+
+
+def group_near_duplicates(
+    texts: list[Optional[str]],
+    threshold: float = 0.9,
+    num_perm: int = 128,
+    shingle_size: int = 5,
+) -> list[int]:
+    """
+    Map every transcript to the index of its representative.
+
+    Transcripts are processed in order; each one either matches an earlier
+    representative (estimated Jaccard >= ``threshold``) or becomes a
+    representative itself. ``None`` or empty texts are never grouped.
+
+    Args:
+        texts: Transcript texts (``None`` for transcripts that could not be read).
+        threshold: Minimum estimated Jaccard similarity to count as a duplicate.
+        num_perm: MinHash signature length.
+        shingle_size: Words per shingle.
+
+    Returns:
+        list[int]: ``result[i] == i`` for representatives, otherwise the index
+        of the representative whose summary can be reused for ``texts[i]``.
+    """
+    hasher = MinHasher(num_perm)
+    index = LSHIndex(threshold, num_perm)
+    representatives: list[int] = []
+    for i, text in enumerate(texts):
+        items = shingles(text or "", shingle_size)
+        if not items:
+            representatives.append(i)
+            continue
+        signature = hasher.signature(items)
+        match = index.query(signature)
+        if match is None:
+            index.insert(i, signature)
+            representatives.append(i)
+        else:
+            representatives.append(match[0])
+    return representatives
@@ -0,0 +1,390 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Local embedding service shared by all API workers.
+
+Every uvicorn worker that loads the embedding model holds its own copy of the
+weights and runtime. Instead, one process can run ``EmbeddingService`` with
+the model and serve encode requests over a Unix domain socket; workers then
+point ``EMBEDDING_SERVICE_SOCKET`` at it and ``get_embedding_model`` returns
+an ``EmbeddingClient`` with the same ``encode`` API. Requests arriving from
+all workers within ``max_wait_ms`` are micro-batched into one forward pass.
+
+Run it with::
+
+    python -m indexing.embedding_service --socket /run/rugby/embed.sock
+
+Wire format (per message, both directions): a 4-byte big-endian length and a
+UTF-8 JSON header. Requests are ``{"texts": [...], "normalize": bool}`` or
+``{"op": "stats"}``. Encode responses are ``{"shape": [n, dim]}`` followed by
+``n * dim`` little-endian float32 values; failures are ``{"error": "..."}``.
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("!I")
+_FLOAT32 = np.dtype("<f4")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("embedding service connection closed")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def _send_message(sock: socket.socket, header: dict, body: bytes = b"") -> None:
+    payload = json.dumps(header).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload + body)
+
+
+def _recv_message(sock: socket.socket) -> dict:
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, size).decode("utf-8"))
+
+
+class MicroBatcher:
+    """
+    Collects concurrent encode requests and runs them through the model together.
+
+    The worker thread takes the first queued request, then keeps gathering
+    requests for up to ``max_wait_s`` or until ``max_batch`` texts are queued.
+    """
+
+    def __init__(self, model: Any, max_batch: int = 64, max_wait_s: float = 0.005):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self._queue: queue.Queue[Optional[tuple[list[str], bool, Future]]] = (
+            queue.Queue()
+        )
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self._thread = threading.Thread(
+            target=self._run, name="embedding-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, texts: list[str], normalize: bool = False) -> Future:
+        future: Future = Future()
+        self._queue.put((texts, normalize, future))
+        return future
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "texts": self.texts,
+                "avg_batch_requests": round(self.requests / self.batches, 2)
+                if self.batches
+                else None,
+            }
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            size = len(item[0])
+            deadline = time.monotonic() + self.max_wait_s
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._encode(batch)
+                    return
+                batch.append(item)
+                size += len(item[0])
+            self._encode(batch)
+
+    def _encode(self, batch: list[tuple[list[str], bool, Future]]) -> None:
+        with self._lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self.texts += sum(len(texts) for texts, _, _ in batch)
+        for normalize in (False, True):
+            group = [
+                (texts, future) for texts, norm, future in batch if norm == normalize
+            ]
+            if not group:
+                continue
+            texts = [text for group_texts, _ in group for text in group_texts]
+            try:
+                embeddings = np.asarray(
+                    self.model.encode(
+                        texts,
+                        batch_size=self.max_batch,
+                        normalize_embeddings=normalize,
+                        convert_to_numpy=True,
+                    ),
+                    dtype=np.float32,
+                )
+            except Exception as e:  # noqa: BLE001
+                for _, future in group:
+                    future.set_exception(e)
+                continue
+            offset = 0
+            for group_texts, future in group:
+                future.set_result(embeddings[offset : offset + len(group_texts)])
+                offset += len(group_texts)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "EmbeddingService"
+
+    def handle(self) -> None:
+        # One connection carries many requests (clients keep it open)
+        while True:
+            try:
+                request = _recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                if request.get("op") == "stats":
+                    _send_message(self.request, self.server.stats())
+                    continue
+                texts = [str(t) for t in request["texts"]]
+                embeddings = self.server.batcher.submit(
+                    texts, bool(request.get("normalize", False))
+                ).result()
+            except Exception as e:  # noqa: BLE001
+                _send_message(self.request, {"error": f"{type(e).__name__}: {e}"})
+                continue
+            _send_message(
+                self.request,
+                {"shape": list(embeddings.shape)},
+                embeddings.astype(_FLOAT32, copy=False).tobytes(),
+            )
+
+
+class EmbeddingService(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server answering encode requests with a shared ``MicroBatcher``.
+    """
+
+    daemon_threads = True
+    # Every API worker thread holds a connection; the default backlog is 5
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        model: Any,
+        socket_path: str,
+        max_batch: int = 64,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        self.socket_path = socket_path
+        self.model = model
+        self.batcher = MicroBatcher(model, max_batch, max_wait_ms / 1000)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # stale socket from a previous run
+        os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o660)
+
+    def stats(self) -> dict:
+        return {
+            **self.batcher.stats(),
+            "dim": int(self.model.get_sentence_embedding_dimension()),
+        }
+
+    def start(self) -> threading.Thread:
+        """Serve from a background thread (returned) until ``close``."""
+        thread = threading.Thread(
+            target=self.serve_forever, name="embedding-service", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        self.shutdown()
+        self.server_close()
+        self.batcher.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class EmbeddingClient:
+    """
+    ``SentenceTransformer.encode``-compatible client of an ``EmbeddingService``.
+
+    Each thread keeps its own connection; a dropped connection is re-opened
+    once per call. ``close`` closes the connections of every thread.
+    """
+
+    def __init__(
+        self, socket_path: str, timeout: float = 30.0, connect_timeout: float = 10.0
+    ) -> None:
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._local = threading.local()
+        # Connections of all threads, so close() can reach them
+        self._sockets: list[socket.socket] = []
+        self._sockets_lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        # The service may still be loading the model when workers start
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+                return sock
+            except (FileNotFoundError, ConnectionRefusedError, BlockingIOError):
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.1)
+
+    def _request(self, header: dict) -> tuple[dict, bytes]:
+        """
+        Send one request and read its full response (header and body).
+
+        Any failure mid-exchange closes the connection, since a partly read
+        response would desynchronise the next request on it; dropped
+        connections are retried once.
+        """
+        for attempt in (1, 2):
+            sock = getattr(self._local, "sock", None)
+            if sock is None or sock.fileno() == -1:  # closed by close()
+                sock = self._local.sock = self._connect()
+                with self._sockets_lock:
+                    self._sockets.append(sock)
+            try:
+                _send_message(sock, header)
+                response = _recv_message(sock)
+                body = b""
+                if "shape" in response:
+                    rows, dim = response["shape"]
+                    body = _recv_exact(sock, rows * dim * _FLOAT32.itemsize)
+                return response, body
+            except BaseException as e:
+                self._discard(sock)
+                self._local.sock = None
+                retryable = isinstance(
+                    e, (ConnectionError, BrokenPipeError, socket.timeout)
+                )
+                if attempt == 2 or not retryable:
+                    raise
+        raise AssertionError("unreachable")
+
+    def encode(
+        self,
+        sentences: Union[str, list[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        convert_to_numpy: bool = True,
+        **_: Any,
+    ) -> np.ndarray:
+        """Embed one sentence (1-D result) or a list of sentences (2-D result)."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0,), dtype=np.float32)
+        header, body = self._request(
+            {"texts": texts, "normalize": normalize_embeddings}
+        )
+        if "error" in header:
+            raise RuntimeError(f"Embedding service error: {header['error']}")
+        rows, dim = header["shape"]
+        embeddings = np.frombuffer(body, dtype=_FLOAT32).reshape(rows, dim)
+        return embeddings[0] if single else embeddings
+
+    def stats(self) -> dict:
+        header, _ = self._request({"op": "stats"})
+        return header
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.stats()["dim"])
+
+    def _discard(self, sock: socket.socket) -> None:
+        sock.close()
+        with self._sockets_lock:
+            if sock in self._sockets:
+                self._sockets.remove(sock)
+
+    def close(self) -> None:
+        """Close the connections opened by every thread."""
+        with self._sockets_lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            sock.close()
+        self._local.sock = None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from indexing.registry import load_embedding_model
+
+    parser = argparse.ArgumentParser(description="Shared embedding service")
+    parser.add_argument(
+        "--socket",
+        default=os.getenv("EMBEDDING_SERVICE_SOCKET") or "./data/embed.sock",
+        help="Unix socket path to listen on",
+    )
+    parser.add_argument(
+        "--model", default=None, help="Model id (default: EMBEDDING_MODEL)"
+    )
+    parser.add_argument(
+        "--max-batch", type=int, default=64, help="Texts per forward pass"
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=5.0,
+        help="How long to gather concurrent requests into one batch",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+
+    model = load_embedding_model(args.model)
+    model.encode("warmup")
+    service = EmbeddingService(model, args.socket, args.max_batch, args.max_wait_ms)
+    logger.info(f"Embedding service listening on {args.socket}")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -6,95 +6,166 @@
 """
 index_manager.py
 ----------------
-This module provides functions for summarizing rugby training session transcripts using OpenAI models.
+This module provides functions for summarizing rugby training session transcripts using OpenAI-compatible LLM providers.
 Vectorizing summaries, storing them in a PostgreSQL database with pgvector, and querying videos by semantic similarity.
 """
 
 import logging
 import os
+import re
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
 import psycopg
 from dotenv import load_dotenv
-from openai import OpenAI
-from sentence_transformers import SentenceTransformer
-from torch import Tensor
 
 from core.pipeline_models import IndexingConfig
-from indexing.srt_parser import load_srt_text
+from indexing.compaction import compact_segments
+from indexing.db import DatabaseUnavailable, connection
+from indexing.llm_metrics import llm_metrics
+from indexing.providers import get_provider
+from indexing.query_cache import normalize_query, query_cache, query_log
+from indexing.rate_limit import RateLimiter, call_with_backoff
+from indexing.registry import get_embedding_model, lowercases_input
+from indexing.srt_parser import load_segments, load_srt_text
+from indexing.text_search import RRF_K, text_search_config
+from indexing.tokens import chunk_texts, estimate_tokens, group_by_tokens
+from indexing.vector_copy import register_vector_copy
+from indexing.vector_metric import distance_operator
+from indexing.video_metadata import METADATA_COLUMNS, describe_videos
 
 # Load environment variables from .env file
 load_dotenv()
-DB_USER: str = os.getenv("DB_USER", "postgres")
-DB_PASS: str = os.getenv("DB_PASS", "postgres")
-DB_NAME: str = os.getenv("DB_NAME", "videos_db")
-DB_HOST: str = os.getenv("DB_HOST", "localhost")
-DB_PORT: int = int(os.getenv("DB_PORT", 5432))
 
 logger = logging.getLogger(__name__)
 
-# TODO: How will we store an open ai key in production?
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))  # type: ignore[arg-type]
-# TODO: Evaluate different model options. This is still decent,
-#       but there are faster ones with reduced semantic quality.
-vector_model = SentenceTransformer("BAAI/bge-small-en")
+# Completion tokens reserved per request when budgeting tokens-per-minute.
+COMPLETION_TOKEN_ESTIMATE = 512
+# Rows taken from each of the vector and full-text rankings in hybrid search
+HYBRID_CANDIDATES = 50
 
 
-def connect_db() -> Optional[psycopg.Connection]:
-    try:
-        return psycopg.connect(  # type: ignore[attr-defined]
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASS,
-            host=DB_HOST,
-            port=DB_PORT,
-        )
-    except Exception as e:  # noqa: BLE001
-        logger.warning("DB unavailable; due to: %s", e)
-        return None
+TRANSCRIPT_HEADER = "Here is the transcript:\n\n"
 
 
-def summarize_srt_file(configuration: IndexingConfig, srt_file: str) -> str:
+def build_summary_request(
+    configuration: IndexingConfig,
+    transcript: str,
+    instructions: Optional[str] = None,
+) -> dict:
     """
-    Summarizes a rugby training session transcript from an SRT file using an OpenAI model.
+    Builds the chat completion parameters used to summarize a transcript.
+
+    Shared by the online path (summarize_srt_file) and the Batch API path so both
+    send identical requests.
+
+    Messages are laid out for provider-side prefix caching: the system prompt,
+    instructions and few-shot examples form a byte-identical prefix for every
+    transcript, and the transcript is only ever the final user message.
 
     Args:
-        configuration (IndexingConfig): Configuration object specifying AI provider, model, and prompt details.
-        srt_file (str): Path to the SRT file containing the transcript.
+        configuration (IndexingConfig): Configuration object specifying model and prompt details.
+        transcript (str): Transcript text to summarize.
+        instructions (Optional[str]): Overrides ``prompt_model.instructions`` (used by the reduce step).
 
     Returns:
-        str: A summary of the rugby training session.
-
-    Raises:
-        ValueError: If the AI provider is unsupported or the OpenAI API returns no/empty response.
+        dict: Keyword arguments for ``chat.completions.create`` (model, messages, temperature).
     """
-    if configuration.ai_provider != "openai":
-        # TODO: More providers?
-        raise ValueError(
-            f"Unsupported AI provider: {configuration.ai_provider}. Only 'openai' is supported."
+    pm = configuration.prompt_model
+    if instructions is None:
+        instructions = pm.instructions
+    system = "\n\n".join(part for part in (pm.system, instructions) if part)
+    messages = [{"role": "system", "content": system}]
+    for example in pm.examples:
+        messages.append(
+            {"role": "user", "content": str(example.get("user", "")).strip()}
+        )
+        messages.append(
+            {"role": "assistant", "content": str(example.get("assistant", "")).strip()}
         )
+    messages.append({"role": "user", "content": TRANSCRIPT_HEADER + transcript.strip()})
+    model = configuration.model
+    return {
+        "model": model,
+        "messages": messages,
+        # GPT5 no longer supports temperature besides 1
+        "temperature": 1 if model == "gpt-5o" else 0.3,
+    }
 
-    logger.debug(f"Summarizing SRT file: {srt_file}")
-    transcript = load_srt_text(srt_file)
 
-    prompt = f"""
-    {configuration.prompt_model.instructions}
+def load_transcript_texts(configuration: IndexingConfig, srt_file: str) -> list[str]:
+    """
+    Loads a transcript's segment texts, compacted when ``compact_transcript`` is set.
 
-    Here is the transcript:
+    Args:
+        configuration (IndexingConfig): Indexing configuration (compaction toggle, model).
+        srt_file (str): Path to the SRT file (its segments sidecar is preferred).
 
-    {transcript}
+    Returns:
+        list[str]: Segment texts in transcript order.
     """
-    model = configuration.model
-    # Treat response as Any to avoid strict SDK typing dependency
-    response: Any = openai_client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": f"{configuration.prompt_model.system}"},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=1
-        if model == "gpt-5o"
-        else 0.3,  # GPT5 no longer supports temperature besides 1
+    texts = [segment["text"] for segment in load_segments(srt_file)]
+    if not configuration.compact_transcript:
+        return texts
+    before = estimate_tokens(" ".join(texts), configuration.model)
+    texts = compact_segments(texts)
+    after = estimate_tokens(" ".join(texts), configuration.model)
+    saved = (1 - after / before) * 100 if before else 0.0
+    logger.info(
+        f"Compacted {srt_file}: {before} -> {after} tokens ({saved:.0f}% saved)"
+    )
+    return texts
+
+
+def _complete(
+    configuration: IndexingConfig,
+    request: dict,
+    limiter: Optional[RateLimiter],
+    stage: str = "single",
+) -> tuple[str, Any]:
+    """Run one chat completion, record its metrics and return (stripped content, usage)."""
+    provider = get_provider(configuration)
+    prompt_text = "".join(m["content"] for m in request["messages"])
+    attempts = 0
+    ttft: Optional[float] = None
+
+    def attempt() -> Any:
+        nonlocal attempts, ttft
+        attempts += 1
+        result = provider.complete(request)
+        ttft = provider.last_ttft_s
+        return result
+
+    started = time.perf_counter()
+    try:
+        # Treat response as Any to avoid strict SDK typing dependency
+        response: Any = call_with_backoff(
+            attempt,
+            limiter=limiter,
+            tokens=estimate_tokens(prompt_text, configuration.model)
+            + COMPLETION_TOKEN_ESTIMATE,
+            max_retries=configuration.max_retries,
+        )
+    except Exception as e:
+        llm_metrics.record(
+            request["model"],
+            stage,
+            wall_s=time.perf_counter() - started,
+            retries=max(0, attempts - 1),
+            error=type(e).__name__,
+        )
+        raise
+    usage = getattr(response, "usage", None)
+    llm_metrics.record(
+        request["model"],
+        stage,
+        usage=usage,
+        wall_s=time.perf_counter() - started,
+        ttft_s=ttft,
+        retries=attempts - 1,
+        prices=configuration.prices,
     )
 
     if not getattr(response, "choices", None):
@@ -103,6 +174,128 @@ def summarize_srt_file(configuration: IndexingConfig, srt_file: str) -> str:
     summary = response.choices[0].message.content.strip()  # type: ignore[index]
     if not summary:
         raise ValueError("Empty summary returned from OpenAI API")
+    return summary, usage
+
+
+def _add_usage(usage: dict[str, dict[str, int]], stage: str, call_usage: Any) -> None:
+    stats = usage.setdefault(
+        stage,
+        {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0},
+    )
+    stats["calls"] += 1
+    if call_usage is not None:
+        stats["prompt_tokens"] += int(getattr(call_usage, "prompt_tokens", 0) or 0)
+        stats["completion_tokens"] += int(
+            getattr(call_usage, "completion_tokens", 0) or 0
+        )
+        # Prompt tokens served from the provider's prefix cache
+        details = getattr(call_usage, "prompt_tokens_details", None)
+        stats["cached_tokens"] += int(getattr(details, "cached_tokens", 0) or 0)
+
+
+def _format_usage(usage: dict[str, dict[str, int]]) -> str:
+    return "; ".join(
+        f"{stage}: {s['calls']} call(s), {s['prompt_tokens']} prompt "
+        f"({s['cached_tokens']} cached) + {s['completion_tokens']} completion tokens"
+        for stage, s in usage.items()
+    )
+
+
+def _map_reduce(
+    configuration: IndexingConfig,
+    texts: list[str],
+    limiter: Optional[RateLimiter],
+    usage: dict[str, dict[str, int]],
+) -> str:
+    """
+    Summarize token-bounded chunks of ``texts`` in parallel, then combine them.
+
+    The calls go through ``limiter``, whose concurrency cap is shared with the
+    caller's own workers, so nesting this pool inside them does not multiply
+    the requests in flight.
+    """
+    model = configuration.model
+    chunks = chunk_texts(texts, configuration.chunk_tokens, model)
+    workers = max(1, min(len(chunks), int(configuration.batch_size or 1)))
+
+    def run_all(requests: list[dict], stage: str) -> list[str]:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    lambda r: _complete(configuration, r, limiter, stage), requests
+                )
+            )
+        for _, call_usage in results:
+            _add_usage(usage, stage, call_usage)
+        return [text for text, _ in results]
+
+    def reduce_request(parts: list[str]) -> dict:
+        joined = "\n\n".join(f"Part {i}:\n{p}" for i, p in enumerate(parts, 1))
+        return build_summary_request(
+            configuration, joined, instructions=configuration.reduce_instructions
+        )
+
+    logger.debug(f"Map step: {len(chunks)} chunks")
+    partials = run_all(
+        [
+            build_summary_request(configuration, f"(Part {i} of {len(chunks)})\n{c}")
+            for i, c in enumerate(chunks, 1)
+        ],
+        "map",
+    )
+
+    if configuration.reduce_strategy == "tree":
+        # Combine groups of partial summaries until they fit one reduce prompt
+        while len(partials) > 1:
+            groups = group_by_tokens(partials, configuration.chunk_tokens, model)
+            if len(groups) == 1 or len(groups) == len(partials):
+                break
+            partials = run_all([reduce_request(g) for g in groups], "reduce")
+
+    return run_all([reduce_request(partials)], "reduce")[0]
+
+
+def summarize_srt_file(
+    configuration: IndexingConfig,
+    srt_file: str,
+    limiter: Optional[RateLimiter] = None,
+) -> str:
+    """
+    Summarizes a rugby training session transcript from an SRT file using the configured LLM provider.
+
+    Transcripts longer than ``configuration.chunk_tokens`` are summarized map-reduce
+    style: segment-aligned chunks are summarized in parallel and then combined
+    (``reduce_strategy`` "single": one reduce call; "tree": hierarchical reduce).
+    Token usage is logged per stage.
+
+    Args:
+        configuration (IndexingConfig): Configuration object specifying AI provider, model, and prompt details.
+        srt_file (str): Path to the SRT file containing the transcript.
+        limiter (Optional[RateLimiter]): Shared request/token limiter; 429s and
+            transient errors are retried up to ``configuration.max_retries`` times.
+
+    Returns:
+        str: A summary of the rugby training session.
+
+    Raises:
+        ValueError: If the AI provider is unsupported or the OpenAI API returns no/empty response.
+    """
+    get_provider(configuration)  # fail fast on unsupported providers
+
+    logger.debug(f"Summarizing SRT file: {srt_file}")
+    texts = load_transcript_texts(configuration, srt_file)
+    transcript = " ".join(texts)
+    usage: dict[str, dict[str, int]] = {}
+
+    if estimate_tokens(transcript, configuration.model) <= configuration.chunk_tokens:
+        summary, call_usage = _complete(
+            configuration, build_summary_request(configuration, transcript), limiter
+        )
+        _add_usage(usage, "single", call_usage)
+        logger.debug(f"Token usage for {srt_file}: {_format_usage(usage)}")
+    else:
+        summary = _map_reduce(configuration, texts, limiter, usage)
+        logger.info(f"Token usage for {srt_file}: {_format_usage(usage)}")
 
     logger.debug("Summary generated")
     logger.debug(f"Summary: {summary}")
@@ -120,82 +313,554 @@ def vectorize_and_store_summary(summary: str, video_file_path: str) -> None:
     """
     logger.debug(f"Vectorizing summary for video: {video_file_path}")
     try:
-        encoded: Tensor = vector_model.encode(summary)
+        encoded = get_embedding_model().encode(summary, normalize_embeddings=True)
     except Exception as e:  # noqa: BLE001
         logger.error("Failed to encode summary: %s", e)
         return
 
     summary_embedding: list[float] = encoded.tolist()
 
-    conn: Optional[psycopg.Connection] = connect_db()
-    if conn is None:
-        logger.error("DB unavailable; skipping vectorize_and_store")
-        return
-    cur = conn.cursor()
-
     # Idempotent upsert on unique (path). We overwrite summary + embedding so that
     # reprocessing (e.g. model improvements) refreshes the stored representation.
-    cur.execute(
-        """
-        INSERT INTO videos (summary, path, embedding)
-        VALUES (%s, %s, %s)
-        ON CONFLICT (path) DO UPDATE
-          SET summary = EXCLUDED.summary,
-              embedding = EXCLUDED.embedding
-        """,
-        (summary, video_file_path, summary_embedding),
+    try:
+        with connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO videos (summary, path, embedding)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (path) DO UPDATE
+                  SET summary = EXCLUDED.summary,
+                      embedding = EXCLUDED.embedding
+                """,
+                (summary, video_file_path, summary_embedding),
+            )
+    except (DatabaseUnavailable, psycopg.Error) as e:
+        logger.error("Database error; skipping vectorize_and_store: %s", e)
+        return
+    logger.debug(f"Vectorized summary for video: {video_file_path}")
+
+
+def embed_texts(texts: list[str], batch_size: int = 64) -> list[list[float]]:
+    """
+    Encodes texts in batches with the shared embedding model.
+
+    Args:
+        texts (list[str]): Texts to embed.
+        batch_size (int): Texts per forward pass.
+
+    Returns:
+        list[list[float]]: Unit-length embeddings, one per text.
+    """
+    if not texts:
+        return []
+    encoded = get_embedding_model().encode(
+        texts,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
     )
+    return encoded.tolist()
 
-    conn.commit()
-    cur.close()
-    conn.close()
-    logger.debug(f"Vectorized summary for video: {video_file_path}")
 
+# Optional per-video values written next to summary and embedding
+_STAGED_COLUMNS: dict[str, str] = {**METADATA_COLUMNS, "transcript": "text"}
+
+
+def upsert_videos(
+    records: Sequence[tuple[str, str, Sequence[float]]],
+    metadata: Optional[Mapping[str, Mapping[str, Any]]] = None,
+) -> int:
+    """
+    Bulk-upserts (path, summary, embedding) records into ``videos``.
+
+    Rows are streamed with a binary COPY into a temporary staging table and
+    merged into ``videos`` with a single ``INSERT ... ON CONFLICT``, all in one
+    transaction. If a path occurs more than once, its last record wins.
+
+    Args:
+        records (Sequence[tuple[str, str, Sequence[float]]]): Rows to write;
+            embeddings must match the dimension of ``videos.embedding``.
+        metadata (Optional[Mapping[str, Mapping[str, Any]]]): Path -> values of
+            ``METADATA_COLUMNS`` (see ``indexing.video_metadata``) and
+            ``transcript``. Missing or None values keep what is already stored.
+
+    Returns:
+        int: Number of records written (0 if the database was unavailable
+            or the write failed).
+    """
+    if not records:
+        return 0
+    metadata = metadata or {}
+    columns = list(_STAGED_COLUMNS)
+    stage_columns = ", ".join(f"{c} {t}" for c, t in _STAGED_COLUMNS.items())
+    column_list = ", ".join(columns)
+    updates = ", ".join(f"{c} = COALESCE(EXCLUDED.{c}, videos.{c})" for c in columns)
+    try:
+        with connection() as conn, conn.cursor() as cur:
+            vector_oid = register_vector_copy(cur)
+            cur.execute(
+                f"""
+                CREATE TEMP TABLE videos_stage (
+                  ord INTEGER, path TEXT, summary TEXT, embedding VECTOR,
+                  {stage_columns}
+                ) ON COMMIT DROP
+                """
+            )
+            with cur.copy(
+                f"COPY videos_stage (ord, path, summary, embedding, {column_list}) "
+                "FROM STDIN (FORMAT BINARY)"
+            ) as copy:
+                copy.set_types(
+                    ["int4", "text", "text", vector_oid, *_STAGED_COLUMNS.values()]
+                )
+                for i, (path, summary, embedding) in enumerate(records):
+                    values = metadata.get(path, {})
+                    copy.write_row(
+                        (i, path, summary, embedding, *(values.get(c) for c in columns))
+                    )
+            cur.execute(
+                f"""
+                INSERT INTO videos (summary, path, embedding, {column_list})
+                SELECT DISTINCT ON (path) summary, path, embedding, {column_list}
+                FROM videos_stage
+                ORDER BY path, ord DESC
+                ON CONFLICT (path) DO UPDATE
+                  SET summary = EXCLUDED.summary,
+                      embedding = EXCLUDED.embedding,
+                      {updates}
+                """
+            )
+    except (DatabaseUnavailable, psycopg.Error) as e:
+        logger.error("Database error; skipping upsert_videos: %s", e)
+        return 0
+    logger.debug(f"Upserted {len(records)} videos")
+    return len(records)
+
+
+def store_summaries(
+    records: list[tuple[str, str]],
+    batch_size: int = 64,
+    summary_model: Optional[str] = None,
+    transcript_files: Optional[Mapping[str, str]] = None,
+) -> int:
+    """
+    Vectorizes many summaries in batches and bulk-upserts them in one transaction.
+
+    The session, file and model metadata of each video (see
+    ``indexing.video_metadata``) is written along with its summary, and so is
+    its transcript text when the SRT file is given (for full-text search).
+
+    Args:
+        records (list[tuple[str, str]]): (summary, video_file_path) pairs.
+        batch_size (int): Summaries per embedding forward pass.
+        summary_model (Optional[str]): Model that wrote the summaries.
+        transcript_files (Optional[Mapping[str, str]]): Video path -> SRT path.
+
+    Returns:
+        int: Number of rows written (0 if encoding or the database failed).
+    """
+    if not records:
+        return 0
+    logger.debug(f"Vectorizing {len(records)} summaries (batch size {batch_size})")
+    try:
+        embeddings = embed_texts([summary for summary, _ in records], batch_size)
+    except Exception as e:  # noqa: BLE001
+        logger.error("Failed to encode summaries: %s", e)
+        return 0
+
+    metadata = describe_videos([path for _, path in records], summary_model)
+    for path, values in metadata.items():
+        srt_file = (transcript_files or {}).get(path)
+        if srt_file is None:
+            continue
+        try:
+            values["transcript"] = load_srt_text(srt_file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read transcript {srt_file}: {e}")
+
+    written = upsert_videos(
+        [
+            (path, summary, embedding)
+            for (summary, path), embedding in zip(records, embeddings)
+        ],
+        metadata,
+    )
+    logger.debug(f"Stored {written} summaries")
+    return written
+
+
+def store_segments(windows_by_path: dict[str, list[dict]], batch_size: int = 64) -> int:
+    """
+    Embeds transcript windows and replaces the stored segments of each video.
+
+    All videos are written in one transaction, so a video never ends up with a
+    mix of old and new windows.
+
+    Args:
+        windows_by_path (dict[str, list[dict]]): Video file path -> windows with
+            ``start_ms``, ``end_ms`` and ``text`` (see ``indexing.moments``).
+        batch_size (int): Windows per embedding forward pass.
+
+    Returns:
+        int: Number of segment rows written (0 if encoding or the database failed).
+    """
+    rows = [
+        (path, w["start_ms"], w["end_ms"], w["text"])
+        for path, windows in windows_by_path.items()
+        for w in windows
+    ]
+    if not rows:
+        return 0
+    try:
+        embeddings = embed_texts([text for *_, text in rows], batch_size)
+    except Exception as e:  # noqa: BLE001
+        logger.error("Failed to encode segments: %s", e)
+        return 0
+
+    try:
+        with connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM video_segments WHERE path = ANY(%s)",
+                (list(windows_by_path),),
+            )
+            cur.executemany(
+                """
+                INSERT INTO video_segments (path, start_ms, end_ms, text, embedding)
+                VALUES (%s, %s, %s, %s, %s)
+                """,
+                [row + (embedding,) for row, embedding in zip(rows, embeddings)],
+            )
+    except (DatabaseUnavailable, psycopg.Error) as e:
+        logger.error("Database error; skipping store_segments: %s", e)
+        return 0
+    logger.debug(f"Stored {len(rows)} segments for {len(windows_by_path)} videos")
+    return len(rows)
+
+
+def embed_query(query: str) -> list[float]:
+    """
+    Embed a search query, reusing the cached embedding of its normalised text.
+
+    Every call is counted in the query log used by ``warm_query_cache``.
+    """
+    model = get_embedding_model()
+    key = normalize_query(query, casefold=lowercases_input(model))
+    query_log.record(key)
+    embedding = query_cache.get(key)
+    if embedding is None:
+        embedding = model.encode(key, normalize_embeddings=True).tolist()
+        query_cache.put(key, embedding)
+    return embedding
+
+
+def warm_query_cache(top_n: int = 50, batch_size: int = 64) -> int:
+    """
+    Pre-encode the ``top_n`` most frequent logged queries into the query cache.
+
+    Returns:
+        int: Number of queries encoded.
+    """
+    queries = [q for q in query_log.top(top_n) if q not in query_cache]
+    if not queries:
+        return 0
+    embeddings = get_embedding_model().encode(
+        queries, batch_size=batch_size, normalize_embeddings=True
+    )
+    for query, embedding in zip(queries, embeddings):
+        query_cache.put(query, embedding.tolist())
+    logger.info(f"Warmed query cache with {len(queries)} logged queries")
+    return len(queries)
 
-def query_videos(query: str, result_limit: int = 5) -> tuple[list[str], list[str]]:
+
+def nearest_sql(table: str, columns: str) -> str:
+    """
+    Nearest-neighbour query over ``table.embedding`` taking (vector, limit) params.
+
+    The distance operator follows ``VECTOR_OPS`` so that it matches the operator
+    class of the ivfflat/hnsw index; any other operator forces a full scan.
+    """
+    return f"""
+        SELECT {columns}
+        FROM {table}
+        ORDER BY embedding {distance_operator()} %s::vector
+        LIMIT %s;"""
+
+
+def _search_setting(value: Optional[int], env_var: str) -> Optional[int]:
+    if value is None and os.getenv(env_var):
+        value = int(os.getenv(env_var, ""))
+    if value is not None and value < 1:
+        raise ValueError(f"{env_var.lower()} must be >= 1, got {value}")
+    return value
+
+
+def search_settings_sql(
+    probes: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    iterative_scan: bool = False,
+) -> Optional[tuple[str, tuple[str, ...]]]:
+    """
+    Statement applying per-query index accuracy knobs for the current transaction.
+
+    ``probes`` is the number of ivfflat lists scanned and ``ef_search`` the
+    hnsw candidate list size; higher values raise recall and latency. Unset
+    values fall back to ``IVFFLAT_PROBES`` / ``HNSW_EF_SEARCH`` and then to the
+    server defaults (1 and 40). Note an hnsw scan returns at most ``ef_search``
+    rows. ``iterative_scan`` (pgvector >= 0.8) lets either index keep scanning
+    until enough rows pass a ``WHERE`` filter.
+
+    Returns:
+        Optional[tuple[str, tuple[str, ...]]]: (sql, params), or None if there
+            is nothing to set.
+    """
+    settings: dict[str, Any] = {
+        "ivfflat.probes": _search_setting(probes, "IVFFLAT_PROBES"),
+        "hnsw.ef_search": _search_setting(ef_search, "HNSW_EF_SEARCH"),
+    }
+    if iterative_scan:
+        settings["ivfflat.iterative_scan"] = "relaxed_order"
+        settings["hnsw.iterative_scan"] = "relaxed_order"
+    settings = {name: value for name, value in settings.items() if value is not None}
+    if not settings:
+        return None
+    # set_config(..., true) is SET LOCAL: it ends with the pooled transaction
+    calls = ", ".join(f"set_config('{name}', %s, true)" for name in settings)
+    return f"SELECT {calls}", tuple(str(value) for value in settings.values())
+
+
+# Search filter -> (videos column, comparison)
+VIDEO_FILTERS: dict[str, tuple[str, str]] = {
+    "date_from": ("session_date", ">="),
+    "date_to": ("session_date", "<="),
+    "session_type": ("session_type", "="),
+    "source": ("source", "="),
+    "min_duration": ("duration_s", ">="),
+    "max_duration": ("duration_s", "<="),
+}
+
+
+def filter_sql(filters: Mapping[str, Any]) -> tuple[str, dict[str, Any]]:
+    """
+    ``WHERE`` condition over the ``videos`` metadata columns for search filters.
+
+    Args:
+        filters (Mapping[str, Any]): Keys of ``VIDEO_FILTERS``; None values
+            are ignored.
+
+    Returns:
+        tuple[str, dict[str, Any]]: Condition with named placeholders ("" if
+            nothing is filtered) and its params.
+
+    Raises:
+        ValueError: On an unknown filter name.
+    """
+    unknown = set(filters) - set(VIDEO_FILTERS)
+    if unknown:
+        raise ValueError(f"unknown search filters: {', '.join(sorted(unknown))}")
+    clauses, params = [], {}
+    for name, value in filters.items():
+        if value is None:
+            continue
+        column, comparison = VIDEO_FILTERS[name]
+        clauses.append(f"{column} {comparison} %({name})s")
+        params[name] = value
+    return " AND ".join(clauses), params
+
+
+def filtered_nearest_sql(table: str, columns: str, where: str, iterative: bool) -> str:
+    """
+    Nearest-neighbour query over rows matching ``where``.
+
+    Takes named params ``embedding`` and ``limit`` plus those of ``where``.
+    With ``iterative`` the vector index is scanned until ``limit`` rows pass
+    the filter, and its relaxed order is restored by sorting the hits again.
+    Otherwise rows are filtered first (by the btree indexes where selective)
+    and only the matches are ranked, exactly. A plain filtered ANN scan would
+    instead drop matches beyond the first ``ef_search``/``probes`` candidates.
+    """
+    operator = distance_operator()
+    if iterative:
+        return f"""
+        WITH nearest AS MATERIALIZED (
+            SELECT {columns}, embedding {operator} %(embedding)s::vector AS distance
+            FROM {table}
+            WHERE {where}
+            ORDER BY distance
+            LIMIT %(limit)s
+        )
+        SELECT {columns} FROM nearest ORDER BY distance;"""
+    return f"""
+        WITH candidates AS MATERIALIZED (
+            SELECT {columns}, embedding FROM {table} WHERE {where}
+        )
+        SELECT {columns}
+        FROM candidates
+        ORDER BY embedding {operator} %(embedding)s::vector
+        LIMIT %(limit)s;"""
+
+
+def hybrid_sql(where: str = "", iterative: bool = False) -> str:
+    """
+    Hybrid search over ``videos`` fusing vector and full-text rankings in one query.
+
+    The ``candidates`` nearest rows by embedding and the ``candidates`` best
+    ``search_tsv`` matches of ``websearch_to_tsquery(query)`` are ranked
+    separately, and each row scores ``sum(1 / (rrf_k + rank))`` over the
+    rankings it appears in (reciprocal rank fusion). Exact terms such as a
+    drill name thus surface even when their embedding is not among the nearest.
+
+    Takes named params ``embedding``, ``query``, ``candidates``, ``rrf_k`` and
+    ``limit`` plus those of ``where``, which restricts both rankings; vector
+    candidates are then found as in ``filtered_nearest_sql``.
+    """
+    operator = distance_operator()
+    prefilter = bool(where) and not iterative
+    filtered = (
+        f"filtered AS MATERIALIZED (SELECT id, embedding FROM videos WHERE {where}),"
+        if prefilter
+        else ""
+    )
+    vector_source = "filtered" if prefilter else "videos"
+    vector_where = f"WHERE {where}" if where and not prefilter else ""
+    text_where = f"AND {where}" if where else ""
+    return f"""
+        WITH {filtered}
+        semantic AS (
+            SELECT id, row_number() OVER (ORDER BY distance) AS rank
+            FROM (
+                SELECT id, embedding {operator} %(embedding)s::vector AS distance
+                FROM {vector_source}
+                {vector_where}
+                ORDER BY distance
+                LIMIT %(candidates)s
+            ) nearest
+        ),
+        lexical AS (
+            SELECT id, row_number() OVER (ORDER BY score DESC) AS rank
+            FROM (
+                SELECT id, ts_rank_cd(search_tsv, tsquery) AS score
+                FROM videos,
+                     websearch_to_tsquery('{text_search_config()}', %(query)s) tsquery
+                WHERE search_tsv @@ tsquery {text_where}
+                ORDER BY score DESC
+                LIMIT %(candidates)s
+            ) matches
+        ),
+        fused AS (
+            SELECT coalesce(s.id, l.id) AS id,
+                   coalesce(1.0 / (%(rrf_k)s + s.rank), 0)
+                   + coalesce(1.0 / (%(rrf_k)s + l.rank), 0) AS score
+            FROM semantic s FULL OUTER JOIN lexical l ON s.id = l.id
+        )
+        SELECT v.id, v.summary, v.path
+        FROM fused JOIN videos v ON v.id = fused.id
+        ORDER BY fused.score DESC, v.id
+        LIMIT %(limit)s;"""
+
+
+_ITERATIVE_SCAN_VERSION = (0, 8)
+# Whether the server's pgvector supports iterative index scans; checked once
+_iterative_scan: Optional[bool] = None
+
+
+def _supports_iterative_scan(cur: Any) -> bool:
+    global _iterative_scan
+    if _iterative_scan is None:
+        cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        row = cur.fetchone()
+        match = re.match(r"(\d+)\.(\d+)", str(row[0])) if row else None
+        version = (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+        _iterative_scan = version >= _ITERATIVE_SCAN_VERSION
+        logger.debug(f"pgvector iterative index scans: {_iterative_scan}")
+    return _iterative_scan
+
+
+def query_videos(
+    query: str,
+    result_limit: int = 5,
+    probes: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    hybrid: bool = False,
+) -> tuple[list[str], list[str]]:
     """
     Queries the database for videos most semantically similar to the input query using vector search.
 
     Args:
         query (str): The search query string.
         result_limit (int): Maximum number of results to return.
+        probes (Optional[int]): ivfflat lists to scan (see ``search_settings_sql``).
+        ef_search (Optional[int]): hnsw candidate list size.
+        filters (Optional[Mapping[str, Any]]): Metadata restrictions, e.g.
+            ``{"date_from": date(2025, 8, 1), "session_type": "tuesday_session"}``
+            (see ``VIDEO_FILTERS`` and ``filtered_nearest_sql``).
+        hybrid (bool): Fuse the vector ranking with full-text matches of the
+            query (see ``hybrid_sql``); ``ef_search`` is raised to the
+            candidate count so hnsw can return every vector candidate.
 
     Returns:
         Tuple[list[str], list[str]]: A tuple containing two lists
             the first with video summaries and the second with their file paths.
     """
     logger.debug(f"Querying videos with query: {query} and limit: {result_limit}")
+    where, filter_params = filter_sql(filters or {})
     try:
-        encoded: Tensor = vector_model.encode(query)
+        query_embedding = embed_query(query)
     except Exception as e:  # noqa: BLE001
         logger.error("Failed to encode summary: %s", e)
         return ([], [])
-    query_embedding: list[float] = encoded.tolist()
 
-    conn: Optional[psycopg.Connection] = connect_db()
-    if conn is None:
-        logger.error("DB unavailable; skipping query_videos")
+    candidates = max(HYBRID_CANDIDATES, result_limit)
+    if hybrid:
+        # An hnsw scan returns at most ef_search rows (server default 40)
+        ef_search = max(_search_setting(ef_search, "HNSW_EF_SEARCH") or 0, candidates)
+
+    try:
+        with connection() as conn, conn.cursor() as cur:
+            iterative = bool(where) and _supports_iterative_scan(cur)
+            settings = search_settings_sql(probes, ef_search, iterative)
+            # Pipeline mode sends the settings and the search in one round trip
+            with conn.pipeline():
+                if settings is not None:
+                    cur.execute(*settings)
+                if hybrid:
+                    cur.execute(
+                        hybrid_sql(where, iterative),
+                        {
+                            **filter_params,
+                            "embedding": query_embedding,
+                            "query": query,
+                            "candidates": candidates,
+                            "rrf_k": RRF_K,
+                            "limit": result_limit,
+                        },
+                    )
+                elif where:
+                    cur.execute(
+                        filtered_nearest_sql(
+                            "videos", "id, summary, path", where, iterative
+                        ),
+                        {
+                            **filter_params,
+                            "embedding": query_embedding,
+                            "limit": result_limit,
+                        },
+                    )
+                else:
+                    cur.execute(
+                        nearest_sql("videos", "id, summary, path"),
+                        (query_embedding, result_limit),
+                    )
+            results = cur.fetchall()
+    except (DatabaseUnavailable, psycopg.Error) as e:
+        logger.error("Database error; skipping query_videos: %s", e)
         return ([], [])
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT id, summary, path
-        FROM videos
-        ORDER BY embedding <-> %s::vector
-        LIMIT %s;""",
-        (query_embedding, result_limit),
-    )
 
-    results = cur.fetchall()
     summaries = [result[1] for result in results]
     paths = [result[2] for result in results]
 
     logger.debug(f"Found {len(paths)} videos matching query: {query}")
 
-    cur.close()
-    conn.close()
-
     return (summaries, paths)
 
 
@@ -209,18 +874,51 @@ def video_file_indexed(file_path: str) -> bool:
     Returns:
         bool: True if the video is indexed, False otherwise.
     """
-    conn: Optional[psycopg.Connection] = connect_db()
-    if conn is None:
-        logger.error("DB unavailable; treating %s as not indexed", file_path)
+    try:
+        with connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT EXISTS(SELECT 1 FROM videos WHERE path = %s)", (file_path,)
+            )
+            row = cur.fetchone()
+    except (DatabaseUnavailable, psycopg.Error) as e:
+        logger.error("Database error; treating %s as not indexed: %s", file_path, e)
         return False
-    cur = conn.cursor()
-
-    cur.execute("SELECT EXISTS(SELECT 1 FROM videos WHERE path = %s)", (file_path,))
-    row = cur.fetchone()
     exists = row[0] if row is not None else False
     logger.debug(f"Video file indexed check for {file_path}: {exists}")
 
-    cur.close()
-    conn.close()
-
     return exists
+
+
+def query_segments(query: str, result_limit: int = 10) -> list[dict]:
+    """
+    Finds the transcript moments most semantically similar to the query.
+
+    Args:
+        query (str): The search query string.
+        result_limit (int): Maximum number of moments to return.
+
+    Returns:
+        list[dict]: ``path``, ``start_ms``, ``end_ms`` and ``text`` per hit,
+            best match first.
+    """
+    logger.debug(f"Querying segments with query: {query} and limit: {result_limit}")
+    try:
+        query_embedding = embed_query(query)
+    except Exception as e:  # noqa: BLE001
+        logger.error("Failed to encode query: %s", e)
+        return []
+
+    try:
+        with connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                nearest_sql("video_segments", "path, start_ms, end_ms, text"),
+                (query_embedding, result_limit),
+            )
+            rows = cur.fetchall()
+    except (DatabaseUnavailable, psycopg.Error) as e:
+        logger.error("Database error; skipping query_segments: %s", e)
+        return []
+    return [
+        {"path": path, "start_ms": start_ms, "end_ms": end_ms, "text": text}
+        for path, start_ms, end_ms, text in rows
+    ]
@@ -0,0 +1,226 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Per-call LLM instrumentation for the indexing stage.
+
+Every chat completion records its wall latency, time to first token, token
+counts, model, retry count and estimated cost into a process-wide
+``LLMMetrics`` collector. ``build_index`` turns the collected calls into an
+end-of-run report and a JSON file used for sizing concurrency and budgeting
+backfills.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens: (input, cached input, output). Override via indexing.prices.
+MODEL_PRICES: dict[str, tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+}
+# Batch API requests are billed at half price
+BATCH_DISCOUNT = 0.5
+
+
+def estimate_cost(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    cached_tokens: int = 0,
+    prices: Optional[dict] = None,
+    batch: bool = False,
+) -> Optional[float]:
+    """
+    Estimate the USD cost of one call, or None if the model has no known price.
+
+    Args:
+        model: Model name (dated snapshots fall back to their base name).
+        prompt_tokens: Prompt tokens, including cached ones.
+        completion_tokens: Completion tokens.
+        cached_tokens: Prompt tokens served from the provider's prefix cache.
+        prices: Overrides of ``MODEL_PRICES`` as {model: [input, cached, output]}.
+        batch: Apply the Batch API discount.
+    """
+    table = {**MODEL_PRICES, **{k: tuple(v) for k, v in (prices or {}).items()}}
+    price = table.get(model)
+    if price is None:
+        # e.g. "gpt-4o-mini-2024-07-18" -> "gpt-4o-mini"
+        matches = [name for name in table if model.startswith(name + "-")]
+        if not matches:
+            return None
+        price = table[max(matches, key=len)]
+    input_price, cached_price, output_price = price
+    cost = (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+    return round(cost * (BATCH_DISCOUNT if batch else 1.0), 8)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class LLMMetrics:
+    """
+    Thread-safe collector of per-call LLM records.
+    """
+
+    def __init__(self) -> None:
+        self._calls: list[dict] = []
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls = []
+            self.started = time.time()
+
+    def record(
+        self,
+        model: str,
+        stage: str,
+        usage: Any = None,
+        wall_s: Optional[float] = None,
+        ttft_s: Optional[float] = None,
+        retries: int = 0,
+        prices: Optional[dict] = None,
+        batch: bool = False,
+        error: Optional[str] = None,
+    ) -> dict:
+        """
+        Record one LLM call.
+
+        Args:
+            model: Model that served the call.
+            stage: "single", "map", "reduce" or "batch".
+            usage: SDK usage object (or dict) from the response; None on failure.
+            wall_s: Seconds from first attempt to final response, including
+                rate-limit waits and retries.
+            ttft_s: Seconds to the first content token of the final attempt;
+                None for non-streamed calls.
+            retries: Attempts beyond the first.
+            prices: Price overrides passed to ``estimate_cost``.
+            batch: Whether the call went through the Batch API.
+            error: Exception name for failed calls.
+
+        Returns:
+            dict: The stored record.
+        """
+        prompt = int(_usage_field(usage, "prompt_tokens"))
+        completion = int(_usage_field(usage, "completion_tokens"))
+        details = _usage_field(usage, "prompt_tokens_details", None)
+        cached = int(_usage_field(details, "cached_tokens"))
+        call = {
+            "model": model,
+            "stage": stage,
+            "wall_s": None if wall_s is None else round(wall_s, 4),
+            "ttft_s": None if ttft_s is None else round(ttft_s, 4),
+            "prompt_tokens": prompt,
+            "cached_tokens": cached,
+            "completion_tokens": completion,
+            "retries": retries,
+            "cost_usd": estimate_cost(
+                model, prompt, completion, cached, prices=prices, batch=batch
+            )
+            if error is None
+            else None,
+            "error": error,
+        }
+        with self._lock:
+            self._calls.append(call)
+        return call
+
+    @property
+    def calls(self) -> list[dict]:
+        with self._lock:
+            return list(self._calls)
+
+    def summary(self) -> dict:
+        """Aggregate the recorded calls overall and per (model, stage)."""
+        calls = self.calls
+        groups: dict[str, list[dict]] = {}
+        for call in calls:
+            groups.setdefault(f"{call['model']}/{call['stage']}", []).append(call)
+        return {
+            "started": self.started,
+            "elapsed_s": round(time.time() - self.started, 3),
+            "total": _aggregate(calls),
+            "by_model_stage": {key: _aggregate(group) for key, group in groups.items()},
+        }
+
+    def report(self) -> str:
+        """Human-readable end-of-run report."""
+        summary = self.summary()
+        lines = [f"LLM usage ({summary['elapsed_s']:.1f}s run):"]
+        for key, agg in [
+            ("total", summary["total"]),
+            *summary["by_model_stage"].items(),
+        ]:
+            cost = agg["cost_usd"]
+            lines.append(
+                f"  {key:<24} {agg['calls']} call(s), {agg['errors']} failed, {agg['retries']} retries | "
+                f"latency p50 {agg['wall_p50_s']}s p95 {agg['wall_p95_s']}s, ttft p50 {agg['ttft_p50_s']}s | "
+                f"{agg['prompt_tokens']} prompt ({agg['cached_tokens']} cached) + "
+                f"{agg['completion_tokens']} completion tokens | "
+                f"~${cost:.4f}" + ("" if agg["priced"] else " (some models unpriced)")
+            )
+        return "\n".join(lines)
+
+    def write(self, directory: str) -> str:
+        """Write the summary and every call record to a timestamped JSON file."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        path = os.path.join(directory, f"llm_metrics_{stamp}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"summary": self.summary(), "calls": self.calls}, f, indent=2)
+        return path
+
+
+def _usage_field(usage: Any, name: str, default: Any = 0) -> Any:
+    if usage is None:
+        return default
+    if isinstance(usage, dict):
+        value = usage.get(name, default)
+    else:
+        value = getattr(usage, name, default)
+    return default if value is None else value
+
+
+def _aggregate(calls: list[dict]) -> dict:
+    walls = [c["wall_s"] for c in calls if c["wall_s"] is not None]
+    ttfts = [c["ttft_s"] for c in calls if c["ttft_s"] is not None]
+    ok = [c for c in calls if c["error"] is None]
+    return {
+        "calls": len(calls),
+        "errors": len(calls) - len(ok),
+        "retries": sum(c["retries"] for c in calls),
+        "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+        "cached_tokens": sum(c["cached_tokens"] for c in calls),
+        "completion_tokens": sum(c["completion_tokens"] for c in calls),
+        "cost_usd": round(sum(c["cost_usd"] or 0.0 for c in ok), 6),
+        "priced": all(c["cost_usd"] is not None for c in ok),
+        "wall_p50_s": round(_percentile(walls, 50), 3) if walls else None,
+        "wall_p95_s": round(_percentile(walls, 95), 3) if walls else None,
+        "wall_max_s": round(max(walls), 3) if walls else None,
+        "ttft_p50_s": round(_percentile(ttfts, 50), 3) if ttfts else None,
+    }
+
+
+# Process-wide collector shared by the online and batch summarization paths
+llm_metrics = LLMMetrics()
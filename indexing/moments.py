@@ -0,0 +1,124 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Timestamped transcript windows ("moments") for segment-level search.
+
+A single summary embedding per video only tells a coach which 40-minute file
+to open. Here SRT segments are split into sentences, each sentence gets a time
+span (interpolated within its segment by character offset), and consecutive
+sentences are grouped into overlapping windows. Each window is embedded and
+stored in ``video_segments`` so search can return the moment, not just the file.
+"""
+
+import re
+from typing import Optional
+
+from indexing.compaction import normalize_whitespace
+from indexing.segments import timestamp_to_ms
+from indexing.srt_parser import parse_srt_with_timestamps
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text on sentence-ending punctuation followed by whitespace."""
+    text = normalize_whitespace(text)
+    return [s for s in _SENTENCE_END_RE.split(text) if s]
+
+
+def timed_sentences(segments: list[dict]) -> list[dict]:
+    """
+    Split parsed SRT segments into sentences with interpolated time spans.
+
+    Text without sentence punctuation is carried over into the next segment,
+    so a sentence spanning several subtitle lines starts where it started.
+
+    Args:
+        segments: Segments from ``parse_srt_with_timestamps``.
+
+    Returns:
+        list[dict]: ``{"start_ms", "end_ms", "text"}`` per sentence, in order.
+    """
+    sentences: list[dict] = []
+    carry: Optional[dict] = None
+    for seg in segments:
+        start = timestamp_to_ms(seg["start_time"])
+        end = max(start, timestamp_to_ms(seg["end_time"]))
+        text = normalize_whitespace(seg["text"])
+        if not text:
+            continue
+        parts = split_sentences(text)
+        offset = 0
+        for k, part in enumerate(parts):
+            pos = text.index(part, offset)
+            offset = pos + len(part)
+            part_start = start + (end - start) * pos // len(text)
+            part_end = start + (end - start) * offset // len(text)
+            if carry is not None:
+                part = f"{carry['text']} {part}"
+                part_start = carry["start_ms"]
+                carry = None
+            sentence = {"start_ms": part_start, "end_ms": part_end, "text": part}
+            if k == len(parts) - 1 and not part.endswith((".", "!", "?")):
+                carry = sentence
+            else:
+                sentences.append(sentence)
+    if carry is not None:
+        sentences.append(carry)
+    return sentences
+
+
+def window_sentences(
+    sentences: list[dict],
+    window: int = 5,
+    overlap: int = 1,
+    max_chars: int = 1500,
+) -> list[dict]:
+    """
+    Group consecutive sentences into (overlapping) windows.
+
+    Args:
+        sentences: Output of ``timed_sentences``.
+        window: Sentences per window.
+        overlap: Sentences shared by consecutive windows.
+        max_chars: Windows are cut early once their text reaches this length
+            (the embedding model truncates long inputs anyway).
+
+    Returns:
+        list[dict]: ``{"start_ms", "end_ms", "text"}`` per window.
+    """
+    if window <= 0 or not sentences:
+        return []
+    overlap = max(0, min(overlap, window - 1))
+    windows: list[dict] = []
+    i = 0
+    while i < len(sentences):
+        chunk = [sentences[i]]
+        length = len(sentences[i]["text"])
+        while (
+            len(chunk) < window
+            and i + len(chunk) < len(sentences)
+            and length < max_chars
+        ):
+            chunk.append(sentences[i + len(chunk)])
+            length += 1 + len(chunk[-1]["text"])
+        windows.append(
+            {
+                "start_ms": chunk[0]["start_ms"],
+                "end_ms": chunk[-1]["end_ms"],
+                "text": " ".join(s["text"] for s in chunk),
+            }
+        )
+        if i + len(chunk) >= len(sentences):
+            break
+        i += max(1, len(chunk) - overlap)
+    return windows
+
+
+def transcript_windows(srt_path: str, window: int = 5, overlap: int = 1) -> list[dict]:
+    """Windows of ``window`` sentences for one SRT transcript (see ``window_sentences``)."""
+    return window_sentences(
+        timed_sentences(parse_srt_with_timestamps(srt_path)), window, overlap
+    )
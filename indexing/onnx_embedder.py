@@ -0,0 +1,231 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""ONNX Runtime embedding backend for CPU-only nodes.
+
+``export_onnx_embedder`` converts a sentence-transformers model (transformer +
+CLS/mean pooling + optional normalisation) into a directory holding
+``model.onnx``, an optional dynamically int8-quantized ``model_int8.onnx``,
+the fast tokenizer and the pooling settings. ``OnnxEmbedder`` serves that
+directory with onnxruntime and ``tokenizers`` only, so API workers do not need
+to import torch, and exposes the subset of the ``SentenceTransformer.encode``
+API the indexing code uses. Outputs match the torch model up to numerical
+tolerance, so they stay compatible with vectors already stored in ``videos``.
+
+Requires the ``onnx`` extra (onnxruntime, onnx); exporting also needs torch.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = "embedder.json"
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def default_onnx_dir(model_name: str) -> str:
+    """Default export directory for ``model_name`` under ./data/models/onnx."""
+    return os.path.join("./data/models/onnx", model_name.replace("/", "__"))
+
+
+class OnnxEmbedder:
+    """
+    Sentence embedder running an exported model on onnxruntime (CPU).
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = False, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        config_path = os.path.join(model_dir, CONFIG_FILE)
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(
+                f"No exported ONNX embedder in {model_dir}; run "
+                "`python -m ops.export_onnx_embedder` first."
+            )
+        with open(config_path, encoding="utf-8") as f:
+            self.config: dict = json.load(f)
+
+        self.pooling: str = self.config["pooling"]
+        self.normalize: bool = self.config["normalize"]
+        self.input_names: list[str] = self.config["inputs"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(
+            pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"]
+        )
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        model_file = QUANTIZED_MODEL_FILE if quantized else MODEL_FILE
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.config["dim"])
+
+    def encode(
+        self,
+        sentences: Union[str, list[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        convert_to_numpy: bool = True,
+        **_: Any,
+    ) -> np.ndarray:
+        """
+        Embed one sentence (1-D result) or a list of sentences (2-D result).
+
+        Sentences are sorted by length before batching to minimise padding,
+        as sentence-transformers does; results are returned in input order.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        dim = self.get_sentence_embedding_dimension()
+        if not texts:
+            return np.zeros((0, dim), dtype=np.float32)
+
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        pooled = np.empty((len(texts), dim), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            idx = order[start : start + batch_size]
+            pooled[idx] = self._embed_batch([texts[i] for i in idx])
+
+        if self.normalize or normalize_embeddings:
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            pooled = pooled / np.clip(norms, 1e-12, None)
+        return pooled[0] if single else pooled
+
+    def _embed_batch(self, texts: list[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        arrays = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array(
+                [e.attention_mask for e in encodings], dtype=np.int64
+            ),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(
+            None, {name: arrays[name] for name in self.input_names}
+        )[0]
+        if self.pooling == "cls":
+            return hidden[:, 0]
+        mask = arrays["attention_mask"][..., None].astype(hidden.dtype)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def export_onnx_embedder(
+    model_name: str,
+    out_dir: str,
+    quantize: bool = True,
+    opset: int = 17,
+) -> str:
+    """
+    Export a sentence-transformers model for ``OnnxEmbedder``.
+
+    Args:
+        model_name (str): Hub id or local path of the sentence-transformers model.
+        out_dir (str): Directory to write the model, tokenizer and settings to.
+        quantize (bool): Also write a dynamically int8-quantized copy.
+        opset (int): ONNX opset version.
+
+    Returns:
+        str: ``out_dir``.
+
+    Raises:
+        ValueError: If the model's pooling is neither CLS nor mean.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    st = SentenceTransformer(model_name, device="cpu")
+    st.eval()
+    transformer = st[0]
+    pooling = next(m for m in st if isinstance(m, Pooling))
+    pooling_config = pooling.get_config_dict()
+    # Older sentence-transformers releases use one boolean flag per mode
+    mode = pooling_config.get("pooling_mode") or next(
+        (
+            name
+            for name, flag in (
+                ("cls", "pooling_mode_cls_token"),
+                ("mean", "pooling_mode_mean_tokens"),
+            )
+            if pooling_config.get(flag)
+        ),
+        None,
+    )
+    if mode not in ("cls", "mean"):
+        raise ValueError(f"Unsupported pooling for ONNX export: {pooling_config}")
+
+    tokenizer = transformer.tokenizer
+    sample = tokenizer(["export sample text"], return_tensors="pt")
+    input_names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample
+    ]
+
+    class _Encoder(torch.nn.Module):
+        def __init__(self, model: Any) -> None:
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs: Any) -> Any:
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    os.makedirs(out_dir, exist_ok=True)
+    model_path = os.path.join(out_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(transformer.auto_model),
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=opset,
+            dynamo=False,
+        )
+    tokenizer.backend_tokenizer.save(os.path.join(out_dir, TOKENIZER_FILE))
+
+    config = {
+        "model": model_name,
+        "pooling": mode,
+        "normalize": any(isinstance(m, Normalize) for m in st),
+        "max_seq_length": st.max_seq_length,
+        "dim": st.get_sentence_embedding_dimension(),
+        "inputs": input_names,
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+    }
+    with open(os.path.join(out_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            model_path,
+            os.path.join(out_dir, QUANTIZED_MODEL_FILE),
+            weight_type=QuantType.QInt8,
+        )
+    logger.info(f"Exported {model_name} to {out_dir} (pooling={mode})")
+    return out_dir
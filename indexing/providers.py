@@ -0,0 +1,189 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""LLM providers used by the indexing stage.
+
+Every supported provider speaks the OpenAI chat completions protocol, so one
+``ChatProvider`` covers both the hosted API ("openai") and a local
+OpenAI-compatible server ("local"). Providers are cached per connection
+settings and share one pooled HTTP client across all worker threads.
+
+Completions are streamed by default (``provider.stream``) so the time to the
+first content token can be measured; the chunks are reassembled into a
+response shaped like a non-streamed ``ChatCompletion``.
+"""
+
+import logging
+import os
+import threading
+import time
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Optional
+
+from core.pipeline_models import SUPPORTED_PROVIDERS, IndexingConfig, ProviderConfig
+
+if TYPE_CHECKING:  # imported lazily: the openai SDK is slow to import
+    from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+
+class ChatProvider:
+    """
+    OpenAI-compatible chat completion endpoint with pooled connections and an
+    optional cap on requests in flight.
+    """
+
+    def __init__(self, config: ProviderConfig, client: Optional[Any] = None) -> None:
+        self.config = config
+        self._client = client
+        self._lock = threading.Lock()
+        # Per-thread timing of the most recent request (httpx runs in the caller's thread)
+        self._timing = threading.local()
+        self._slots: Optional[threading.BoundedSemaphore] = (
+            threading.BoundedSemaphore(config.max_concurrency)
+            if config.max_concurrency > 0
+            else None
+        )
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    @property
+    def client(self) -> Any:
+        """The underlying OpenAI SDK client, created on first use."""
+        with self._lock:
+            if self._client is None:
+                self._client = self._create_client()
+            return self._client
+
+    def warmup(self) -> None:
+        """Create the client and its connection pool ahead of the first request."""
+        _ = self.client
+
+    def _create_client(self) -> "OpenAI":
+        import httpx
+        from openai import OpenAI
+
+        cfg = self.config
+        api_key = os.getenv(cfg.api_key_env) if cfg.api_key_env else None
+        if api_key is None and not cfg.api_key_env:
+            # OpenAI-compatible local servers typically ignore the key
+            api_key = "not-needed"
+        http_client = httpx.Client(
+            timeout=cfg.timeout,
+            limits=httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_connections,
+            ),
+        )
+        logger.debug(
+            f"Creating {cfg.name} client for {cfg.base_url or 'default endpoint'}"
+        )
+        # Retries are handled by call_with_backoff so the rate limiter sees every 429.
+        return OpenAI(
+            api_key=api_key,
+            base_url=cfg.base_url or None,
+            timeout=cfg.timeout,
+            max_retries=0,
+            http_client=http_client,
+        )
+
+    @property
+    def last_ttft_s(self) -> Optional[float]:
+        """
+        Time to the first content token of this thread's most recent request.
+
+        None when the request was not streamed or produced no content.
+        """
+        return getattr(self._timing, "ttft", None)
+
+    def complete(self, request: dict) -> Any:
+        """Send one chat completion request (keyword arguments for ``create``)."""
+        if self._slots is None:
+            return self._timed_create(request)
+        with self._slots:
+            return self._timed_create(request)
+
+    def _timed_create(self, request: dict) -> Any:
+        self._timing.ttft = None
+        if not self.config.stream:
+            return self.client.chat.completions.create(**request)
+        started = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        parts: list[str] = []
+        usage = model = finish_reason = None
+        try:
+            for chunk in stream:
+                model = model or getattr(chunk, "model", None)
+                # Only the final chunk carries usage (include_usage)
+                usage = getattr(chunk, "usage", None) or usage
+                for choice in getattr(chunk, "choices", None) or []:
+                    content = getattr(choice.delta, "content", None)
+                    if content:
+                        if self._timing.ttft is None:
+                            self._timing.ttft = time.perf_counter() - started
+                        parts.append(content)
+                    finish_reason = choice.finish_reason or finish_reason
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+        choices = []
+        if parts or finish_reason is not None:
+            message = SimpleNamespace(role="assistant", content="".join(parts))
+            choices.append(
+                SimpleNamespace(index=0, finish_reason=finish_reason, message=message)
+            )
+        return SimpleNamespace(model=model, choices=choices, usage=usage)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None and hasattr(self._client, "close"):
+                self._client.close()
+            self._client = None
+
+
+_providers: dict[tuple, ChatProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(configuration: IndexingConfig) -> ChatProvider:
+    """
+    Return the shared provider for ``configuration.ai_provider``.
+
+    Raises:
+        ValueError: If the AI provider is unsupported.
+    """
+    name = configuration.ai_provider
+    if name not in SUPPORTED_PROVIDERS:
+        raise ValueError(
+            f"Unsupported AI provider: {name}. Supported providers: {', '.join(SUPPORTED_PROVIDERS)}."
+        )
+    cfg = configuration.provider
+    key = (
+        name,
+        cfg.base_url,
+        cfg.api_key_env,
+        cfg.timeout,
+        cfg.max_connections,
+        cfg.max_concurrency,
+    )
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = _providers[key] = ChatProvider(cfg)
+        return provider
+
+
+def close_providers() -> None:
+    """Close every cached provider's HTTP connections."""
+    with _providers_lock:
+        providers = list(_providers.values())
+        _providers.clear()
+    for provider in providers:
+        provider.close()
@@ -0,0 +1,270 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Query embedding cache and query log for the search API.
+
+The frontend sends the same handful of searches over and over ("attack
+lineout" is its default), so ``query_videos`` looks embeddings up in a bounded
+LRU cache keyed by the normalised query text before encoding. A query log
+counts how often each normalised query is searched and is persisted to disk,
+so a fresh API process can pre-encode the most popular queries on startup.
+Several API workers may share the log file: each save merges its new counts
+into the file under a lock instead of overwriting the others'.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are not serialised across processes
+    fcntl = None  # type: ignore[assignment]
+
+load_dotenv()
+QUERY_CACHE_SIZE: int = int(os.getenv("QUERY_CACHE_SIZE", 1024))
+QUERY_CACHE_TTL: float = float(os.getenv("QUERY_CACHE_TTL", 3600))
+QUERY_LOG_PATH: str = os.getenv("QUERY_LOG_PATH", "./data/derived/query_log.json")
+
+logger = logging.getLogger(__name__)
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str, casefold: bool = False) -> str:
+    """
+    Canonical form of a search query used as the cache and log key.
+
+    Collapsing whitespace never changes the embedding. Unicode (NFKC) and case
+    folding only keep it unchanged for models whose tokenizer lowercases its
+    input (``registry.lowercases_input``), so they are applied on request.
+    """
+    if casefold:
+        query = unicodedata.normalize("NFKC", query).casefold()
+    return _SPACE_RE.sub(" ", query).strip()
+
+
+class QueryEmbeddingCache:
+    """
+    Thread-safe LRU cache of query embeddings with an optional TTL.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_s: float = 3600.0) -> None:
+        """
+        Args:
+            max_size (int): Maximum number of cached queries (0 disables caching).
+            ttl_s (float): Seconds an entry stays valid (0 means no expiry).
+        """
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry[0])
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_s > 0 and time.monotonic() - stored_at > self.ttl_s
+
+    def get(self, key: str) -> Optional[list[float]]:
+        """Return the cached embedding for a normalised query and count a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, embedding: list[float]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class QueryLog:
+    """
+    Counts normalised search queries and persists the counts as JSON.
+
+    Counts recorded since the last save are added to whatever the file holds
+    at save time, so processes sharing ``path`` do not lose each other's
+    searches.
+    """
+
+    def __init__(
+        self, path: Optional[str], max_entries: int = 10_000, save_every: int = 100
+    ) -> None:
+        """
+        Args:
+            path (Optional[str]): JSON file to load from and save to (None keeps
+                the log in memory only).
+            max_entries (int): Distinct queries kept; the least frequent are
+                dropped beyond this.
+            save_every (int): Save after this many new records (0 disables);
+                periodic saves run in a background thread.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.save_every = save_every
+        self._counts: dict[str, int] = {}
+        # Increments not yet merged into the file
+        self._pending: dict[str, int] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._saver: Optional[threading.Thread] = None
+        self.load()
+
+    def load(self) -> None:
+        counts = self._read()
+        if counts is None:
+            return
+        with self._lock:
+            self._counts = counts
+
+    def _read(self) -> Optional[dict[str, int]]:
+        """Counts stored in the file; None if there is none or it is unreadable."""
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                counts = json.load(f)
+            return {str(q): int(n) for q, n in counts.items()}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable query log {self.path}: {e}")
+            return None
+
+    def record(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._pending[key] = self._pending.get(key, 0) + 1
+            if len(self._counts) > self.max_entries:
+                self._prune()
+            self._unsaved += 1
+            due = self.save_every > 0 and self._unsaved >= self.save_every
+            # Saving takes a file lock and rewrites the file: keep it off the
+            # request thread, and let a running save pick up these counts later
+            if due and (self._saver is None or not self._saver.is_alive()):
+                self._saver = threading.Thread(
+                    target=self.save, name="query-log-save", daemon=True
+                )
+                self._saver.start()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for a background save started by ``record`` to finish."""
+        saver = self._saver
+        if saver is not None:
+            saver.join(timeout)
+
+    def _prune(self) -> None:
+        self._counts = self._top_entries(self._counts)
+
+    def _top_entries(self, counts: dict[str, int]) -> dict[str, int]:
+        return dict(sorted(counts.items(), key=lambda kv: -kv[1])[: self.max_entries])
+
+    def top(self, n: int) -> list[str]:
+        """The ``n`` most frequent queries, most frequent first."""
+        with self._lock:
+            ranked = sorted(self._counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [query for query, _ in ranked[:n]]
+
+    def save(self) -> None:
+        """
+        Merge the counts recorded since the last save into the file.
+
+        The read-merge-replace runs under an exclusive lock on ``<path>.lock``
+        and writes through a private temporary file, so concurrent savers in
+        other processes neither clobber nor drop each other's counts.
+        Afterwards this log also sees the other processes' counts.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._unsaved = 0
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(f"{self.path}.lock", "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                merged = self._read() or {}
+                for query, n in pending.items():
+                    merged[query] = merged.get(query, 0) + n
+                merged = self._top_entries(merged)
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=directory, prefix=".query_log.", suffix=".tmp"
+                )
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(merged, f, indent=2, sort_keys=True)
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+        except OSError as e:
+            logger.warning(f"Failed to save query log {self.path}: {e}")
+            with self._lock:
+                # Keep the increments for the next save
+                for query, n in pending.items():
+                    self._pending[query] = self._pending.get(query, 0) + n
+            return
+        with self._lock:
+            for query, n in self._pending.items():
+                merged[query] = merged.get(query, 0) + n
+            self._counts = self._top_entries(merged)
+
+
+query_cache = QueryEmbeddingCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+query_log = QueryLog(QUERY_LOG_PATH or None)
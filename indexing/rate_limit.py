@@ -0,0 +1,221 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Client-side rate limiting and retry for LLM requests.
+
+``RateLimiter`` combines two token buckets (requests per minute and tokens per
+minute) shared by every worker thread, and optionally caps how many requests
+are in flight at once. When the provider still answers 429 the limiter pauses
+all workers and halves its request rate, recovering gradually on subsequent
+successes.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextlib import AbstractContextManager, nullcontext
+from typing import Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Lowest fraction of the configured request rate adaptive backoff may reach.
+_MIN_RATE_FACTOR = 0.1
+# Fraction of the configured rate restored after each successful request.
+_RECOVERY_STEP = 0.05
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at ``rate_per_minute``.
+    A non-positive rate disables limiting.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate_per_minute = float(rate_per_minute or 0)
+        self.capacity = float(capacity or self.rate_per_minute)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate_per_minute <= 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(
+            self.capacity, self._tokens + elapsed * self.rate_per_minute / 60.0
+        )
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Block until ``amount`` tokens are available and take them.
+
+        Requests larger than the bucket are clamped to its capacity so they
+        can still proceed once the bucket is full.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        if self.unlimited:
+            return 0.0
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) * 60.0 / self.rate_per_minute
+            self._sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter with adaptive backoff.
+
+    A positive ``max_concurrency`` also bounds the requests in flight across
+    every thread sharing the limiter, however they are nested (e.g. map calls
+    issued from inside per-file workers).
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        max_concurrency: int = 0,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute, clock=clock, sleep=sleep)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock, sleep=sleep)
+        self._slots: Optional[threading.BoundedSemaphore] = (
+            threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        )
+        self._base_rpm = self.requests.rate_per_minute
+        self._pause_until = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Wait for any backoff pause, then for request and token budget."""
+        with self._lock:
+            pause = self._pause_until - self._clock()
+        if pause > 0:
+            self._sleep(pause)
+        self.requests.acquire(1)
+        if tokens:
+            self.tokens.acquire(tokens)
+
+    def in_flight(self) -> AbstractContextManager:
+        """Context holding one of the ``max_concurrency`` request slots."""
+        return self._slots if self._slots is not None else nullcontext()
+
+    def on_rate_limited(self, delay: float) -> None:
+        """Pause every worker for ``delay`` seconds and halve the request rate."""
+        with self._lock:
+            self._pause_until = max(self._pause_until, self._clock() + delay)
+            if not self.requests.unlimited:
+                self.requests.rate_per_minute = max(
+                    self._base_rpm * _MIN_RATE_FACTOR,
+                    self.requests.rate_per_minute / 2,
+                )
+        logger.warning(
+            "Rate limited by provider; pausing %.1fs (rpm now %.0f)",
+            delay,
+            self.requests.rate_per_minute,
+        )
+
+    def on_success(self) -> None:
+        """Gradually restore the configured request rate."""
+        if self.requests.unlimited:
+            return
+        with self._lock:
+            self.requests.rate_per_minute = min(
+                self._base_rpm,
+                self.requests.rate_per_minute + self._base_rpm * _RECOVERY_STEP,
+            )
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def call_with_backoff(
+    func: Callable[[], T],
+    limiter: Optional[RateLimiter] = None,
+    tokens: int = 0,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Call ``func`` under ``limiter``, retrying 429s and transient failures.
+
+    Rate-limit responses honour ``retry-after`` and pause the whole limiter;
+    connection errors and 5xx responses back off exponentially with jitter.
+    A concurrency slot of the limiter is held only while ``func`` runs, never
+    during backoff sleeps.
+
+    Raises:
+        Exception: The last error once ``max_retries`` is exhausted, or any
+            non-retryable error immediately.
+    """
+    import openai  # deferred: the SDK is slow to import
+
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire(tokens)
+        try:
+            with limiter.in_flight() if limiter is not None else nullcontext():
+                result = func()
+        except (
+            openai.RateLimitError,
+            openai.APIConnectionError,
+            openai.InternalServerError,
+        ) as exc:
+            if attempt >= max_retries:
+                raise
+            delay = min(max_delay, base_delay * 2**attempt) * (1 + random.random() / 2)
+            attempt += 1
+            if isinstance(exc, openai.RateLimitError):
+                delay = _retry_after(exc) or delay
+                if limiter is not None:
+                    limiter.on_rate_limited(delay)
+                    continue
+            logger.warning(
+                "LLM call failed (%s); retry %d/%d in %.1fs",
+                type(exc).__name__,
+                attempt,
+                max_retries,
+                delay,
+            )
+            sleep(delay)
+            continue
+        if limiter is not None:
+            limiter.on_success()
+        return result
@@ -0,0 +1,198 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Lazily initialised, process-wide model registry.
+
+Importing the indexing modules must stay cheap: the CLI's ``--version`` and
+``--status``, test collection and API worker boot should not pay for torch or
+the embedding model. Heavy resources are therefore created on first use, once
+per process, behind a lock. ``warmup`` loads them up front (e.g. on API
+startup) and ``release`` frees them again.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# TODO: Evaluate different model options. This is still decent,
+#       but there are faster ones with reduced semantic quality.
+DEFAULT_EMBEDDING_MODEL = "BAAI/bge-small-en"
+
+
+class LazyResource(Generic[T]):
+    """
+    A value built by ``factory`` on first access, shared by all threads.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]) -> None:
+        self.name = name
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not None
+
+    def get(self) -> T:
+        value = self._value
+        if value is not None:
+            return value
+        with self._lock:
+            if self._value is None:
+                started = time.perf_counter()
+                self._value = self._factory()
+                logger.info(
+                    f"Loaded {self.name} in {time.perf_counter() - started:.2f}s"
+                )
+            return self._value
+
+    def set(self, value: Optional[T]) -> None:
+        """Replace the held value (e.g. with a stand-in in tests)."""
+        with self._lock:
+            self._value = value
+
+    def release(self) -> None:
+        with self._lock:
+            value, self._value = self._value, None
+        close = getattr(value, "close", None)
+        if callable(close):
+            close()
+
+
+def embedding_model_name() -> str:
+    """Embedding model id; read at load time so ``.env`` values apply."""
+    return os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def embedding_backend() -> str:
+    """
+    Embedding backend from ``EMBEDDING_BACKEND``: "torch" (default),
+    "onnx" or "onnx-int8" (ONNX Runtime, optionally int8-quantized).
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    backend = os.getenv("EMBEDDING_BACKEND", "torch").strip().lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unsupported EMBEDDING_BACKEND: {backend}. Expected one of {EMBEDDING_BACKENDS}."
+        )
+    return backend
+
+
+def load_embedding_model(model_name: Optional[str] = None) -> Any:
+    """
+    Build a new embedding model with the configured backend.
+
+    Most callers want the shared instance from ``get_embedding_model``; this is
+    for jobs that need a different model side by side (e.g. re-embedding).
+
+    Args:
+        model_name (Optional[str]): Model id; defaults to ``EMBEDDING_MODEL``.
+    """
+    model_name = model_name or embedding_model_name()
+    backend = embedding_backend()
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(model_name)
+
+    from indexing.onnx_embedder import OnnxEmbedder, default_onnx_dir
+
+    # EMBEDDING_ONNX_DIR holds the export of EMBEDDING_MODEL only
+    override = os.getenv("EMBEDDING_ONNX_DIR")
+    if model_name != embedding_model_name():
+        override = None
+    model_dir = override or default_onnx_dir(model_name)
+    logger.info(f"Using {backend} embedding backend from {model_dir}")
+    return OnnxEmbedder(
+        model_dir,
+        quantized=backend == "onnx-int8",
+        threads=int(os.getenv("EMBEDDING_THREADS", "0")),
+    )
+
+
+def _shared_embedding_model() -> Any:
+    # With EMBEDDING_SERVICE_SOCKET set, workers share one model process
+    socket_path = os.getenv("EMBEDDING_SERVICE_SOCKET")
+    if socket_path:
+        from indexing.embedding_service import EmbeddingClient
+
+        logger.info(f"Using embedding service at {socket_path}")
+        return EmbeddingClient(socket_path)
+    return load_embedding_model()
+
+
+embedding_model: LazyResource[Any] = LazyResource(
+    "embedding model", _shared_embedding_model
+)
+
+
+def get_embedding_model() -> Any:
+    """
+    Return the shared sentence embedding model, loading it on first use.
+
+    When ``EMBEDDING_SERVICE_SOCKET`` is set this is a client of the embedding
+    service (see ``indexing.embedding_service``) with the same ``encode`` API.
+    """
+    return embedding_model.get()
+
+
+def lowercases_input(model: Any) -> bool:
+    """
+    Whether ``model``'s tokenizer lowercases text, so the case of a query
+    cannot change its embedding.
+
+    Models without an inspectable tokenizer (e.g. the embedding service
+    client) count as cased.
+    """
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return False
+    if getattr(tokenizer, "do_lower_case", False):
+        return True
+    # Fast transformers tokenizers wrap a ``tokenizers.Tokenizer``
+    backend = getattr(tokenizer, "backend_tokenizer", tokenizer)
+    normalizer = getattr(backend, "normalizer", None)
+    try:
+        return normalizer is not None and normalizer.normalize_str("A") == "a"
+    except Exception:  # noqa: BLE001
+        return False
+
+
+def warmup(embeddings: bool = True, indexing_config: Optional[Any] = None) -> None:
+    """
+    Load shared resources ahead of the first request.
+
+    Args:
+        embeddings (bool): Load the embedding model (and run one encode so lazy
+            kernels are initialised too).
+        indexing_config (Optional[IndexingConfig]): Also create the LLM client
+            for this configuration's provider.
+    """
+    if embeddings:
+        get_embedding_model().encode("warmup")
+    if indexing_config is not None:
+        from indexing.providers import get_provider
+
+        get_provider(indexing_config).warmup()
+
+
+def release() -> None:
+    """Drop the embedding model and close pooled LLM connections."""
+    from indexing.providers import close_providers
+
+    embedding_model.release()
+    close_providers()
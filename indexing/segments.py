@@ -0,0 +1,199 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Structured transcript segments stored alongside SRT files.
+
+Whisper produces rich per-segment data (timings, log-probabilities) which the
+SRT format throws away. We keep a compact JSON sidecar next to every SRT so
+downstream consumers can load segments directly instead of re-parsing text.
+
+Sidecar layout (``<name>.segments.json``)::
+
+    {"version": 1, "segments": [{"start_ms": 0, "end_ms": 2000,
+                                 "text": "...", "confidence": 0.91,
+                                 "tier": 1}, ...]}
+
+``tier`` records which transcription pass produced the segment: 1 for the
+primary model, 2 for regions re-transcribed by the refinement model.
+"""
+
+import json
+import math
+import os
+from typing import Any, Optional
+
+SEGMENTS_SUFFIX = ".segments.json"
+SEGMENTS_VERSION = 1
+
+
+def segments_path_for(srt_path: str) -> str:
+    """Return the sidecar segments path for an SRT file."""
+    return os.path.splitext(srt_path)[0] + SEGMENTS_SUFFIX
+
+
+def ms_to_timestamp(ms: int) -> str:
+    """Format integer milliseconds as an SRT timestamp ("00:01:23,456")."""
+    ms = max(0, int(ms))
+    hours, rem = divmod(ms, 3_600_000)
+    minutes, rem = divmod(rem, 60_000)
+    seconds, millis = divmod(rem, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
+
+
+def timestamp_to_ms(ts: str) -> int:
+    """Parse an SRT timestamp ("00:01:23,456") into integer milliseconds."""
+    time_part, ms_part = ts.strip().split(",")
+    h, m, s = map(int, time_part.split(":"))
+    return ((h * 60 + m) * 60 + s) * 1000 + int(ms_part)
+
+
+def _confidence(avg_logprob: Optional[float]) -> Optional[float]:
+    if avg_logprob is None:
+        return None
+    return round(math.exp(min(0.0, float(avg_logprob))), 3)
+
+
+def _to_ms(seconds: Any) -> int:
+    return int(round(float(seconds or 0.0) * 1000))
+
+
+def segments_from_whisper(
+    result: dict, tier: int = 1, offset_ms: int = 0
+) -> list[dict]:
+    """Convert a Whisper JSON result into compact segment dictionaries.
+
+    Args:
+        result: Parsed Whisper ``--output_format json`` document.
+        tier: Transcription tier that produced ``result``.
+        offset_ms: Added to every timestamp (for results of an audio slice).
+
+    Returns:
+        List of segments with integer-millisecond ``start_ms``/``end_ms``,
+        stripped ``text``, a 0..1 ``confidence`` (exp of avg log-prob) and ``tier``.
+    """
+    segments: list[dict] = []
+    for seg in result.get("segments", []):
+        text = str(seg.get("text", "")).strip()
+        if not text:
+            continue
+        segments.append(
+            {
+                "start_ms": _to_ms(seg.get("start")) + offset_ms,
+                "end_ms": _to_ms(seg.get("end")) + offset_ms,
+                "text": text,
+                "confidence": _confidence(seg.get("avg_logprob")),
+                "tier": tier,
+            }
+        )
+    return segments
+
+
+def low_confidence_regions(
+    result: dict,
+    min_avg_logprob: float,
+    max_no_speech_prob: float,
+    max_compression_ratio: float,
+    padding_ms: int = 0,
+) -> list[tuple[int, int]]:
+    """Find time regions of a Whisper result worth re-transcribing.
+
+    A segment is flagged when its average log-probability is below
+    ``min_avg_logprob`` or its no-speech probability / compression ratio exceed
+    the given maxima. Flagged segments are padded and merged when they touch.
+
+    Returns:
+        Sorted, non-overlapping (start_ms, end_ms) regions.
+    """
+    regions: list[tuple[int, int]] = []
+    for seg in result.get("segments", []):
+        flagged = (
+            float(seg.get("avg_logprob", 0.0)) < min_avg_logprob
+            or float(seg.get("no_speech_prob", 0.0)) > max_no_speech_prob
+            or float(seg.get("compression_ratio", 0.0)) > max_compression_ratio
+        )
+        if not flagged:
+            continue
+        start = max(0, _to_ms(seg.get("start")) - padding_ms)
+        end = _to_ms(seg.get("end")) + padding_ms
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def _midpoint(seg: dict) -> int:
+    return (seg["start_ms"] + seg["end_ms"]) // 2
+
+
+def merge_tiers(
+    segments: list[dict], region: tuple[int, int], replacement: list[dict]
+) -> list[dict]:
+    """Replace the segments inside ``region`` with ``replacement``.
+
+    Segments whose midpoint falls inside the region are dropped. The region
+    may be padded for context, so the replacement is trimmed to the span of
+    the dropped segments and neighbours are clipped to it: timestamps never
+    overlap and words in the padding are not transcribed twice. If the
+    replacement pass produced nothing there, the original segments are kept.
+    """
+    start, end = region
+    inside = [seg for seg in segments if start <= _midpoint(seg) < end]
+    if inside:
+        start = min(seg["start_ms"] for seg in inside)
+        end = max(seg["end_ms"] for seg in inside)
+    clipped = [
+        {
+            **seg,
+            "start_ms": max(seg["start_ms"], start),
+            "end_ms": min(seg["end_ms"], end),
+        }
+        for seg in replacement
+        if start <= _midpoint(seg) < end
+    ]
+    if not clipped:
+        return segments
+    kept = []
+    for seg in segments:
+        if start <= _midpoint(seg) < end:
+            continue
+        if _midpoint(seg) < start:
+            seg = {**seg, "end_ms": min(seg["end_ms"], start)}
+        else:
+            seg = {**seg, "start_ms": max(seg["start_ms"], end)}
+        kept.append(seg)
+    return sorted(kept + clipped, key=lambda seg: seg["start_ms"])
+
+
+def write_segments(segments: list[dict], path: str) -> None:
+    """Write segments to a compact JSON sidecar file."""
+    payload = {"version": SEGMENTS_VERSION, "segments": segments}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def read_segments(path: str) -> list[dict]:
+    """Read segments from a JSON sidecar file.
+
+    Raises:
+        ValueError: If the file has an unsupported version.
+    """
+    with open(path, encoding="utf-8") as f:
+        payload: Any = json.load(f)
+    if payload.get("version") != SEGMENTS_VERSION:
+        raise ValueError(f"Unsupported segments version in {path}")
+    return list(payload.get("segments", []))
+
+
+def write_srt(segments: list[dict], srt_path: str) -> None:
+    """Render segments as an SRT file."""
+    blocks = []
+    for i, seg in enumerate(segments, 1):
+        blocks.append(
+            f"{i}\n{ms_to_timestamp(seg['start_ms'])} --> "
+            f"{ms_to_timestamp(seg['end_ms'])}\n{seg['text']}\n"
+        )
+    with open(srt_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(blocks))
@@ -5,6 +5,15 @@
 
 """Core utilities for processing SRT transcript files."""
 
+import os
+
+from indexing.segments import (
+    ms_to_timestamp,
+    read_segments,
+    segments_path_for,
+    timestamp_to_ms,
+)
+
 
 def calculate_duration(start_time: str, end_time: str) -> float:
     """Calculate duration in seconds from SRT timestamps.
@@ -32,12 +41,28 @@ def calculate_duration(start_time: str, end_time: str) -> float:
 def parse_srt_with_timestamps(srt_path: str) -> list[dict]:
     """Extract timestamped segments from SRT files.
 
+    If a structured segments sidecar exists next to the SRT it is used instead
+    of re-parsing the subtitle text.
+
     Args:
         srt_path: Path to SRT transcript file
 
     Returns:
         List of segment dictionaries with timestamps and text
     """
+    sidecar = segments_path_for(srt_path)
+    if os.path.exists(sidecar):
+        return [
+            {
+                "sequence": str(i),
+                "start_time": ms_to_timestamp(seg["start_ms"]),
+                "end_time": ms_to_timestamp(seg["end_ms"]),
+                "text": seg["text"],
+                "duration": (seg["end_ms"] - seg["start_ms"]) / 1000.0,
+            }
+            for i, seg in enumerate(read_segments(sidecar), 1)
+        ]
+
     with open(srt_path, encoding="utf-8") as f:
         content = f.read()
 
@@ -67,6 +92,32 @@ def parse_srt_with_timestamps(srt_path: str) -> list[dict]:
     return segments
 
 
+def load_segments(srt_path: str) -> list[dict]:
+    """Load compact segments for a transcript.
+
+    Prefers the structured sidecar written at transcription time and falls back
+    to parsing the SRT file (in which case ``confidence`` is unknown).
+
+    Args:
+        srt_path: Path to the SRT transcript file
+
+    Returns:
+        List of segments with ``start_ms``, ``end_ms``, ``text`` and ``confidence``
+    """
+    sidecar = segments_path_for(srt_path)
+    if os.path.exists(sidecar):
+        return read_segments(sidecar)
+    return [
+        {
+            "start_ms": timestamp_to_ms(seg["start_time"]),
+            "end_ms": timestamp_to_ms(seg["end_time"]),
+            "text": seg["text"],
+            "confidence": None,
+        }
+        for seg in parse_srt_with_timestamps(srt_path)
+    ]
+
+
 def load_srt_text(srt_path: str) -> str:
     """Load the text content from an SRT file.
 
@@ -76,5 +127,5 @@ def load_srt_text(srt_path: str) -> str:
     Returns:
         The combined text content of all segments
     """
-    segments = parse_srt_with_timestamps(srt_path)
+    segments = load_segments(srt_path)
     return " ".join(segment["text"] for segment in segments)
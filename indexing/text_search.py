@@ -0,0 +1,46 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Full-text search configuration shared by the schema and hybrid queries.
+
+Embeddings capture what a session is about but blur exact names such as
+"3-2-1 ruck drill". ``videos.search_tsv`` is a stored generated ``tsvector``
+over the summary (weight A) and, when it was indexed, the transcript
+(weight B), backed by a GIN index. ``ops.db_admin`` creates it from
+``search_document_sql`` and ``query_videos(..., hybrid=True)`` parses queries
+with the same text search configuration (``TEXT_SEARCH_CONFIG``); both must
+agree or the index cannot match.
+"""
+
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEXT_SEARCH_CONFIG = "english"
+# Interpolated into DDL and queries, so only plain identifiers are accepted
+_CONFIG_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+# Reciprocal rank fusion constant: score = sum(1 / (RRF_K + rank))
+RRF_K = 60
+
+
+def text_search_config() -> str:
+    """Configuration from ``TEXT_SEARCH_CONFIG``; invalid names fall back to english."""
+    config = os.getenv("TEXT_SEARCH_CONFIG", DEFAULT_TEXT_SEARCH_CONFIG).strip()
+    if not _CONFIG_RE.match(config):
+        logger.warning(
+            f"Invalid TEXT_SEARCH_CONFIG {config!r}; using {DEFAULT_TEXT_SEARCH_CONFIG}"
+        )
+        return DEFAULT_TEXT_SEARCH_CONFIG
+    return config
+
+
+def search_document_sql(config: str) -> str:
+    """Generation expression of ``videos.search_tsv`` for a text search configuration."""
+    return (
+        f"setweight(to_tsvector('{config}'::regconfig, summary), 'A') || "
+        f"setweight(to_tsvector('{config}'::regconfig, coalesce(transcript, '')), 'B')"
+    )
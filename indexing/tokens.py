@@ -0,0 +1,81 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Token counting helpers for LLM prompts.
+
+Uses ``tiktoken`` when it is installed and falls back to a ~4 characters per
+token heuristic otherwise, which is close enough for budgeting and rate limits.
+"""
+
+from functools import lru_cache
+from typing import Any, Optional
+
+try:  # optional dependency
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on environment
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str) -> Optional[Any]:
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:  # noqa: BLE001 - e.g. encoding files unavailable offline
+        return None
+
+
+def estimate_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Estimate the number of tokens ``text`` occupies for ``model``."""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def group_by_tokens(
+    texts: list[str], max_tokens: int, model: str = "gpt-4o-mini"
+) -> list[list[str]]:
+    """Greedily pack consecutive texts into groups of at most ``max_tokens``.
+
+    Texts are never split, so a single text larger than the budget becomes a
+    group of its own.
+
+    Args:
+        texts: Ordered pieces (e.g. transcript segments) to pack.
+        max_tokens: Token budget per group.
+        model: Model whose tokenizer is used for counting.
+
+    Returns:
+        List of groups, preserving the original order.
+    """
+    groups: list[list[str]] = []
+    current: list[str] = []
+    used = 0
+    for text in texts:
+        cost = estimate_tokens(text, model) + 1
+        if current and used + cost > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def chunk_texts(
+    texts: list[str], max_tokens: int, model: str = "gpt-4o-mini"
+) -> list[str]:
+    """Like ``group_by_tokens`` but returns each group space-joined."""
+    return [" ".join(group) for group in group_by_tokens(texts, max_tokens, model)]
@@ -0,0 +1,63 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Binary COPY of pgvector values.
+
+Row-by-row ``INSERT ... ON CONFLICT`` spends most of its time on round trips
+and on parsing the text form of each vector (``'[0.01, ...]'``). COPY in
+binary format streams rows in one go and sends embeddings as raw float32,
+which is what ``vector_recv`` reads: a big-endian uint16 dimension, a
+reserved uint16 and the values as float4.
+"""
+
+import struct
+from collections.abc import Sequence
+from typing import Any, Union
+
+import numpy as np
+from psycopg import Connection, Cursor
+from psycopg.adapt import Dumper
+from psycopg.pq import Format
+from psycopg.types import TypeInfo
+
+_VECTOR_HEADER = struct.Struct("!HH")
+_FLOAT4_BE = np.dtype(">f4")
+
+
+def encode_vector(values: Union[Sequence[float], np.ndarray]) -> bytes:
+    """pgvector binary representation of an embedding."""
+    array = np.asarray(values, dtype=_FLOAT4_BE)
+    if array.ndim != 1:
+        raise ValueError(f"expected a 1-D embedding, got shape {array.shape}")
+    return _VECTOR_HEADER.pack(array.shape[0], 0) + array.tobytes()
+
+
+class _VectorBinaryDumper(Dumper):
+    format = Format.BINARY
+
+    def dump(self, obj: Any) -> bytes:
+        return encode_vector(obj)
+
+
+def register_vector_copy(context: Union[Connection, Cursor]) -> int:
+    """
+    Let ``Copy.set_types`` dump embeddings (lists or arrays) as binary ``vector``.
+
+    Args:
+        context: Connection or cursor whose adapters are extended.
+
+    Returns:
+        int: OID of the ``vector`` type in this database.
+
+    Raises:
+        RuntimeError: If the pgvector extension is not installed.
+    """
+    conn = context if isinstance(context, Connection) else context.connection
+    info = TypeInfo.fetch(conn, "vector")
+    if info is None:
+        raise RuntimeError("pgvector extension is not installed")
+    dumper = type("VectorBinaryDumper", (_VectorBinaryDumper,), {"oid": info.oid})
+    context.adapters.register_dumper(None, dumper)
+    return info.oid
@@ -0,0 +1,41 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Vector distance metric shared by index creation and search queries.
+
+pgvector only uses an ivfflat/hnsw index when the query orders by the operator
+of the index's operator class, e.g. ``<=>`` for ``vector_cosine_ops``. The
+metric is therefore configured once (``VECTOR_OPS``) and both ``ops.db_admin``
+and the query functions in ``indexing.index_manager`` derive from it. All
+stored and query embeddings are unit length, so the three metrics rank
+results identically and ``vector_ip_ops`` is a valid (fastest) choice.
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VECTOR_OPS = "vector_cosine_ops"
+# Operator class -> distance operator it accelerates
+DISTANCE_OPERATORS: dict[str, str] = {
+    "vector_cosine_ops": "<=>",
+    "vector_ip_ops": "<#>",
+    "vector_l2_ops": "<->",
+}
+
+
+def vector_ops() -> str:
+    """Operator class from ``VECTOR_OPS``; unknown values fall back to cosine."""
+    ops = os.getenv("VECTOR_OPS", DEFAULT_VECTOR_OPS).strip()
+    if ops not in DISTANCE_OPERATORS:
+        logger.warning(f"Unknown VECTOR_OPS {ops!r}; using {DEFAULT_VECTOR_OPS}")
+        return DEFAULT_VECTOR_OPS
+    return ops
+
+
+def distance_operator() -> str:
+    """Distance operator matching the configured operator class."""
+    return DISTANCE_OPERATORS[vector_ops()]
@@ -0,0 +1,211 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Structured metadata stored next to each video's summary embedding.
+
+Folders are named after the session they hold, e.g.
+``tuesday_session_08_06_2025_mp4`` (session type, then the date as
+MM_DD_YYYY; ISO YYYY_MM_DD works too). The session date and type are parsed
+from the nearest folder (or file name) that contains a date; the rest is
+probed from the file itself: size, a content fingerprint and, when ``ffprobe``
+is on PATH, the duration. Together with the summary and embedding model ids
+these land in filterable, btree-indexed columns of ``videos`` (see
+``ops.db_admin.ensure_schema``).
+
+Recordings run to several GB, so the fingerprint hashes only the size and the
+first and last few MB, and probe results are cached per (path, size, mtime)
+for the life of the process.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import subprocess
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Optional
+
+from indexing.registry import embedding_model_name
+
+logger = logging.getLogger(__name__)
+
+# Column -> PostgreSQL type; also the COPY types of the staging table
+METADATA_COLUMNS: dict[str, str] = {
+    "session_date": "date",
+    "session_type": "text",
+    "source": "text",
+    "duration_s": "float8",
+    "file_size": "int8",
+    "content_hash": "text",
+    "summary_model": "text",
+    "embedding_model": "text",
+}
+# Columns search filters and re-indexing look rows up by
+INDEXED_METADATA_COLUMNS: tuple[str, ...] = (
+    "session_date",
+    "session_type",
+    "source",
+    "duration_s",
+    "content_hash",
+)
+
+_SESSION_DATE_RE = re.compile(
+    r"(?:^|[_\-. ])(?:"
+    r"(?P<year>\d{4})[_\-.](?P<iso_month>\d{1,2})[_\-.](?P<iso_day>\d{1,2})"
+    r"|(?P<month>\d{1,2})[_\-.](?P<day>\d{1,2})[_\-.](?P<us_year>\d{4})"
+    r")(?=$|[_\-. ])"
+)
+_HASH_CHUNK = 1 << 20
+# Bytes hashed from each end of a file by ``content_hash``
+FINGERPRINT_BYTES = 4 << 20
+
+# (path, size, mtime_ns) -> (content_hash, duration_s)
+_probed: dict[tuple[str, int, int], tuple[str, Optional[float]]] = {}
+_probed_lock = threading.Lock()
+
+
+def parse_session_name(name: str) -> tuple[Optional[date], Optional[str]]:
+    """
+    Session date and type encoded in a folder or file name.
+
+    ``tuesday_session_08_06_2025_mp4`` gives ``(date(2025, 8, 6), "tuesday_session")``.
+
+    Returns:
+        tuple[Optional[date], Optional[str]]: (None, None) if the name holds
+            no valid date; the type is None if nothing precedes the date.
+    """
+    match = _SESSION_DATE_RE.search(name)
+    if match is None:
+        return None, None
+    if match.group("year"):
+        parts = match.group("year", "iso_month", "iso_day")
+    else:
+        parts = match.group("us_year", "month", "day")
+    try:
+        session_date = date(*(int(p) for p in parts))
+    except ValueError:
+        return None, None
+    session_type = name[: match.start()].strip("_-. ").lower() or None
+    return session_date, session_type
+
+
+def session_of(video_path: str) -> tuple[Optional[date], Optional[str]]:
+    """Session date and type from the nearest dated parent folder, else the file name."""
+    directory = os.path.dirname(os.path.abspath(video_path))
+    while True:
+        session = parse_session_name(os.path.basename(directory))
+        if session[0] is not None:
+            return session
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    return parse_session_name(os.path.splitext(os.path.basename(video_path))[0])
+
+
+def content_hash(path: str) -> str:
+    """
+    Hex SHA-256 fingerprint of a file: its size plus the first and last
+    ``FINGERPRINT_BYTES`` (the whole file when it is smaller than both).
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(f"{size}:".encode())
+    with open(path, "rb") as f:
+        _hash_range(f, digest, FINGERPRINT_BYTES)
+        if size > 2 * FINGERPRINT_BYTES:
+            f.seek(size - FINGERPRINT_BYTES)
+        _hash_range(f, digest, FINGERPRINT_BYTES)
+    return digest.hexdigest()
+
+
+def _hash_range(f: Any, digest: Any, size: int) -> None:
+    while size > 0 and (chunk := f.read(min(_HASH_CHUNK, size))):
+        digest.update(chunk)
+        size -= len(chunk)
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """Container duration in seconds via ``ffprobe``; None if it is missing or fails."""
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-show_entries",
+                "format=duration",
+                "-of",
+                "default=noprint_wrappers=1:nokey=1",
+                path,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return float(result.stdout.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError) as e:
+        logger.debug(f"Could not probe duration of {path}: {e}")
+        return None
+
+
+def video_metadata(
+    video_path: str, summary_model: Optional[str] = None
+) -> dict[str, Any]:
+    """
+    Metadata of one video, keyed by ``METADATA_COLUMNS``.
+
+    The source is the name of the folder the video was found in. File-based
+    values are None when the file cannot be read (e.g. it moved since it was
+    transcribed).
+
+    Args:
+        video_path (str): Path of the video file as stored in ``videos.path``.
+        summary_model (Optional[str]): Model that wrote the summary.
+    """
+    session_date, session_type = session_of(video_path)
+    metadata: dict[str, Any] = {
+        "session_date": session_date,
+        "session_type": session_type,
+        "source": os.path.basename(os.path.dirname(os.path.abspath(video_path))),
+        "duration_s": None,
+        "file_size": None,
+        "content_hash": None,
+        "summary_model": summary_model,
+        "embedding_model": embedding_model_name(),
+    }
+    try:
+        stat = os.stat(video_path)
+        key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+        with _probed_lock:
+            probed = _probed.get(key)
+        if probed is None:
+            probed = (content_hash(video_path), probe_duration(video_path))
+            with _probed_lock:
+                _probed[key] = probed
+    except OSError as e:
+        logger.warning(f"Could not read {video_path} for metadata: {e}")
+        return metadata
+    metadata["file_size"] = stat.st_size
+    metadata["content_hash"], metadata["duration_s"] = probed
+    return metadata
+
+
+def describe_videos(
+    video_paths: Iterable[str], summary_model: Optional[str] = None, workers: int = 4
+) -> dict[str, dict[str, Any]]:
+    """
+    ``video_metadata`` of many videos, keyed by path.
+
+    Hashing and probing are I/O bound, so files are read in parallel threads.
+    """
+    paths = list(dict.fromkeys(video_paths))
+    if not paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths)))) as executor:
+        described = executor.map(lambda p: video_metadata(p, summary_model), paths)
+        return dict(zip(paths, described))
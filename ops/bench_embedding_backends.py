@@ -0,0 +1,100 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Compare latency and memory of the torch and ONNX embedding backends.
+
+Each backend runs in a fresh interpreter (so peak RSS is not shared) and
+reports model load time, single-query latency (p50/p95, the ``query_videos``
+path), batched throughput and peak resident memory.
+
+Usage:
+    python -m ops.bench_embedding_backends
+    python -m ops.bench_embedding_backends --backends torch onnx-int8 --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+_PROBE = """
+import json, resource, statistics, time
+start = time.perf_counter()
+from indexing.registry import get_embedding_model
+model = get_embedding_model()
+load_s = time.perf_counter() - start
+queries = [f"attack lineout drill {{i}}" for i in range({queries})]
+model.encode(queries[0])
+lat = []
+for q in queries:
+    t = time.perf_counter()
+    model.encode(q, normalize_embeddings=True)
+    lat.append(time.perf_counter() - t)
+texts = [f"Session summary {{i}}: ruck drill, lineout calls and defensive shape." for i in range({batch})]
+t = time.perf_counter()
+model.encode(texts, batch_size=64, normalize_embeddings=True)
+batch_s = time.perf_counter() - t
+lat.sort()
+print(json.dumps({{
+    "load_s": load_s,
+    "p50_ms": statistics.median(lat) * 1000,
+    "p95_ms": lat[int(0.95 * (len(lat) - 1))] * 1000,
+    "batch_per_s": len(texts) / batch_s,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark embedding backends")
+    p.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    p.add_argument("--queries", type=int, default=100, help="Single-query encodes")
+    p.add_argument("--batch", type=int, default=256, help="Texts in the batch run")
+    p.add_argument("--threads", type=int, default=0, help="CPU threads (0 = default)")
+    return p.parse_args(argv)
+
+
+def run_backend(backend: str, args: argparse.Namespace) -> dict:
+    env = {**os.environ, "EMBEDDING_BACKEND": backend, "CUDA_VISIBLE_DEVICES": ""}
+    if args.threads:
+        env.update(
+            EMBEDDING_THREADS=str(args.threads), OMP_NUM_THREADS=str(args.threads)
+        )
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(queries=args.queries, batch=args.batch)],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if out.returncode != 0:
+        return {
+            "error": out.stderr.strip().splitlines()[-1] if out.stderr else "failed"
+        }
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    print(
+        f"{'backend':<10} {'load s':>7} {'p50 ms':>7} {'p95 ms':>7} "
+        f"{'batch/s':>8} {'RSS MB':>7}"
+    )
+    for backend in args.backends:
+        r = run_backend(backend, args)
+        if "error" in r:
+            print(f"{backend:<10} error: {r['error']}")
+            continue
+        print(
+            f"{backend:<10} {r['load_s']:>7.2f} {r['p50_ms']:>7.2f} {r['p95_ms']:>7.2f} "
+            f"{r['batch_per_s']:>8.1f} {r['rss_mb']:>7.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Benchmark summary embedding throughput on CPU across batch sizes.
+
+Encodes the same set of summary-sized texts once per batch size through
+``indexing.index_manager.embed_texts`` and reports encodes per second. Texts
+come from a file (one per line) or are synthesised.
+
+Usage:
+    python -m ops.bench_embeddings
+    python -m ops.bench_embeddings --texts summaries.txt --batch-sizes 1 16 64 128
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+SAMPLE = (
+    "Session focused on breakdown work: {n} rounds of the 3-2-1 ruck drill, "
+    "clean-out technique with low body height, then lineout calls on red, blue "
+    "and green with the lifters timing the jump. Coaching points: accuracy at "
+    "the contact, quick ball for the scrum half, communication in defence."
+)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark batched embeddings")
+    p.add_argument("--texts", help="File with one text per line (default: synthetic)")
+    p.add_argument("--count", type=int, default=512, help="Synthetic texts to encode")
+    p.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=[1, 8, 32, 64, 128],
+        help="Batch sizes to compare (default: 1 8 32 64 128)",
+    )
+    p.add_argument(
+        "--threads", type=int, default=0, help="torch CPU threads (0 = default)"
+    )
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    # Benchmark is CPU-only, matching the pipeline and API nodes
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+    from indexing.index_manager import embed_texts
+    from indexing.registry import get_embedding_model
+
+    if args.texts:
+        with open(args.texts, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = [SAMPLE.format(n=i) for i in range(args.count)]
+    if args.threads:
+        import torch
+
+        torch.set_num_threads(args.threads)
+
+    get_embedding_model()
+    embed_texts(texts[:8], batch_size=8)  # warm up kernels
+
+    print(f"{len(texts)} texts")
+    print(f"{'batch_size':>10}  {'encodes/s':>10}  {'seconds':>8}")
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        embed_texts(texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>10}  {len(texts) / elapsed:>10.1f}  {elapsed:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
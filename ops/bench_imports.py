@@ -0,0 +1,101 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Import-time regression benchmark for the CLI and API entry points.
+
+Each target is imported in a fresh interpreter several times; the median wall
+time is reported together with any heavy module (torch, sentence_transformers,
+openai) that leaked into the import. Exits non-zero when a target exceeds the
+budget or imports a heavy module, so it can gate CI.
+
+Usage:
+    python -m ops.bench_imports
+    python -m ops.bench_imports --budget 0.5 --runs 7 --top 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_TARGETS = ["core.cli", "core.pipeline_runner", "indexing.index_manager"]
+HEAVY_MODULES = ["torch", "sentence_transformers", "openai", "transformers"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark entry point import time")
+    p.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    p.add_argument("--runs", type=int, default=5, help="Fresh interpreters per target")
+    p.add_argument(
+        "--budget", type=float, default=1.0, help="Max median seconds per target"
+    )
+    p.add_argument(
+        "--top", type=int, default=0, help="Show the N slowest modules (-X importtime)"
+    )
+    return p.parse_args(argv)
+
+
+def measure(target: str) -> dict:
+    """Import ``target`` in a fresh interpreter and return seconds + heavy modules."""
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(target=target, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_modules(target: str, top: int) -> list[tuple[int, str]]:
+    """Cumulative import time (microseconds) of the slowest modules."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    failed = False
+    print(f"{'target':<28} {'median s':>9} {'max s':>7}  heavy modules")
+    for target in args.targets:
+        results = [measure(target) for _ in range(args.runs)]
+        times = [r["seconds"] for r in results]
+        heavy = sorted({m for r in results for m in r["heavy"]})
+        median = statistics.median(times)
+        over = median > args.budget or bool(heavy)
+        failed = failed or over
+        print(
+            f"{target:<28} {median:>9.3f} {max(times):>7.3f}  "
+            f"{', '.join(heavy) or '-'}{'  <-- over budget' if over else ''}"
+        )
+        for micros, name in slowest_modules(target, args.top):
+            print(f"    {micros / 1e6:>7.3f}s {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
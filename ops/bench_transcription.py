@@ -0,0 +1,87 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Benchmark Whisper transcription throughput with and without clip batching.
+
+Runs ``PipelineRunner.transcribe_to_srt`` over the same set of clips once per
+requested batch size (each into a fresh temporary output directory, so nothing
+is skipped) and reports clips per minute.
+
+Usage:
+    python -m ops.bench_transcription data/raw/videos/tuesday_session_08_06_2025_mp4
+    python -m ops.bench_transcription <dir> --batch-sizes 1 8 16 --model tiny --device cpu
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+
+from core.pipeline_models import VideoProcessingConfig
+from core.pipeline_runner import PipelineRunner
+from ingest.video_finder import find_video_files
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark batched transcription")
+    p.add_argument("directory", help="Directory of mp4 clips to transcribe")
+    p.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=[1, 8],
+        help="Clips per whisper session to compare (default: 1 8)",
+    )
+    p.add_argument("--workers", type=int, default=1, help="Parallel sessions")
+    p.add_argument("--model", default="tiny", help="Whisper model size")
+    p.add_argument("--device", default="cpu", help="Whisper device")
+    p.add_argument("--limit", type=int, default=0, help="Max clips (0 = all)")
+    return p.parse_args(argv)
+
+
+def run_once(clips: list[str], batch_size: int, args: argparse.Namespace) -> float:
+    """Transcribe clips and return clips per minute."""
+    with tempfile.TemporaryDirectory() as out_dir:
+        config = VideoProcessingConfig(
+            {
+                "sources": [{"type": "linux_desktop", "path": args.directory}],
+                "transcription": {
+                    "model_size": args.model,
+                    "device": args.device,
+                    "output_dir": out_dir,
+                    "batch_size": batch_size,
+                    "parallel_workers": args.workers,
+                },
+            }
+        )
+        start = time.perf_counter()
+        done = PipelineRunner(config).transcribe_to_srt(clips)
+        elapsed = time.perf_counter() - start
+    if len(done) != len(clips):
+        print(f"  warning: {len(clips) - len(done)} clip(s) failed", file=sys.stderr)
+    return len(done) / elapsed * 60 if elapsed > 0 else 0.0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    clips = find_video_files(args.directory, ["mp4"], recursive=True)
+    if args.limit > 0:
+        clips = clips[: args.limit]
+    if not clips:
+        print(f"No mp4 clips found under {args.directory}", file=sys.stderr)
+        return 1
+
+    print(f"{len(clips)} clips, model={args.model}, device={args.device}")
+    print(f"{'batch_size':>10}  {'clips/min':>10}")
+    for batch_size in args.batch_sizes:
+        rate = run_once(clips, batch_size, args)
+        print(f"{batch_size:>10}  {rate:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
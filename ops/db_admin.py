@@ -8,11 +8,15 @@
 Renamed from createdb.py per ticket: adds richer CLI and purge support.
 
 Actions:
-    purge    :    Remove schema objects (table + dependent indexes) ONLY.
+    purge    :    Remove schema objects (tables + dependent indexes) ONLY.
     bootstrap:    Ensure database objects (extension, table, indexes) exist.
+                  The videos vector index is ivfflat or hnsw (VIDEOS_INDEX_TYPE).
+    reembed  :    Re-encode stored texts with a new embedding model (see below).
+    tune     :    Benchmark recall@k / latency of index settings (see ``tune``),
+                  write a JSON report and optionally (--apply) use the best one.
 
 Purging strategy (scope=schema):
-  * Drops `videos` table (cascades dependent indexes) if present.
+  * Drops `videos` and `video_segments` tables (cascades dependent indexes) if present.
   * Does NOT drop or recreate the database itself.
   * Optional --recreate flag immediately re-runs bootstrap after purge.
 
@@ -21,6 +25,18 @@ Safety:
     * Use --action bootstrap to create/restore schema.
     * Dry-run always shows intended actions w/o changes.
 
+Re-embedding strategy (--action reembed, per table):
+  * Adds a shadow column `embedding_next` sized for the new model, tagged with
+    the model name so a resumed job cannot mix models (--restart discards it).
+  * A trigger clears `embedding_next` when a row's text changes, so rows
+    rewritten by the live pipeline are picked up again.
+  * Streams rows still lacking `embedding_next` through a server-side cursor,
+    encodes them in batches and commits each batch (resumable at any point),
+    pausing between batches so the live API keeps its share of CPU and I/O.
+  * Builds the vector index on the shadow column CONCURRENTLY, then, in one
+    transaction, catches up remaining rows and swaps the columns and indexes.
+  * Afterwards set EMBEDDING_MODEL (and EMBED_DIM) to the new model everywhere.
+
 Env configuration identical to legacy script (DB_* vars, EMBED_DIM, etc.).
 Exit codes: 0 success, 1 unexpected error, 2 dimension mismatch abort.
 """
@@ -28,10 +44,16 @@ Exit codes: 0 success, 1 unexpected error, 2 dimension mismatch abort.
 from __future__ import annotations
 
 import argparse
+import datetime
+import json
 import logging
+import math
 import os
 import re
 import sys
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
 from typing import Any
 
 import psycopg
@@ -39,26 +61,36 @@ from dotenv import load_dotenv
 from psycopg import sql
 from psycopg.errors import DuplicateDatabase, InsufficientPrivilege, UndefinedObject
 
+from indexing.db import close_pools, connection
+from indexing.text_search import search_document_sql, text_search_config
+from indexing.vector_metric import distance_operator, vector_ops
+from indexing.video_metadata import INDEXED_METADATA_COLUMNS, METADATA_COLUMNS
+
 load_dotenv()
 
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
-DB_USER: str = os.getenv("DB_USER", "postgres")
-DB_PASS: str = os.getenv("DB_PASS", "postgres")
+# Connection settings (DB_USER / DB_PASS / DB_HOST / DB_PORT) live in indexing.db
 DB_NAME: str = os.getenv("DB_NAME", "videos_db")
-DB_HOST: str = os.getenv("DB_HOST", "127.0.0.1")
-DB_PORT: int = int(os.getenv("DB_PORT", "5432"))
 EMBED_DIM: int = int(os.getenv("EMBED_DIM", "384"))
-DIST_OPS: str = os.getenv("VECTOR_OPS", "vector_cosine_ops")
+# Shared with the search queries, which must use the matching operator
+DIST_OPS: str = vector_ops()
+# Shared with hybrid search queries, like DIST_OPS
+TEXT_SEARCH_CONFIG: str = text_search_config()
+# Vector index of `videos`: ivfflat (fast to build, needs representative rows
+# at build time) or hnsw (better recall/latency trade-off, slower to build)
+VIDEOS_INDEX_TYPE: str = os.getenv("VIDEOS_INDEX_TYPE", "ivfflat").strip().lower()
 IVFFLAT_LISTS: int = int(os.getenv("IVFFLAT_LISTS", "100"))
+# Rebuild / concurrent-build switches apply to every vector index (ivfflat and hnsw)
 IVFFLAT_REBUILD: bool = os.getenv("IVFFLAT_REBUILD", "0") == "1"
 IVFFLAT_CONCURRENT: bool = os.getenv("IVFFLAT_CONCURRENT", "0") == "1"
+# video_segments always uses hnsw: it grows incrementally, and unlike ivfflat an
+# hnsw index needs no representative rows at build time.
+HNSW_M: int = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION: int = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
 LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
 
-DIST_OPS_ALLOWED = {"vector_cosine_ops", "vector_ip_ops", "vector_l2_ops"}
-if DIST_OPS not in DIST_OPS_ALLOWED:
-    DIST_OPS = "vector_cosine_ops"
 if EMBED_DIM <= 0:
     EMBED_DIM = 384
 if IVFFLAT_LISTS <= 0:
@@ -71,17 +103,19 @@ logging.basicConfig(
 )
 log = logging.getLogger("db_admin")
 
+if VIDEOS_INDEX_TYPE not in ("ivfflat", "hnsw"):
+    log.warning("unknown VIDEOS_INDEX_TYPE %r; using ivfflat", VIDEOS_INDEX_TYPE)
+    VIDEOS_INDEX_TYPE = "ivfflat"
+
 _VECTOR_DIM_RE = re.compile(r"vector\((\d+)\)")
+# Storage parameters as shown by pg_indexes, e.g. WITH (m='16', ef_construction='64')
+_INDEX_OPTION_RE = re.compile(r"(\w+)\s*=\s*'?(\d+)'?")
 
 
-def connect(dbname: str) -> psycopg.Connection:
-    return psycopg.connect(
-        dbname=dbname,
-        user=DB_USER,
-        password=DB_PASS,
-        host=DB_HOST,
-        port=DB_PORT,
-        options="-c client_min_messages=WARNING -c application_name=db_admin",
+def connect(dbname: str) -> AbstractContextManager[psycopg.Connection]:
+    """Pooled connection to ``dbname``; commits on exit and returns to the pool."""
+    return connection(
+        dbname, application_name="db_admin", options="-c client_min_messages=WARNING"
     )
 
 
@@ -103,18 +137,21 @@ def ensure_database(db_name: str, dry_run: bool) -> None:
             log.info("database exists (race): %s", db_name)
 
 
-def _get_existing_embed_dim(cur: psycopg.Cursor[Any]) -> int | None:
+def _get_existing_embed_dim(
+    cur: psycopg.Cursor[Any], table: str = "videos"
+) -> int | None:
     cur.execute(
         """
         SELECT pg_catalog.format_type(a.atttypid, a.atttypmod)
         FROM pg_attribute a
         JOIN pg_class c ON a.attrelid = c.oid
         JOIN pg_namespace n ON c.relnamespace = n.oid
-        WHERE c.relname = 'videos'
+        WHERE c.relname = %s
           AND a.attname = 'embedding'
           AND a.attnum > 0
           AND NOT a.attisdropped;
-        """
+        """,
+        (table,),
     )
     row = cur.fetchone()
     if not row:
@@ -123,149 +160,970 @@ def _get_existing_embed_dim(cur: psycopg.Cursor[Any]) -> int | None:
     return int(m.group(1)) if m else None
 
 
-def _existing_ivfflat_index_def(cur: psycopg.Cursor[Any]) -> str | None:
+def _existing_index_def(
+    cur: psycopg.Cursor[Any], table: str, index_name: str
+) -> str | None:
     cur.execute(
         """
         SELECT indexdef FROM pg_indexes
         WHERE schemaname = current_schema()
-          AND tablename = 'videos'
-          AND indexname = 'videos_embedding_ivfflat';
-        """
+          AND tablename = %s
+          AND indexname = %s;
+        """,
+        (table, index_name),
     )
     row = cur.fetchone()
     return row[0] if row else None
 
 
-def _needs_rebuild(indexdef: str) -> bool:
-    if f"(embedding {DIST_OPS})" not in indexdef:
-        return True
-    if f"lists = {IVFFLAT_LISTS}" not in indexdef:
+def _metric_mismatch(indexdef: str) -> bool:
+    """True if the index was built for another operator class than VECTOR_OPS,
+    in which case searches (which use VECTOR_OPS's operator) cannot use it."""
+    return f"(embedding {DIST_OPS})" not in indexdef
+
+
+def _index_options(index_type: str) -> dict[str, int]:
+    """Configured build parameters of an ivfflat or hnsw index."""
+    if index_type == "ivfflat":
+        return {"lists": IVFFLAT_LISTS}
+    return {"m": HNSW_M, "ef_construction": HNSW_EF_CONSTRUCTION}
+
+
+def _needs_rebuild(
+    indexdef: str, index_type: str = "ivfflat", options: dict[str, int] | None = None
+) -> bool:
+    if _metric_mismatch(indexdef):
         return True
-    return False
+    current = {
+        name: int(value)
+        for name, value in _INDEX_OPTION_RE.findall(indexdef.rpartition(" WITH ")[2])
+    }
+    wanted = options or _index_options(index_type)
+    return any(current.get(k) != v for k, v in wanted.items())
+
+
+def _vector_index_sql(
+    table: str,
+    index_name: str,
+    column: str,
+    index_type: str,
+    concurrent: bool = True,
+    options: dict[str, int] | None = None,
+) -> sql.Composed:
+    """CREATE INDEX statement for an ivfflat/hnsw index (default: configured parameters)."""
+    with_clause = sql.SQL(", ").join(
+        sql.SQL("{} = {}").format(sql.SQL(name), sql.Literal(value))
+        for name, value in (options or _index_options(index_type)).items()
+    )
+    return sql.SQL(
+        "CREATE INDEX{concurrent} {name} ON {table} "
+        "USING {method} ({col} {ops}) WITH ({options});"
+    ).format(
+        concurrent=sql.SQL(" CONCURRENTLY") if concurrent else sql.SQL(""),
+        name=sql.Identifier(index_name),
+        table=sql.Identifier(table),
+        method=sql.SQL(index_type),
+        col=sql.Identifier(column),
+        ops=sql.Identifier(DIST_OPS),
+        options=with_clause,
+    )
+
+
+def _describe_index(index_type: str, options: dict[str, int] | None = None) -> str:
+    params = ", ".join(
+        f"{k}={v}" for k, v in (options or _index_options(index_type)).items()
+    )
+    return f"ops={DIST_OPS}, {params}, concurrent={IVFFLAT_CONCURRENT}"
+
+
+def ensure_vector_index(
+    cur: psycopg.Cursor[Any],
+    table: str,
+    index_type: str,
+    dry_run: bool,
+    options: dict[str, int] | None = None,
+    rebuild: bool | None = None,
+) -> None:
+    """
+    Ensure ``<table>_embedding_<index_type>`` exists with the configured parameters.
+
+    A missing index is created; an existing one is rebuilt only with
+    IVFFLAT_REBUILD=1 (for ivfflat and hnsw alike). A vector index of the other
+    type, left over from a VIDEOS_INDEX_TYPE change, is dropped once the
+    configured one exists. ``options`` and ``rebuild`` override the settings.
+    """
+    if rebuild is None:
+        rebuild = IVFFLAT_REBUILD
+    name = f"{table}_embedding_{index_type}"
+    existing = _existing_index_def(cur, table, name)
+    if existing is None or (rebuild and _needs_rebuild(existing, index_type, options)):
+        action = "rebuilt" if existing else "created"
+        if dry_run:
+            log.info(
+                "(dry-run) would %s %s index %s (%s)",
+                "rebuild" if existing else "create",
+                index_type,
+                name,
+                _describe_index(index_type, options),
+            )
+        else:
+            if existing:
+                cur.execute(sql.SQL("DROP INDEX {};").format(sql.Identifier(name)))
+            cur.execute(
+                _vector_index_sql(
+                    table, name, "embedding", index_type, IVFFLAT_CONCURRENT, options
+                )
+            )
+            log.info(
+                "%s index %s %s (%s)",
+                index_type,
+                name,
+                action,
+                _describe_index(index_type, options),
+            )
+    elif _metric_mismatch(existing):
+        log.warning(
+            "%s was built for another metric than VECTOR_OPS=%s; "
+            "searches cannot use it until rebuilt (IVFFLAT_REBUILD=1)",
+            name,
+            DIST_OPS,
+        )
+    elif _needs_rebuild(existing, index_type, options):
+        log.info(
+            "%s parameters differ from settings (%s); rebuild with IVFFLAT_REBUILD=1",
+            name,
+            _describe_index(index_type, options),
+        )
+    else:
+        log.info("%s index unchanged", name)
+
+    for other in ("ivfflat", "hnsw"):
+        stale = f"{table}_embedding_{other}"
+        if other == index_type or _existing_index_def(cur, table, stale) is None:
+            continue
+        if dry_run:
+            log.info(
+                "(dry-run) would drop %s (index type is now %s)", stale, index_type
+            )
+            continue
+        cur.execute(
+            sql.SQL("DROP INDEX{} {};").format(
+                sql.SQL(" CONCURRENTLY") if IVFFLAT_CONCURRENT else sql.SQL(""),
+                sql.Identifier(stale),
+            )
+        )
+        log.info("dropped %s (index type is now %s)", stale, index_type)
 
 
 def ensure_schema(db_name: str, dry_run: bool) -> None:
-    """Ensure extension, table, unique index, ivfflat index."""
+    """Ensure extension, table, unique index, vector index (VIDEOS_INDEX_TYPE)."""
     with connect(db_name) as conn, conn.cursor() as cur:
         conn.autocommit = True
-        try:
-            cur.execute("SELECT pg_advisory_lock(hashtext('videos_schema_bootstrap'));")
-        except Exception as e:  # pragma: no cover
-            log.warning("failed to acquire advisory lock: %s", e)
+        with _advisory_lock(cur, "videos_schema_bootstrap"):
+            _ensure_schema(cur, dry_run)
+
 
-        # extension
+@contextmanager
+def _advisory_lock(cur: psycopg.Cursor[Any], name: str) -> Iterator[None]:
+    """
+    Hold a session advisory lock for the block, released on exit.
+
+    The lock is session-scoped (index builds run outside a transaction), so it
+    must be unlocked explicitly before the pooled connection is reused.
+    """
+    try:
+        cur.execute("SELECT pg_advisory_lock(hashtext(%s));", (name,))
+    except Exception as e:  # pragma: no cover
+        log.warning("failed to acquire advisory lock: %s", e)
+        yield
+        return
+    try:
+        yield
+    finally:
         try:
-            if dry_run:
-                log.info("(dry-run) would ensure extension: vector")
-            else:
-                cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
-        except InsufficientPrivilege:
-            log.warning("privilege issue creating extension vector")
+            cur.execute("SELECT pg_advisory_unlock(hashtext(%s));", (name,))
         except Exception as e:  # pragma: no cover
-            log.warning("could not create/verify vector extension: %s", e)
+            log.warning("failed to release advisory lock: %s", e)
 
-        existing_dim = _get_existing_embed_dim(cur)
+
+def _ensure_schema(cur: psycopg.Cursor[Any], dry_run: bool) -> None:
+    # extension
+    try:
+        if dry_run:
+            log.info("(dry-run) would ensure extension: vector")
+        else:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+    except InsufficientPrivilege:
+        log.warning("privilege issue creating extension vector")
+    except Exception as e:  # pragma: no cover
+        log.warning("could not create/verify vector extension: %s", e)
+
+    for table in ("videos", "video_segments"):
+        existing_dim = _get_existing_embed_dim(cur, table)
         if existing_dim is not None and existing_dim != EMBED_DIM:
             log.error(
-                "embedding dim mismatch (existing=%s env=%s)", existing_dim, EMBED_DIM
+                "%s embedding dim mismatch (existing=%s env=%s)",
+                table,
+                existing_dim,
+                EMBED_DIM,
             )
             raise SystemExit(2)
 
-        table_sql = sql.SQL(
-            """
-            CREATE TABLE IF NOT EXISTS videos (
-                id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
-                summary TEXT NOT NULL,
-                path TEXT NOT NULL,
-                embedding {embed_type} NOT NULL
-            );
-            """
-        ).format(embed_type=sql.SQL("VECTOR({})").format(sql.Literal(EMBED_DIM)))
-        if dry_run:
-            log.info("(dry-run) would ensure table: videos VECTOR(%d)", EMBED_DIM)
-        else:
-            cur.execute(table_sql)
+    table_sql = sql.SQL(
+        """
+        CREATE TABLE IF NOT EXISTS videos (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            summary TEXT NOT NULL,
+            path TEXT NOT NULL,
+            embedding {embed_type} NOT NULL
+        );
+        """
+    ).format(embed_type=sql.SQL("VECTOR({})").format(sql.Literal(EMBED_DIM)))
+    if dry_run:
+        log.info("(dry-run) would ensure table: videos VECTOR(%d)", EMBED_DIM)
+    else:
+        cur.execute(table_sql)
 
-        if dry_run:
-            log.info("(dry-run) would ensure unique index: videos_path_key")
-        else:
-            cur.execute(
-                "CREATE UNIQUE INDEX IF NOT EXISTS videos_path_key ON videos (path);"
-            )
+    if dry_run:
+        log.info("(dry-run) would ensure unique index: videos_path_key")
+    else:
+        cur.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS videos_path_key ON videos (path);"
+        )
 
-        # ivfflat
-        try:
-            existing = _existing_ivfflat_index_def(cur)
-            rebuild = existing is None or (
-                IVFFLAT_REBUILD and existing and _needs_rebuild(existing)
+    ensure_metadata_columns(cur, dry_run)
+    ensure_search_columns(cur, dry_run)
+
+    try:
+        ensure_vector_index(cur, "videos", VIDEOS_INDEX_TYPE, dry_run)
+        if not dry_run:
+            cur.execute("ANALYZE videos;")
+    except UndefinedObject:
+        log.warning(
+            "%s access method not found; is pgvector (>= 0.5.0 for hnsw) installed?",
+            VIDEOS_INDEX_TYPE,
+        )
+    except Exception as e:  # pragma: no cover
+        log.warning("videos vector index issue: %s", e)
+
+    ensure_segments_schema(cur, dry_run)
+
+    log.info("schema ready")
+
+
+def ensure_metadata_columns(cur: psycopg.Cursor[Any], dry_run: bool) -> None:
+    """Ensure the videos metadata columns (indexing.video_metadata) and their btree indexes."""
+    if dry_run:
+        log.info(
+            "(dry-run) would ensure videos columns: %s; btree indexes on: %s",
+            ", ".join(METADATA_COLUMNS),
+            ", ".join(INDEXED_METADATA_COLUMNS),
+        )
+        return
+    for column, type_name in METADATA_COLUMNS.items():
+        cur.execute(
+            sql.SQL("ALTER TABLE videos ADD COLUMN IF NOT EXISTS {} {};").format(
+                sql.Identifier(column), sql.SQL(type_name)
             )
-            if rebuild:
-                action = "rebuilt" if existing else "created"
-                if dry_run:
-                    log.info(
-                        "(dry-run) would %s ivfflat index (ops=%s, lists=%d, concurrent=%s)",
-                        action,
-                        DIST_OPS,
-                        IVFFLAT_LISTS,
-                        IVFFLAT_CONCURRENT,
-                    )
-                else:
-                    if existing:
-                        cur.execute("DROP INDEX videos_embedding_ivfflat;")
-                    concurrent_clause = (
-                        sql.SQL(" CONCURRENTLY") if IVFFLAT_CONCURRENT else sql.SQL("")
-                    )
-                    cur.execute(
-                        sql.SQL(
-                            """
-                            CREATE INDEX{concurrent} videos_embedding_ivfflat
-                            ON videos USING ivfflat (embedding {ops})
-                            WITH (lists = {lists});
-                            """
-                        ).format(
-                            concurrent=concurrent_clause,
-                            ops=sql.Identifier(DIST_OPS),
-                            lists=sql.Literal(IVFFLAT_LISTS),
-                        )
-                    )
-                    log.info(
-                        "ivfflat index %s (ops=%s, lists=%d, concurrent=%s)",
-                        action,
-                        DIST_OPS,
-                        IVFFLAT_LISTS,
-                        IVFFLAT_CONCURRENT,
-                    )
-            else:
-                log.info("ivfflat index unchanged")
-            if not dry_run:
-                cur.execute("ANALYZE videos;")
-        except UndefinedObject:
-            log.warning("ivfflat ops class not found; is pgvector installed?")
-        except Exception as e:  # pragma: no cover
-            log.warning("ivfflat index issue: %s", e)
+        )
+    for column in INDEXED_METADATA_COLUMNS:
+        cur.execute(
+            sql.SQL("CREATE INDEX IF NOT EXISTS {} ON videos ({});").format(
+                sql.Identifier(f"videos_{column}_idx"), sql.Identifier(column)
+            )
+        )
+
+
+def _generated_expression(
+    cur: psycopg.Cursor[Any], table: str, column: str
+) -> str | None:
+    """Generation expression of ``table.column`` ("" if not generated), or None if absent."""
+    cur.execute(
+        """
+        SELECT pg_get_expr(d.adbin, d.adrelid)
+        FROM pg_attribute a
+        LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+        WHERE a.attrelid = to_regclass(%s) AND a.attname = %s AND NOT a.attisdropped;
+        """,
+        (table, column),
+    )
+    row = cur.fetchone()
+    return None if row is None else (row[0] or "")
+
 
-        log.info("schema ready")
+def ensure_search_columns(cur: psycopg.Cursor[Any], dry_run: bool) -> None:
+    """Ensure videos.transcript and the generated full-text column search_tsv (GIN)."""
+    if dry_run:
+        log.info(
+            "(dry-run) would ensure videos.transcript and search_tsv (%s) + GIN index",
+            TEXT_SEARCH_CONFIG,
+        )
+        return
+    cur.execute("ALTER TABLE videos ADD COLUMN IF NOT EXISTS transcript TEXT;")
+    existing = _generated_expression(cur, "videos", "search_tsv")
+    if existing is None:
+        cur.execute(
+            sql.SQL(
+                "ALTER TABLE videos ADD COLUMN search_tsv tsvector "
+                "GENERATED ALWAYS AS ({}) STORED;"
+            ).format(sql.SQL(search_document_sql(TEXT_SEARCH_CONFIG)))
+        )
+        log.info("added videos.search_tsv (%s)", TEXT_SEARCH_CONFIG)
+    elif f"'{TEXT_SEARCH_CONFIG}'::regconfig" not in existing:
+        log.warning(
+            "videos.search_tsv was not generated with TEXT_SEARCH_CONFIG=%s; "
+            "hybrid searches cannot use it until the column is dropped and "
+            "bootstrap is rerun",
+            TEXT_SEARCH_CONFIG,
+        )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS videos_search_tsv_idx "
+        "ON videos USING gin (search_tsv);"
+    )
+
+
+def ensure_segments_schema(cur: psycopg.Cursor[Any], dry_run: bool) -> None:
+    """Ensure the video_segments table (timestamped transcript windows) and its indexes."""
+    table_sql = sql.SQL(
+        """
+        CREATE TABLE IF NOT EXISTS video_segments (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            path TEXT NOT NULL,
+            start_ms INTEGER NOT NULL,
+            end_ms INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            embedding {embed_type} NOT NULL
+        );
+        """
+    ).format(embed_type=sql.SQL("VECTOR({})").format(sql.Literal(EMBED_DIM)))
+    if dry_run:
+        log.info(
+            "(dry-run) would ensure table: video_segments VECTOR(%d) + indexes "
+            "(path, start_ms) and hnsw (m=%d, ef_construction=%d)",
+            EMBED_DIM,
+            HNSW_M,
+            HNSW_EF_CONSTRUCTION,
+        )
+        return
+    cur.execute(table_sql)
+    # Re-indexing a video replaces its rows by path
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS video_segments_path_idx "
+        "ON video_segments (path, start_ms);"
+    )
+    try:
+        ensure_vector_index(cur, "video_segments", "hnsw", dry_run=False)
+        cur.execute("ANALYZE video_segments;")
+    except UndefinedObject:
+        log.warning("hnsw access method not found; pgvector >= 0.5.0 is required")
+    except Exception as e:  # pragma: no cover
+        log.warning("hnsw index issue: %s", e)
 
 
 def purge_schema(db_name: str, dry_run: bool) -> None:
-    """Drop videos table (and dependent indexes) if present."""
+    """Drop videos and video_segments tables (and dependent indexes) if present."""
     with connect(db_name) as conn, conn.cursor() as cur:
         conn.autocommit = True
+        for table in ("video_segments", "videos"):
+            cur.execute(
+                """
+                SELECT 1 FROM information_schema.tables
+                WHERE table_schema = current_schema() AND table_name = %s;
+                """,
+                (table,),
+            )
+            exists = cur.fetchone() is not None
+            if not exists:
+                log.info("%s table absent (nothing to purge)", table)
+                continue
+            if dry_run:
+                log.info("(dry-run) would DROP TABLE %s CASCADE", table)
+                continue
+            cur.execute(sql.SQL("DROP TABLE {} CASCADE;").format(sql.Identifier(table)))
+            log.info("dropped table %s", table)
+
+
+# Vector index type per table holding embeddings
+VECTOR_INDEX_TYPES: dict[str, str] = {
+    "videos": VIDEOS_INDEX_TYPE,
+    "video_segments": "hnsw",
+}
+# Tables holding embeddings: text column and final vector index name
+REEMBED_TABLES: dict[str, tuple[str, str]] = {
+    table: (text_col, f"{table}_embedding_{VECTOR_INDEX_TYPES[table]}")
+    for table, text_col in (("videos", "summary"), ("video_segments", "text"))
+}
+_REEMBED_TAG_RE = re.compile(r"^reembed model=(\S+) dim=(\d+)$")
+
+
+def _shadow_tag(cur: psycopg.Cursor[Any], table: str) -> tuple[str, int] | None:
+    """(model, dim) recorded on ``table.embedding_next``, or None if there is no shadow column."""
+    cur.execute(
+        """
+        SELECT col_description(a.attrelid, a.attnum)
+        FROM pg_attribute a
+        WHERE a.attrelid = to_regclass(%s)
+          AND a.attname = 'embedding_next'
+          AND NOT a.attisdropped;
+        """,
+        (table,),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    m = _REEMBED_TAG_RE.match(row[0] or "")
+    return (m.group(1), int(m.group(2))) if m else ("", 0)
+
+
+def _has_column(cur: psycopg.Cursor[Any], table: str, column: str) -> bool:
+    cur.execute(
+        """
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s AND column_name = %s;
+        """,
+        (table, column),
+    )
+    return cur.fetchone() is not None
+
+
+def _prepare_shadow(
+    cur: psycopg.Cursor[Any], table: str, model_name: str, dim: int, restart: bool
+) -> None:
+    text_col, _ = REEMBED_TABLES[table]
+    tag = _shadow_tag(cur, table)
+    if tag is not None and (restart or tag != (model_name, dim)):
+        if not restart:
+            log.error(
+                "%s.embedding_next was started for model=%s dim=%s; "
+                "rerun with --restart to discard it",
+                table,
+                *tag,
+            )
+            raise SystemExit(2)
+        cur.execute(
+            sql.SQL("ALTER TABLE {} DROP COLUMN embedding_next;").format(
+                sql.Identifier(table)
+            )
+        )
+        log.info("discarded previous %s.embedding_next", table)
+        tag = None
+    if tag is None:
         cur.execute(
+            sql.SQL("ALTER TABLE {} ADD COLUMN embedding_next VECTOR({});").format(
+                sql.Identifier(table), sql.Literal(dim)
+            )
+        )
+        cur.execute(
+            sql.SQL("COMMENT ON COLUMN {}.embedding_next IS {};").format(
+                sql.Identifier(table),
+                sql.Literal(f"reembed model={model_name} dim={dim}"),
+            )
+        )
+        log.info("added %s.embedding_next VECTOR(%d) for %s", table, dim, model_name)
+    trigger = sql.Identifier(f"{table}_reembed_reset")
+    cur.execute(
+        sql.SQL(
             """
-            SELECT 1 FROM information_schema.tables
-            WHERE table_schema = current_schema() AND table_name = 'videos';
+            CREATE OR REPLACE FUNCTION reembed_reset() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.embedding_next := NULL;
+                RETURN NEW;
+            END $$;
             """
         )
-        exists = cur.fetchone() is not None
-        if not exists:
-            log.info("videos table absent (nothing to purge)")
-            return
+    )
+    cur.execute(
+        sql.SQL("DROP TRIGGER IF EXISTS {trigger} ON {table};").format(
+            trigger=trigger, table=sql.Identifier(table)
+        )
+    )
+    cur.execute(
+        sql.SQL(
+            """
+            CREATE TRIGGER {trigger} BEFORE UPDATE OF {col} ON {table}
+            FOR EACH ROW WHEN (OLD.{col} IS DISTINCT FROM NEW.{col})
+            EXECUTE FUNCTION reembed_reset();
+            """
+        ).format(
+            trigger=trigger, col=sql.Identifier(text_col), table=sql.Identifier(table)
+        )
+    )
+
+
+def _write_batch(
+    cur: psycopg.Cursor[Any],
+    table: str,
+    model: Any,
+    rows: list[tuple[int, str]],
+    batch_size: int,
+) -> None:
+    """Encode ``rows`` (id, text) and store them in ``embedding_next``.
+
+    Rows whose text changed since it was read are left NULL for a later pass.
+    """
+    text_col, _ = REEMBED_TABLES[table]
+    embeddings = model.encode(
+        [text for _, text in rows],
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+    ).tolist()
+    cur.executemany(
+        sql.SQL("UPDATE {} SET embedding_next = %s WHERE id = %s AND {} = %s;").format(
+            sql.Identifier(table), sql.Identifier(text_col)
+        ),
+        [
+            (embedding, row_id, text)
+            for (row_id, text), embedding in zip(rows, embeddings)
+        ],
+    )
+
+
+def _backfill_shadow(
+    db_name: str, table: str, model: Any, batch_size: int, pause: float
+) -> int:
+    """Stream rows without ``embedding_next`` and fill them batch by batch."""
+    text_col, _ = REEMBED_TABLES[table]
+    done = 0
+    started = time.monotonic()
+    with connect(db_name) as read_conn, connect(db_name) as write_conn:
+        with read_conn.cursor(name=f"reembed_{table}") as reader:
+            reader.itersize = batch_size
+            reader.execute(
+                sql.SQL(
+                    "SELECT id, {col} FROM {table} WHERE embedding_next IS NULL ORDER BY id;"
+                ).format(col=sql.Identifier(text_col), table=sql.Identifier(table))
+            )
+            while True:
+                rows = reader.fetchmany(batch_size)
+                if not rows:
+                    break
+                with write_conn.transaction(), write_conn.cursor() as cur:
+                    _write_batch(cur, table, model, rows, batch_size)
+                done += len(rows)
+                rate = done / max(time.monotonic() - started, 1e-9)
+                log.info("%s: re-embedded %d rows (%.1f rows/s)", table, done, rate)
+                if pause > 0:
+                    time.sleep(pause)
+    return done
+
+
+def _switch_over(
+    db_name: str, table: str, model: Any, model_name: str, batch_size: int
+) -> None:
+    """Index the shadow column concurrently, then swap it in atomically."""
+    text_col, index_name = REEMBED_TABLES[table]
+    next_index = f"{index_name}_next"
+    with connect(db_name) as conn, conn.cursor() as cur:
+        conn.autocommit = True
+        # A failed concurrent build leaves an invalid index behind
+        cur.execute(
+            sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {};").format(
+                sql.Identifier(next_index)
+            )
+        )
+        log.info("%s: building %s concurrently", table, next_index)
+        cur.execute(
+            _vector_index_sql(
+                table, next_index, "embedding_next", VECTOR_INDEX_TYPES[table]
+            )
+        )
+
+    with connect(db_name) as conn, conn.transaction(), conn.cursor() as cur:
+        ident = sql.Identifier(table)
+        cur.execute(sql.SQL("LOCK TABLE {} IN ACCESS EXCLUSIVE MODE;").format(ident))
+        # Rows written since the backfill finished
+        cur.execute(
+            sql.SQL("SELECT id, {} FROM {} WHERE embedding_next IS NULL;").format(
+                sql.Identifier(text_col), ident
+            )
+        )
+        rows = cur.fetchall()
+        if rows:
+            _write_batch(cur, table, model, rows, batch_size)
+            log.info("%s: caught up %d rows under lock", table, len(rows))
+        cur.execute(
+            sql.SQL("DROP TRIGGER IF EXISTS {} ON {};").format(
+                sql.Identifier(f"{table}_reembed_reset"), ident
+            )
+        )
+        cur.execute(
+            sql.SQL("COMMENT ON COLUMN {}.embedding_next IS NULL;").format(ident)
+        )
+        cur.execute(sql.SQL("ALTER TABLE {} DROP COLUMN embedding;").format(ident))
+        cur.execute(
+            sql.SQL("ALTER TABLE {} RENAME COLUMN embedding_next TO embedding;").format(
+                ident
+            )
+        )
+        cur.execute(
+            sql.SQL("ALTER TABLE {} ALTER COLUMN embedding SET NOT NULL;").format(ident)
+        )
+        cur.execute(
+            sql.SQL("ALTER INDEX {} RENAME TO {};").format(
+                sql.Identifier(next_index), sql.Identifier(index_name)
+            )
+        )
+        if table == "videos" and _has_column(cur, table, "embedding_model"):
+            cur.execute("UPDATE videos SET embedding_model = %s;", (model_name,))
+    log.info("%s: switched to re-embedded column", table)
+
+
+def reembed(
+    db_name: str,
+    model_name: str,
+    tables: list[str],
+    batch_size: int = 64,
+    pause: float = 0.5,
+    switch: bool = True,
+    restart: bool = False,
+    dry_run: bool = False,
+) -> None:
+    """
+    Re-encode stored texts of ``tables`` with ``model_name`` (see module docstring).
+
+    Safe to interrupt and rerun: rows already holding ``embedding_next`` are skipped.
+    """
+    from indexing.registry import load_embedding_model
+
+    model = load_embedding_model(model_name)
+    dim = int(model.get_sentence_embedding_dimension())
+    for table in tables:
+        with connect(db_name) as conn, conn.cursor() as cur:
+            conn.autocommit = True
+            if _get_existing_embed_dim(cur, table) is None:
+                log.info("%s absent (nothing to re-embed)", table)
+                continue
+            if dry_run:
+                log.info(
+                    "(dry-run) would re-embed %s with %s (dim=%d, batch=%d, pause=%.2fs%s)",
+                    table,
+                    model_name,
+                    dim,
+                    batch_size,
+                    pause,
+                    ", then switch over" if switch else "",
+                )
+                continue
+            _prepare_shadow(cur, table, model_name, dim, restart)
+        _backfill_shadow(db_name, table, model, batch_size, pause)
+        if switch:
+            _switch_over(db_name, table, model, model_name, batch_size)
+        else:
+            log.info(
+                "%s: backfill complete; rerun without --no-switch to switch", table
+            )
+    if switch and not dry_run:
+        log.info(
+            "re-embedding done: set EMBEDDING_MODEL=%s and EMBED_DIM=%d",
+            model_name,
+            dim,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Index tuning (--action tune)
+# ---------------------------------------------------------------------------
+TUNE_EF_SEARCH: tuple[int, ...] = (10, 20, 40, 80, 160, 320)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (``q`` in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _candidate_lists(rows: int) -> list[int]:
+    """ivfflat list counts around pgvector's guidance (rows/1000, sqrt(rows) above 1M)."""
+    base = rows / 1000 if rows <= 1_000_000 else math.sqrt(rows)
+    candidates = {max(1, round(base * f)) for f in (0.5, 1, 2, 4)}
+    candidates.add(IVFFLAT_LISTS)
+    return sorted(c for c in candidates if c <= max(1, rows))
+
+
+def _candidate_probes(lists: int) -> list[int]:
+    probes = [1]
+    while probes[-1] * 2 < lists:
+        probes.append(probes[-1] * 2)
+    return sorted({*probes, lists})
+
+
+def _measure(
+    cur: psycopg.Cursor[Any],
+    queries: list[str],
+    truth: list[set[int]],
+    k: int,
+    settings: dict[str, int],
+) -> dict[str, float]:
+    """
+    Recall@k and latency of the search query over ``tune_videos`` with ``settings``.
+
+    Sequential scans are disabled for the measurement: on a small sample the
+    planner may prefer an exact scan, which would report perfect recall for
+    every candidate. The plan is checked to use ``tune_videos_embedding``.
+
+    Raises:
+        RuntimeError: If the search does not use the candidate index.
+    """
+    for name, value in {"enable_seqscan": "off", **settings}.items():
+        cur.execute("SELECT set_config(%s, %s, true);", (name, str(value)))
+    search = (
+        f"SELECT id FROM tune_videos ORDER BY embedding {distance_operator()} "
+        "%s::vector LIMIT %s;"
+    )
+    cur.execute(f"EXPLAIN {search}", (queries[0], k))
+    plan = "\n".join(row[0] for row in cur.fetchall())
+    if "tune_videos_embedding" not in plan:
+        raise RuntimeError(f"tune search does not use the candidate index:\n{plan}")
+    latencies: list[float] = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        cur.execute(search, (query, k))
+        found = {row[0] for row in cur.fetchall()}
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len(found & expected)
+    return {
+        "recall": round(hits / max(1, sum(len(t) for t in truth)), 4),
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+    }
+
+
+def _build_tune_index(
+    cur: psycopg.Cursor[Any], index_type: str, options: dict[str, int]
+) -> float:
+    cur.execute("DROP INDEX IF EXISTS tune_videos_embedding;")
+    started = time.monotonic()
+    cur.execute(
+        _vector_index_sql(
+            "tune_videos",
+            "tune_videos_embedding",
+            "embedding",
+            index_type,
+            False,
+            options,
+        )
+    )
+    cur.execute("ANALYZE tune_videos;")
+    return round(time.monotonic() - started, 3)
+
+
+def _recommend(results: list[dict], target_recall: float) -> dict | None:
+    """Fastest (p99, then p50) configuration reaching ``target_recall``, else the most accurate."""
+    if not results:
+        return None
+    good = [r for r in results if r["recall"] >= target_recall]
+    if good:
+        return min(good, key=lambda r: (r["p99_ms"], r["p50_ms"]))
+    return max(results, key=lambda r: (r["recall"], -r["p99_ms"]))
+
+
+def _apply_tuning(db_name: str, best: dict) -> None:
+    """Rebuild the videos index for ``best`` and make its search setting the database default."""
+    index_type = best["index"]
+    options = {k: best[k] for k in _index_options(index_type)}
+    if index_type == "ivfflat":
+        setting, value = "ivfflat.probes", best["probes"]
+    else:
+        setting, value = "hnsw.ef_search", best["ef_search"]
+    with connect(db_name) as conn, conn.cursor() as cur:
+        conn.autocommit = True
+        ensure_vector_index(
+            cur, "videos", index_type, dry_run=False, options=options, rebuild=True
+        )
+        cur.execute("ANALYZE videos;")
+        # New sessions (pooled connections as they are recycled) pick this up;
+        # IVFFLAT_PROBES / HNSW_EF_SEARCH and per-request values still override it
+        cur.execute(
+            sql.SQL("ALTER DATABASE {} SET {} = {};").format(
+                sql.Identifier(db_name), sql.SQL(setting), sql.Literal(value)
+            )
+        )
+    prefix = "IVFFLAT" if index_type == "ivfflat" else "HNSW"
+    env = " ".join(f"{prefix}_{k.upper()}={v}" for k, v in options.items())
+    log.info(
+        "applied: videos %s index (%s), %s=%d as database default; "
+        "set VIDEOS_INDEX_TYPE=%s %s so bootstrap keeps it",
+        index_type,
+        _describe_index(index_type, options),
+        setting,
+        value,
+        index_type,
+        env,
+    )
+
+
+def tune(
+    db_name: str,
+    queries: int = 200,
+    k: int = 10,
+    target_recall: float = 0.95,
+    index_types: tuple[str, ...] = ("ivfflat", "hnsw"),
+    report_path: str | None = None,
+    apply: bool = False,
+    dry_run: bool = False,
+) -> dict | None:
+    """
+    Benchmark recall@k and latency of vector index configurations on ``videos``.
+
+    ``queries`` stored embeddings are sampled as held-out queries and the other
+    rows are copied into a temporary table, so the live table and its indexes
+    are untouched. Exact (sequential scan) results are the ground truth. Each
+    candidate ivfflat ``lists`` value is measured over ``probes`` up to
+    ``lists``, and an hnsw index (HNSW_M / HNSW_EF_CONSTRUCTION) over
+    ``ef_search`` values. The fastest configuration reaching ``target_recall``
+    is recommended and, with ``apply``, built on ``videos``.
+
+    Returns:
+        dict | None: The report (also written to ``report_path``), or None if
+            there is nothing to tune.
+    """
+    with connect(db_name) as conn, conn.cursor() as cur:
+        if _get_existing_embed_dim(cur, "videos") is None:
+            log.info("videos absent (nothing to tune)")
+            return None
+        cur.execute("SELECT count(*) FROM videos;")
+        total = cur.fetchone()[0]
+        sample = min(queries, total // 2)
+        if sample < 1:
+            log.info("videos has %d rows (too few to tune)", total)
+            return None
+        rows = total - sample
         if dry_run:
-            log.info("(dry-run) would DROP TABLE videos CASCADE")
-            return
-        cur.execute("DROP TABLE videos CASCADE;")
-        log.info("dropped table videos")
+            log.info(
+                "(dry-run) would benchmark %s on %d rows with %d queries (k=%d); "
+                "ivfflat lists %s",
+                "/".join(index_types),
+                rows,
+                sample,
+                k,
+                _candidate_lists(rows),
+            )
+            return None
+
+        cur.execute(
+            "SELECT id, embedding::text FROM videos ORDER BY random() LIMIT %s;",
+            (sample,),
+        )
+        held_out = cur.fetchall()
+        query_vectors = [vector for _, vector in held_out]
+        cur.execute(
+            "CREATE TEMP TABLE tune_videos ON COMMIT DROP AS "
+            "SELECT id, embedding FROM videos WHERE id <> ALL(%s);",
+            ([row_id for row_id, _ in held_out],),
+        )
+        cur.execute("ANALYZE tune_videos;")
+        log.info("tune: %d rows, %d held-out queries, k=%d", rows, sample, k)
+
+        # Ground truth: no index on tune_videos yet, so this is an exact scan
+        truth: list[set[int]] = []
+        exact_latencies: list[float] = []
+        for vector in query_vectors:
+            started = time.perf_counter()
+            cur.execute(
+                f"SELECT id FROM tune_videos ORDER BY embedding "
+                f"{distance_operator()} %s::vector LIMIT %s;",
+                (vector, k),
+            )
+            truth.append({row[0] for row in cur.fetchall()})
+            exact_latencies.append((time.perf_counter() - started) * 1000)
+        exact = {
+            "index": "exact",
+            "recall": 1.0,
+            "p50_ms": round(_percentile(exact_latencies, 50), 3),
+            "p99_ms": round(_percentile(exact_latencies, 99), 3),
+        }
+        log.info("exact: p50=%.2fms p99=%.2fms", exact["p50_ms"], exact["p99_ms"])
+
+        results: list[dict] = []
+        for index_type in index_types:
+            if index_type == "ivfflat":
+                configs = [
+                    ({"lists": lists}, "ivfflat.probes", "probes", probes)
+                    for lists in _candidate_lists(rows)
+                    for probes in _candidate_probes(lists)
+                ]
+            else:
+                configs = [
+                    (
+                        {"m": HNSW_M, "ef_construction": HNSW_EF_CONSTRUCTION},
+                        "hnsw.ef_search",
+                        "ef_search",
+                        ef,
+                    )
+                    for ef in sorted({max(k, ef) for ef in TUNE_EF_SEARCH})
+                ]
+            built: dict | None = None
+            build_s = 0.0
+            for params, setting, knob, value in configs:
+                if params != built:
+                    build_s = _build_tune_index(cur, index_type, params)
+                    built = params
+                result = {
+                    "index": index_type,
+                    **params,
+                    knob: value,
+                    "build_s": build_s,
+                    **_measure(cur, query_vectors, truth, k, {setting: value}),
+                }
+                log.info(
+                    "%s %s %s=%d: recall@%d=%.3f p50=%.2fms p99=%.2fms",
+                    index_type,
+                    " ".join(f"{n}={v}" for n, v in params.items()),
+                    knob,
+                    value,
+                    k,
+                    result["recall"],
+                    result["p50_ms"],
+                    result["p99_ms"],
+                )
+                results.append(result)
+        conn.rollback()
+
+    best = _recommend(results, target_recall)
+    report = {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(
+            timespec="seconds"
+        ),
+        "table": "videos",
+        "rows": rows,
+        "queries": sample,
+        "k": k,
+        "metric": DIST_OPS,
+        "target_recall": target_recall,
+        "exact": exact,
+        "results": results,
+        "recommendation": best,
+        "applied": False,
+    }
+    if best is not None:
+        knob = "probes" if best["index"] == "ivfflat" else "ef_search"
+        log.info(
+            "recommendation: %s with %s=%d (recall@%d=%.3f, p99=%.2fms)%s",
+            " ".join(
+                f"{n}={best[n]}"
+                for n in ("index", "lists", "m", "ef_construction")
+                if n in best
+            ),
+            knob,
+            best[knob],
+            k,
+            best["recall"],
+            best["p99_ms"],
+            "" if best["recall"] >= target_recall else " - target recall not reached",
+        )
+        if apply:
+            _apply_tuning(db_name, best)
+            report["applied"] = True
+    if report_path:
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        log.info("tune report written to %s", report_path)
+    return report
 
 
 def parse_args(argv: list[str]) -> argparse.Namespace:
@@ -274,7 +1132,7 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     )
     p.add_argument(
         "--action",
-        choices=["bootstrap", "purge"],
+        choices=["bootstrap", "purge", "reembed", "tune"],
         required=True,
         help="Action to perform",
     )
@@ -284,6 +1142,64 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         action="store_true",
         help="After purge, run bootstrap (ignored if action!=purge)",
     )
+    p.add_argument(
+        "--model",
+        default=None,
+        help="reembed: target embedding model (default: EMBEDDING_MODEL)",
+    )
+    p.add_argument(
+        "--table",
+        choices=[*REEMBED_TABLES, "all"],
+        default="all",
+        help="reembed: table to re-embed",
+    )
+    p.add_argument(
+        "--batch-size", type=int, default=64, help="reembed: rows per batch/commit"
+    )
+    p.add_argument(
+        "--pause",
+        type=float,
+        default=0.5,
+        help="reembed: seconds to sleep between batches (throttle)",
+    )
+    p.add_argument(
+        "--no-switch",
+        action="store_true",
+        help="reembed: only backfill the shadow column; switch over on a later run",
+    )
+    p.add_argument(
+        "--restart",
+        action="store_true",
+        help="reembed: discard an existing shadow column and start over",
+    )
+    p.add_argument(
+        "--queries",
+        type=int,
+        default=200,
+        help="tune: stored embeddings sampled as held-out queries",
+    )
+    p.add_argument("--k", type=int, default=10, help="tune: recall@k cut-off")
+    p.add_argument(
+        "--target-recall",
+        type=float,
+        default=0.95,
+        help="tune: minimum recall@k of the recommended configuration",
+    )
+    p.add_argument(
+        "--index-types",
+        default="ivfflat,hnsw",
+        help="tune: comma-separated index types to benchmark",
+    )
+    p.add_argument(
+        "--report",
+        default="./data/derived/db_tune_report.json",
+        help="tune: JSON report path",
+    )
+    p.add_argument(
+        "--apply",
+        action="store_true",
+        help="tune: rebuild the videos index with the recommended settings",
+    )
     return p.parse_args(argv)
 
 
@@ -300,14 +1216,47 @@ def main(argv: list[str] | None = None) -> int:
             purge_schema(DB_NAME, dry_run=dry_run)
             if args.recreate:
                 ensure_schema(DB_NAME, dry_run=dry_run)
+        elif action == "reembed":
+            from indexing.registry import embedding_model_name
+
+            reembed(
+                DB_NAME,
+                args.model or embedding_model_name(),
+                list(REEMBED_TABLES) if args.table == "all" else [args.table],
+                batch_size=max(1, args.batch_size),
+                pause=max(0.0, args.pause),
+                switch=not args.no_switch,
+                restart=args.restart,
+                dry_run=dry_run,
+            )
+        elif action == "tune":
+            index_types = tuple(
+                t.strip() for t in args.index_types.split(",") if t.strip()
+            )
+            unknown = set(index_types) - {"ivfflat", "hnsw"}
+            if unknown:
+                log.error("unknown index types: %s", ", ".join(sorted(unknown)))
+                return 2
+            tune(
+                DB_NAME,
+                queries=max(1, args.queries),
+                k=max(1, args.k),
+                target_recall=args.target_recall,
+                index_types=index_types,
+                report_path=args.report,
+                apply=args.apply,
+                dry_run=dry_run,
+            )
         else:  # bootstrap
             ensure_schema(DB_NAME, dry_run=dry_run)
         return 0
-    except SystemExit as se:  # dimension mismatch
+    except SystemExit as se:  # dimension / re-embed model mismatch
         return int(se.code) if se.code is not None else 2
     except Exception as e:  # pragma: no cover
         log.exception("db-admin-error: %s", e)
         return 1
+    finally:
+        close_pools()
 
 
 if __name__ == "__main__":  # pragma: no cover
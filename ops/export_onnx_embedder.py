@@ -0,0 +1,72 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Export the embedding model for the ONNX Runtime backend.
+
+Writes ``model.onnx`` (and ``model_int8.onnx`` unless ``--no-quantize``) plus
+the tokenizer to the directory ``EMBEDDING_BACKEND=onnx`` / ``onnx-int8``
+loads from, then checks parity against the torch model.
+
+Usage:
+    python -m ops.export_onnx_embedder
+    python -m ops.export_onnx_embedder --model BAAI/bge-small-en --out data/models/onnx/bge
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+PARITY_TEXTS = [
+    "attack lineout",
+    "3-2-1 ruck drill",
+    "Scrum half clears quickly after the ruck; support players stay low.",
+]
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    from indexing.registry import embedding_model_name
+
+    p = argparse.ArgumentParser(description="Export the ONNX embedding backend")
+    p.add_argument("--model", default=embedding_model_name(), help="Model id or path")
+    p.add_argument("--out", help="Output directory (default: data/models/onnx/<model>)")
+    p.add_argument("--no-quantize", action="store_true", help="Skip the int8 model")
+    p.add_argument("--opset", type=int, default=17)
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+
+    from indexing.onnx_embedder import (
+        OnnxEmbedder,
+        default_onnx_dir,
+        export_onnx_embedder,
+    )
+
+    out = args.out or default_onnx_dir(args.model)
+    export_onnx_embedder(
+        args.model, out, quantize=not args.no_quantize, opset=args.opset
+    )
+    print(f"Exported {args.model} -> {out}")
+
+    reference = SentenceTransformer(args.model, device="cpu").encode(
+        PARITY_TEXTS, normalize_embeddings=True
+    )
+    variants = [("onnx", False)] + ([] if args.no_quantize else [("onnx-int8", True)])
+    for name, quantized in variants:
+        encoded = OnnxEmbedder(out, quantized=quantized).encode(
+            PARITY_TEXTS, normalize_embeddings=True
+        )
+        cosine = float(np.min((encoded * reference).sum(axis=1)))
+        print(f"{name:<10} min cosine vs torch: {cosine:.5f}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -6,14 +6,14 @@
 """Export video summaries from the `videos` table to a standalone HTML page.
 
 Usage:
-    python ops/export_summaries_html.py              # writes summaries.html (default)
-    python ops/export_summaries_html.py --out report.html --limit 100
+    python -m ops.export_summaries_html              # writes summaries.html (default)
+    python -m ops.export_summaries_html --out report.html --limit 100
 
 Environment Variables (same as rest of project):
-    DB_USER / DB_PASS / DB_NAME / DB_HOST / DB_PORT
+    DB_USER / DB_PASS / DB_NAME / DB_HOST / DB_PORT (see indexing.db)
 
 Design goals:
-    * Zero extra dependencies (uses psycopg already in project deps)
+    * Zero extra dependencies (uses the shared psycopg pool in indexing.db)
     * Graceful fallback if DB unavailable (prints warning, exits 1)
     * Compact, readable table with expandable full summary text
     * Small inline JS/CSS (no external network calls)
@@ -24,13 +24,13 @@ from __future__ import annotations
 import argparse
 import datetime as _dt
 import html
-import os
 import sys
 from typing import Any
 
-import psycopg
 from dotenv import load_dotenv
 
+from indexing.db import close_pools, connection
+
 load_dotenv()
 
 
@@ -56,26 +56,11 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
 
 
 def _connect() -> Any:
-    if psycopg is None:  # pragma: no cover - only when dependency missing
-        raise SystemExit("psycopg not installed – cannot export")
-    DB_USER = os.getenv("DB_USER", "postgres")
-    DB_PASS = os.getenv("DB_PASS", "postgres")
-    DB_NAME = os.getenv("DB_NAME", "videos_db")
-    DB_HOST = os.getenv("DB_HOST", "localhost")
-    DB_PORT = int(os.getenv("DB_PORT", "5432"))
-    try:
-        return psycopg.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASS,
-            host=DB_HOST,
-            port=DB_PORT,
-            options="-c client_min_messages=WARNING -c application_name=export_summaries",
-        )
-    except Exception as e:  # noqa: BLE001
-        raise RuntimeError(
-            f"DB connect failed for user '{DB_USER}' host '{DB_HOST}:{DB_PORT}' db '{DB_NAME}': {e}"
-        ) from e
+    # DatabaseUnavailable is a RuntimeError, handled like any failed connect
+    return connection(
+        application_name="export_summaries",
+        options="-c client_min_messages=WARNING",
+    )
 
 
 def fetch_rows(limit: int, order: str, asc: bool) -> list[tuple[Any, ...]]:
@@ -157,6 +142,8 @@ def main(argv: list[str] | None = None) -> int:
     except Exception as e:  # noqa: BLE001
         print(f"[ERROR] Failed to fetch rows: {e}", file=sys.stderr)
         return 1
+    finally:
+        close_pools()
     html_doc = build_html(rows, show_embedding=not args.no_embedding)
     try:
         with open(args.out, "w", encoding="utf-8") as f:
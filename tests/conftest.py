@@ -0,0 +1,26 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+import psycopg
+import pytest
+
+from indexing.db import connect_kwargs
+
+
+@pytest.fixture
+def pg_conn():
+    """A live pgvector database (DB_* settings), skipped when unavailable."""
+    try:
+        conn = psycopg.connect(**connect_kwargs())
+    except psycopg.OperationalError:
+        pytest.skip("PostgreSQL is not reachable")
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'vector'")
+        if cur.fetchone() is None:
+            conn.close()
+            pytest.skip("pgvector extension is not installed")
+    yield conn
+    conn.rollback()
+    conn.close()
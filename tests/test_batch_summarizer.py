@@ -0,0 +1,261 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Batch API mode against a local stand-in server speaking the OpenAI protocol."""
+
+import json
+import threading
+from email.parser import BytesParser
+from email.policy import default
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from openai import OpenAI
+
+from core.pipeline_models import IndexingConfig
+from indexing.batch_summarizer import BatchSummarizer
+
+
+class StandInOpenAI:
+    """Minimal in-process implementation of the files + batches endpoints."""
+
+    def __init__(self):
+        self.files = {}
+        self.batches = {}
+        self.polls = 0
+        self.batch_creates = 0
+
+    def handle(self, method, path, body, headers):
+        if method == "POST" and path == "/v1/files":
+            # Multipart upload: pull the JSONL payload out of the form body
+            form = BytesParser(policy=default).parsebytes(
+                f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode() + body
+            )
+            payload = next(
+                part.get_payload(decode=True)
+                for part in form.iter_parts()
+                if part.get_filename()
+            )
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = payload.decode("utf-8")
+            return {
+                "id": file_id,
+                "object": "file",
+                "bytes": len(payload),
+                "created_at": 0,
+                "filename": "input.jsonl",
+                "purpose": "batch",
+                "status": "processed",
+            }
+        if method == "POST" and path == "/v1/batches":
+            self.batch_creates += 1
+            req = json.loads(body)
+            batch_id = f"batch-{len(self.batches)}"
+            self.batches[batch_id] = {"input": req["input_file_id"], "polls": 0}
+            return self._batch(batch_id, "validating")
+        if method == "GET" and path.startswith("/v1/batches/"):
+            batch_id = path.rsplit("/", 1)[1]
+            self.polls += 1
+            self.batches[batch_id]["polls"] += 1
+            if self.batches[batch_id]["polls"] < 2:
+                return self._batch(batch_id, "in_progress")
+            return self._complete(batch_id)
+        if method == "GET" and path.endswith("/content"):
+            return self.files[path.split("/")[3]]
+        raise AssertionError(f"unexpected {method} {path}")
+
+    def _batch(self, batch_id, status, output_file_id=None):
+        return {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": self.batches[batch_id]["input"],
+            "completion_window": "24h",
+            "created_at": 0,
+            "status": status,
+            "output_file_id": output_file_id,
+            "request_counts": {"total": 2, "completed": 0, "failed": 0},
+        }
+
+    def _complete(self, batch_id):
+        lines = []
+        for raw in self.files[self.batches[batch_id]["input"]].splitlines():
+            req = json.loads(raw)
+            transcript = req["body"]["messages"][-1]["content"]
+            ok = "broken" not in transcript
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": req["custom_id"],
+                        "response": {
+                            "status_code": 200 if ok else 500,
+                            "body": {
+                                "choices": [
+                                    {
+                                        "message": {
+                                            "content": f"summary {req['custom_id']}"
+                                        }
+                                    }
+                                ]
+                            },
+                        },
+                        "error": None,
+                    }
+                )
+            )
+        out_id = f"file-{len(self.files)}"
+        self.files[out_id] = "\n".join(lines)
+        return self._batch(batch_id, "completed", output_file_id=out_id)
+
+
+@pytest.fixture
+def stand_in():
+    api = StandInOpenAI()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _serve(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            result = api.handle(method, self.path, body, self.headers)
+            data = result if isinstance(result, str) else json.dumps(result)
+            data = data.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._serve("GET")
+
+        def do_POST(self):
+            self._serve("POST")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = OpenAI(
+        api_key="test-key",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+        max_retries=0,
+    )
+    yield api, client
+    server.shutdown()
+
+
+def make_config(tmp_path):
+    return IndexingConfig(
+        {
+            "mode": "batch",
+            "batch_dir": str(tmp_path / "batches"),
+            "batch_poll_interval": 0,
+            "prompt_model": {"system": "sys", "instructions": "Summarize."},
+        }
+    )
+
+
+def write_srt(path, text):
+    path.write_text(f"1\n00:00:00,000 --> 00:00:01,000\n{text}\n", encoding="utf-8")
+    return str(path)
+
+
+@patch(
+    "indexing.batch_summarizer.store_summaries",
+    side_effect=lambda records, **kwargs: len(records),
+)
+def test_batch_roundtrip_against_stand_in(mock_store, stand_in, tmp_path):
+    api, client = stand_in
+    srts = [
+        write_srt(tmp_path / "a.srt", "lineout"),
+        write_srt(tmp_path / "b.srt", "broken"),
+    ]
+
+    summarizer = BatchSummarizer(
+        make_config(tmp_path), client=client, sleep=lambda s: None
+    )
+    stored = summarizer.run(["/v/a.mp4", "/v/b.mp4"], srts)
+
+    assert stored == 1
+    mock_store.assert_called_once_with(
+        [("summary req-0", "/v/a.mp4")],
+        batch_size=64,
+        summary_model="gpt-4o-mini",
+        transcript_files=dict(zip(["/v/a.mp4", "/v/b.mp4"], srts)),
+    )
+    assert api.polls == 2
+    state = json.loads(
+        open(summarizer.state_path(["/v/a.mp4", "/v/b.mp4"], srts)).read()
+    )
+    assert state["status"] == "done" and state["stored"] == ["req-0"]
+
+
+@patch(
+    "indexing.batch_summarizer.store_summaries",
+    side_effect=lambda records, **kwargs: len(records),
+)
+def test_batch_resumes_without_resubmitting(mock_store, stand_in, tmp_path):
+    api, client = stand_in
+    srts = [
+        write_srt(tmp_path / "a.srt", "ruck"),
+        write_srt(tmp_path / "b.srt", "maul"),
+    ]
+    videos = ["/v/a.mp4", "/v/b.mp4"]
+    config = make_config(tmp_path)
+    config.embed_batch_size = 1
+
+    # First process dies after the first summary is stored
+    mock_store.side_effect = [1, KeyboardInterrupt()]
+    with pytest.raises(KeyboardInterrupt):
+        BatchSummarizer(config, client=client, sleep=lambda s: None).run(videos, srts)
+
+    mock_store.reset_mock(side_effect=True)
+    mock_store.side_effect = lambda records, **kwargs: len(records)
+    stored = BatchSummarizer(config, client=client, sleep=lambda s: None).run(
+        videos, srts
+    )
+
+    assert api.batch_creates == 1
+    assert stored == 1
+    mock_store.assert_called_once_with(
+        [("summary req-1", "/v/b.mp4")],
+        batch_size=1,
+        summary_model="gpt-4o-mini",
+        transcript_files=dict(zip(videos, srts)),
+    )
+    # A third run is a no-op
+    assert BatchSummarizer(config, client=client).run(videos, srts) == 0
+
+
+@patch("indexing.batch_summarizer.store_summaries")
+def test_batch_stays_resumable_when_results_are_not_stored(
+    mock_store, stand_in, tmp_path
+):
+    api, client = stand_in
+    srts = [write_srt(tmp_path / "a.srt", "ruck")]
+    videos = ["/v/a.mp4"]
+    config = make_config(tmp_path)
+
+    # Database down: nothing is written
+    mock_store.return_value = 0
+    with pytest.raises(RuntimeError, match="1 summaries of batch .* not be stored"):
+        BatchSummarizer(config, client=client, sleep=lambda s: None).run(videos, srts)
+    summarizer = BatchSummarizer(config, client=client, sleep=lambda s: None)
+    state = json.loads(open(summarizer.state_path(videos, srts)).read())
+    assert state.get("status") != "done" and not state["stored"]
+
+    mock_store.side_effect = lambda records, **kwargs: len(records)
+    assert summarizer.run(videos, srts) == 1
+    assert api.batch_creates == 1
+
+
+def test_batch_mode_requires_openai_provider(tmp_path):
+    config = make_config(tmp_path)
+    config.ai_provider = "local"
+    with pytest.raises(ValueError, match="Batch mode requires"):
+        BatchSummarizer(config)
@@ -0,0 +1,40 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for indexing.compaction transcript clean-up."""
+
+from indexing.compaction import compact_segments, normalize_whitespace
+
+
+def test_collapses_hallucinated_repeats():
+    texts = ["Thank you."] * 40 + ["Hit the ruck low."] + ["Thank you."] * 10
+    assert compact_segments(texts) == ["Thank you.", "Hit the ruck low.", "Thank you."]
+
+
+def test_drops_fillers_and_filler_only_segments():
+    texts = ["Um, uh...", "Uh, so we go  left   on three.", "hmm"]
+    assert compact_segments(texts) == ["so we go left on three."]
+
+
+def test_drops_near_duplicate_consecutive_segments():
+    texts = [
+        "Drive your legs through the contact",
+        "drive your legs through the contact!",
+        "Drive your legs through contact",
+        "Now switch sides",
+    ]
+    assert compact_segments(texts) == [
+        "Drive your legs through the contact",
+        "Now switch sides",
+    ]
+
+
+def test_keeps_distinct_lines_with_shared_words():
+    texts = ["Go left on three", "Go right on three"]
+    assert compact_segments(texts) == texts
+
+
+def test_normalize_whitespace():
+    assert normalize_whitespace("  a \n\t b  ") == "a b"
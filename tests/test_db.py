@@ -0,0 +1,90 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+import asyncio
+
+import pytest
+from psycopg_pool import ConnectionPool
+
+from indexing import db
+
+
+@pytest.fixture(autouse=True)
+def no_pools():
+    db.close_pools()
+    yield
+    db.close_pools()
+
+
+@pytest.fixture
+def unreachable_db(monkeypatch, tmp_path):
+    # A Unix socket directory with no server: connecting fails immediately
+    monkeypatch.setenv("DB_NAME", "videos_db")
+    monkeypatch.setenv("DB_HOST", str(tmp_path))
+    monkeypatch.setenv("DB_POOL_MIN", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "0.2")
+
+
+def test_connect_kwargs_from_env(monkeypatch):
+    monkeypatch.setenv("DB_NAME", "rugby")
+    monkeypatch.setenv("DB_HOST", "db.internal")
+    monkeypatch.setenv("DB_PORT", "6543")
+    kwargs = db.connect_kwargs(application_name="export", options="-c x=1")
+    assert kwargs["dbname"] == "rugby"
+    assert kwargs["host"] == "db.internal"
+    assert kwargs["port"] == 6543
+    assert kwargs["application_name"] == "export"
+    assert kwargs["options"] == "-c x=1"
+    assert "options" not in db.connect_kwargs("postgres")
+
+
+def test_get_pool_is_shared_per_database_and_application(monkeypatch, unreachable_db):
+    monkeypatch.setenv("DB_POOL_MAX", "3")
+    pool = db.get_pool()
+    assert db.get_pool() is pool
+    assert db.get_pool("postgres") is not pool
+    assert db.get_pool(application_name="db_admin") is not pool
+    assert pool.max_size == 3
+    assert pool.min_size == 0
+    assert pool.timeout == 0.2
+    assert pool._check == ConnectionPool.check_connection
+    assert set(db.pool_stats()) == {
+        "rugby:videos_db",
+        "rugby:postgres",
+        "db_admin:videos_db",
+    }
+
+
+def test_pool_min_size_is_capped_by_max_size(monkeypatch, unreachable_db):
+    monkeypatch.setenv("DB_POOL_MIN", "8")
+    monkeypatch.setenv("DB_POOL_MAX", "2")
+    pool = db.get_pool()
+    assert (pool.min_size, pool.max_size) == (2, 2)
+
+
+def test_connection_raises_database_unavailable(unreachable_db):
+    with pytest.raises(db.DatabaseUnavailable, match="rugby:videos_db"):
+        with db.connection():
+            pass
+
+
+def test_async_connection_raises_database_unavailable(unreachable_db):
+    async def borrow():
+        try:
+            async with db.async_connection():
+                pass
+        finally:
+            # Async pools belong to the event loop that opened them
+            await db.close_async_pools()
+
+    with pytest.raises(db.DatabaseUnavailable):
+        asyncio.run(borrow())
+
+
+def test_close_pools_forgets_pools(unreachable_db):
+    pool = db.get_pool()
+    db.close_pools()
+    assert pool.closed
+    assert db.get_pool() is not pool
@@ -0,0 +1,180 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for db_admin schema locking, vector index creation, rebuild and type switching."""
+
+import pytest
+
+from ops import db_admin
+
+IVFFLAT_DEF = (
+    "CREATE INDEX videos_embedding_ivfflat ON public.videos "
+    "USING ivfflat (embedding vector_cosine_ops) WITH (lists='100')"
+)
+HNSW_DEF = (
+    "CREATE INDEX videos_embedding_hnsw ON public.videos "
+    "USING hnsw (embedding vector_cosine_ops) WITH (m='16', ef_construction='64')"
+)
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    monkeypatch.setattr(db_admin, "DIST_OPS", "vector_cosine_ops")
+    monkeypatch.setattr(db_admin, "IVFFLAT_LISTS", 100)
+    monkeypatch.setattr(db_admin, "HNSW_M", 16)
+    monkeypatch.setattr(db_admin, "HNSW_EF_CONSTRUCTION", 64)
+    monkeypatch.setattr(db_admin, "IVFFLAT_REBUILD", False)
+    monkeypatch.setattr(db_admin, "IVFFLAT_CONCURRENT", False)
+    return monkeypatch
+
+
+def test_needs_rebuild_compares_index_parameters(settings):
+    assert not db_admin._needs_rebuild(IVFFLAT_DEF, "ivfflat")
+    assert not db_admin._needs_rebuild(HNSW_DEF, "hnsw")
+    settings.setattr(db_admin, "IVFFLAT_LISTS", 200)
+    settings.setattr(db_admin, "HNSW_EF_CONSTRUCTION", 128)
+    assert db_admin._needs_rebuild(IVFFLAT_DEF, "ivfflat")
+    assert db_admin._needs_rebuild(HNSW_DEF, "hnsw")
+
+
+def test_needs_rebuild_on_metric_change(settings):
+    settings.setattr(db_admin, "DIST_OPS", "vector_ip_ops")
+    assert db_admin._needs_rebuild(HNSW_DEF, "hnsw")
+
+
+def test_vector_index_sql(settings):
+    statement = db_admin._vector_index_sql(
+        "videos", "videos_embedding_hnsw", "embedding", "hnsw"
+    ).as_string(None)
+    assert statement == (
+        'CREATE INDEX CONCURRENTLY "videos_embedding_hnsw" ON "videos" USING hnsw '
+        '("embedding" "vector_cosine_ops") WITH (m = 16, ef_construction = 64);'
+    )
+    statement = db_admin._vector_index_sql(
+        "videos", "videos_embedding_ivfflat", "embedding", "ivfflat", concurrent=False
+    ).as_string(None)
+    assert "CONCURRENTLY" not in statement
+    assert "USING ivfflat" in statement and "WITH (lists = 100)" in statement
+
+
+def _index_defs(cur, table):
+    cur.execute(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = %s",
+        (table,),
+    )
+    return dict(cur.fetchall())
+
+
+def test_switching_index_type_replaces_the_index(pg_conn, settings):
+    table = "videos_index_test"
+    with pg_conn.cursor() as cur:
+        # Resolve current_schema() to the temporary schema
+        cur.execute("SET LOCAL search_path = pg_temp, public")
+        cur.execute(f"CREATE TEMP TABLE {table} (id INT, embedding VECTOR(3))")
+        cur.execute(
+            f"INSERT INTO {table} SELECT i, ARRAY[cos(i), sin(i), 1]::vector "
+            "FROM generate_series(1, 50) i"
+        )
+        settings.setattr(db_admin, "IVFFLAT_LISTS", 4)
+        db_admin.ensure_vector_index(cur, table, "ivfflat", dry_run=False)
+        assert f"{table}_embedding_ivfflat" in _index_defs(cur, table)
+
+        db_admin.ensure_vector_index(cur, table, "hnsw", dry_run=False)
+        indexes = _index_defs(cur, table)
+        assert f"{table}_embedding_ivfflat" not in indexes
+        assert (
+            "WITH (m='16', ef_construction='64')" in indexes[f"{table}_embedding_hnsw"]
+        )
+
+        # Changed parameters only rebuild on request
+        settings.setattr(db_admin, "HNSW_M", 8)
+        db_admin.ensure_vector_index(cur, table, "hnsw", dry_run=False)
+        assert "m='16'" in _index_defs(cur, table)[f"{table}_embedding_hnsw"]
+        settings.setattr(db_admin, "IVFFLAT_REBUILD", True)
+        db_admin.ensure_vector_index(cur, table, "hnsw", dry_run=False)
+        assert "m='8'" in _index_defs(cur, table)[f"{table}_embedding_hnsw"]
+
+
+def test_advisory_lock_is_released_when_the_block_fails(pg_conn):
+    def held(cur):
+        cur.execute(
+            "SELECT count(*) FROM pg_locks "
+            "WHERE locktype = 'advisory' AND pid = pg_backend_pid()"
+        )
+        return cur.fetchone()[0]
+
+    with pg_conn.cursor() as cur:
+        with pytest.raises(SystemExit):
+            with db_admin._advisory_lock(cur, "videos_schema_test"):
+                assert held(cur) == 1
+                raise SystemExit(2)
+        assert held(cur) == 0
+
+
+def test_tune_measures_the_candidate_index_not_a_sequential_scan(pg_conn, settings):
+    with pg_conn.cursor() as cur:
+        cur.execute(
+            "CREATE TEMP TABLE tune_videos AS SELECT i AS id, "
+            "(SELECT array_agg(random()) FROM generate_series(1, 8) WHERE i > 0)"
+            "::vector(8) AS embedding FROM generate_series(1, 500) i"
+        )
+        cur.execute("SELECT embedding::text FROM tune_videos LIMIT 20")
+        queries = [row[0] for row in cur.fetchall()]
+        truth = []
+        for query in queries:
+            cur.execute(
+                "SELECT id FROM tune_videos ORDER BY embedding <=> %s::vector LIMIT 10",
+                (query,),
+            )
+            truth.append({row[0] for row in cur.fetchall()})
+
+        db_admin._build_tune_index(cur, "ivfflat", {"lists": 20})
+        low = db_admin._measure(cur, queries, truth, 10, {"ivfflat.probes": 1})
+        full = db_admin._measure(cur, queries, truth, 10, {"ivfflat.probes": 20})
+        # Without the candidate index there is nothing to measure
+        cur.execute("DROP INDEX tune_videos_embedding")
+        with pytest.raises(RuntimeError, match="candidate index"):
+            db_admin._measure(cur, queries, truth, 10, {"ivfflat.probes": 1})
+    assert low["recall"] < 1.0
+    assert full["recall"] == 1.0
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert db_admin._percentile(values, 50) == 50.0
+    assert db_admin._percentile(values, 99) == 99.0
+    assert db_admin._percentile([3.0], 99) == 3.0
+
+
+def test_tune_candidates(settings):
+    assert db_admin._candidate_lists(20_000) == [10, 20, 40, 80, 100]
+    assert db_admin._candidate_lists(4_000_000) == [100, 1000, 2000, 4000, 8000]
+    # Never more lists than rows
+    assert db_admin._candidate_lists(50) == [1]
+    assert db_admin._candidate_probes(40) == [1, 2, 4, 8, 16, 32, 40]
+    assert db_admin._candidate_probes(1) == [1]
+
+
+def test_recommend_prefers_fastest_config_reaching_target():
+    results = [
+        {"index": "ivfflat", "probes": 1, "recall": 0.80, "p50_ms": 0.2, "p99_ms": 0.5},
+        {"index": "ivfflat", "probes": 4, "recall": 0.97, "p50_ms": 0.5, "p99_ms": 0.9},
+        {
+            "index": "hnsw",
+            "ef_search": 40,
+            "recall": 0.99,
+            "p50_ms": 0.6,
+            "p99_ms": 0.8,
+        },
+    ]
+    assert db_admin._recommend(results, 0.95)["index"] == "hnsw"
+    assert db_admin._recommend(results, 0.999)["recall"] == 0.99
+    assert db_admin._recommend([], 0.95) is None
+
+
+def test_needs_rebuild_with_explicit_options(settings):
+    assert db_admin._needs_rebuild(IVFFLAT_DEF, "ivfflat", {"lists": 40})
+    assert not db_admin._needs_rebuild(HNSW_DEF, "hnsw", {"m": 16})
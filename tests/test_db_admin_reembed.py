@@ -0,0 +1,64 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for the db_admin re-embedding job helpers."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from ops import db_admin
+
+
+def _sql_text(call):
+    statement = call.args[0]
+    return statement if isinstance(statement, str) else repr(statement)
+
+
+def test_write_batch_guards_against_changed_text():
+    model = MagicMock()
+    model.encode.return_value = np.array([[1.0, 0.0], [0.0, 1.0]])
+    cur = MagicMock()
+
+    db_admin._write_batch(cur, "videos", model, [(1, "a"), (2, "b")], batch_size=8)
+
+    model.encode.assert_called_once_with(
+        ["a", "b"], batch_size=8, normalize_embeddings=True, convert_to_numpy=True
+    )
+    statement, params = cur.executemany.call_args.args
+    assert "summary" in repr(statement)
+    assert params == [([1.0, 0.0], 1, "a"), ([0.0, 1.0], 2, "b")]
+
+
+def test_prepare_shadow_refuses_to_mix_models():
+    cur = MagicMock()
+    cur.fetchone.return_value = ("reembed model=BAAI/bge-small-en dim=384",)
+
+    with pytest.raises(SystemExit):
+        db_admin._prepare_shadow(cur, "videos", "BAAI/bge-base-en", 768, restart=False)
+    assert not any("DROP COLUMN" in _sql_text(c) for c in cur.execute.call_args_list)
+
+
+def test_prepare_shadow_resumes_same_model_and_installs_trigger():
+    cur = MagicMock()
+    cur.fetchone.return_value = ("reembed model=BAAI/bge-base-en dim=768",)
+
+    db_admin._prepare_shadow(cur, "videos", "BAAI/bge-base-en", 768, restart=False)
+
+    statements = [_sql_text(c) for c in cur.execute.call_args_list]
+    assert not any("ADD COLUMN" in s or "DROP COLUMN" in s for s in statements)
+    assert any("CREATE TRIGGER" in s for s in statements)
+
+
+def test_prepare_shadow_restart_recreates_column():
+    cur = MagicMock()
+    cur.fetchone.return_value = ("reembed model=BAAI/bge-small-en dim=384",)
+
+    db_admin._prepare_shadow(cur, "video_segments", "BAAI/bge-base-en", 768, True)
+
+    statements = [_sql_text(c) for c in cur.execute.call_args_list]
+    assert any("DROP COLUMN" in s for s in statements)
+    assert any("ADD COLUMN" in s and "768" in s for s in statements)
@@ -0,0 +1,56 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for indexing.dedup MinHash/LSH near-duplicate detection."""
+
+from indexing.dedup import (
+    MinHasher,
+    estimate_similarity,
+    group_near_duplicates,
+    lsh_params,
+    shingles,
+)
+
+DRILL = (
+    "Right everyone grab a partner. We are doing the three two one ruck drill. "
+    "Ball carrier goes to ground, support player hits the ruck low and drives "
+    "through, scrum half clears on the whistle. Keep your backs flat and your "
+    "heads up. Rotate after five reps and then switch sides."
+)
+OTHER = (
+    "Lineout calls today. Hooker throws to the front on red, middle on blue, "
+    "back on green. Lifters get under the jumper early and hold them up until "
+    "the ball is secured and delivered to the scrum half."
+)
+
+
+def test_shingles_short_and_long_text():
+    assert shingles("Hit the ruck") == {"hit the ruck"}
+    assert len(shingles("a b c d e f g", size=5)) == 3
+    assert shingles("") == set()
+
+
+def test_signature_similarity_tracks_jaccard():
+    hasher = MinHasher(num_perm=128)
+    a = hasher.signature(shingles(DRILL))
+    assert estimate_similarity(a, hasher.signature(shingles(DRILL))) == 1.0
+    assert estimate_similarity(a, hasher.signature(shingles(OTHER))) < 0.1
+
+
+def test_lsh_params_knee_near_threshold():
+    bands, rows = lsh_params(0.9, 128)
+    assert bands * rows <= 128
+    assert abs((1 / bands) ** (1 / rows) - 0.9) < 0.05
+
+
+def test_group_near_duplicates_maps_to_first_occurrence():
+    near_copy = DRILL.replace("Rotate after five reps", "Rotate after five reps,")
+    groups = group_near_duplicates([DRILL, OTHER, near_copy, None, ""], threshold=0.8)
+    assert groups == [0, 1, 0, 3, 4]
+
+
+def test_group_near_duplicates_keeps_distinct_transcripts():
+    edited = DRILL.replace("three two one ruck drill", "two on one tackle drill")
+    assert group_near_duplicates([DRILL, edited], threshold=0.95) == [0, 1]
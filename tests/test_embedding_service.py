@@ -0,0 +1,155 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for the shared embedding service and its micro-batching."""
+
+import socket
+import tempfile
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from indexing import embedding_service, registry
+from indexing.embedding_service import EmbeddingClient, EmbeddingService
+
+
+class FakeModel:
+    """Deterministic 4-d embeddings derived from the text; records batch sizes."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False, **_):
+        if "boom" in texts:
+            raise ValueError("bad input")
+        self.calls.append(list(texts))
+        out = np.array(
+            [[len(t), t.count("a"), t.count("e"), 1.0] for t in texts],
+            dtype=np.float32,
+        )
+        if normalize_embeddings:
+            out /= np.linalg.norm(out, axis=1, keepdims=True)
+        return out
+
+
+@pytest.fixture
+def service():
+    model = FakeModel()
+    # AF_UNIX paths are length-limited, so keep the socket in a short temp dir
+    with tempfile.TemporaryDirectory() as tmp:
+        svc = EmbeddingService(model, f"{tmp}/embed.sock", max_wait_ms=100)
+        svc.start()
+        yield svc, model
+        svc.close()
+
+
+def test_client_matches_local_encode(service):
+    svc, model = service
+    client = EmbeddingClient(svc.socket_path)
+
+    single = client.encode("attack lineout")
+    assert single.shape == (4,)
+    np.testing.assert_allclose(single, model.encode(["attack lineout"])[0])
+
+    many = client.encode(["ruck", "scrum"], normalize_embeddings=True)
+    np.testing.assert_allclose(
+        many, model.encode(["ruck", "scrum"], normalize_embeddings=True)
+    )
+    assert client.encode([]).shape == (0,)
+    assert client.get_sentence_embedding_dimension() == 4
+    client.close()
+
+
+def test_concurrent_requests_are_micro_batched(service):
+    svc, model = service
+    queries = [f"query {'a' * i}" for i in range(8)]
+    results = {}
+    start = threading.Barrier(len(queries))
+
+    def search(query):
+        client = EmbeddingClient(svc.socket_path)
+        start.wait()
+        results[query] = client.encode(query)
+        client.close()
+
+    threads = [threading.Thread(target=search, args=(q,)) for q in queries]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for query in queries:
+        np.testing.assert_allclose(results[query], model.encode([query])[0])
+    stats = svc.stats()
+    assert stats["requests"] == len(queries)
+    assert stats["batches"] < len(queries)
+    assert max(len(call) for call in model.calls) > 1
+
+
+def test_service_errors_are_raised_and_connection_survives(service):
+    svc, _ = service
+    client = EmbeddingClient(svc.socket_path)
+    with pytest.raises(RuntimeError, match="bad input"):
+        client.encode(["boom"])
+    assert client.encode("ok").shape == (4,)
+
+
+def test_interrupted_body_read_resets_the_connection(service):
+    svc, model = service
+    client = EmbeddingClient(svc.socket_path)
+    recv_exact = embedding_service._recv_exact
+    failed = []
+
+    def flaky_recv_exact(sock, size):
+        if size == 4 * 4 and not failed:  # body of one 4-d float32 row
+            failed.append(sock)
+            raise socket.timeout("timed out")
+        return recv_exact(sock, size)
+
+    with patch.object(embedding_service, "_recv_exact", flaky_recv_exact):
+        first = client.encode("ruck")
+    assert failed and failed[0].fileno() == -1  # the half-read socket was closed
+    np.testing.assert_allclose(first, model.encode(["ruck"])[0])
+    # The retried connection is not left with unread bytes
+    np.testing.assert_allclose(client.encode("maul"), model.encode(["maul"])[0])
+    client.close()
+
+
+def test_close_closes_the_connections_of_every_thread(service):
+    svc, model = service
+    client = EmbeddingClient(svc.socket_path)
+    threads = [
+        threading.Thread(target=client.encode, args=(f"drill {i}",)) for i in range(3)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sockets = list(client._sockets)
+    assert len(sockets) == 3
+
+    client.close()
+
+    assert all(sock.fileno() == -1 for sock in sockets)
+    # The client stays usable after close
+    np.testing.assert_allclose(client.encode("ruck"), model.encode(["ruck"])[0])
+    client.close()
+
+
+def test_registry_uses_service_when_configured(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_SERVICE_SOCKET", "/tmp/missing-embed.sock")
+    resource = registry.LazyResource(
+        "embedding model", registry._shared_embedding_model
+    )
+    with patch.object(registry, "load_embedding_model") as mock_load:
+        model = resource.get()
+    assert isinstance(model, EmbeddingClient)
+    assert model.socket_path == "/tmp/missing-embed.sock"
+    mock_load.assert_not_called()
@@ -0,0 +1,81 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for the full-text column and hybrid (vector + full-text) search."""
+
+import pytest
+
+from indexing import index_manager
+from indexing.text_search import search_document_sql, text_search_config
+from ops import db_admin
+
+
+def test_text_search_config_from_env(monkeypatch):
+    monkeypatch.delenv("TEXT_SEARCH_CONFIG", raising=False)
+    assert text_search_config() == "english"
+    monkeypatch.setenv("TEXT_SEARCH_CONFIG", "simple")
+    assert text_search_config() == "simple"
+    monkeypatch.setenv("TEXT_SEARCH_CONFIG", "english'); DROP TABLE videos; --")
+    assert text_search_config() == "english"
+
+
+def test_search_document_weights_summary_over_transcript():
+    expression = search_document_sql("simple")
+    assert "setweight(to_tsvector('simple'::regconfig, summary), 'A')" in expression
+    assert "coalesce(transcript, '')), 'B')" in expression
+
+
+@pytest.mark.parametrize(
+    "where, iterative, vector_source",
+    [
+        ("", False, "FROM videos\n"),
+        ("source = %(source)s", True, "FROM videos\n"),
+        ("source = %(source)s", False, "FROM filtered\n"),
+    ],
+)
+def test_hybrid_sql_filters_both_rankings(where, iterative, vector_source):
+    sql = index_manager.hybrid_sql(where, iterative)
+    assert vector_source in sql
+    assert ("filtered AS MATERIALIZED" in sql) == (vector_source == "FROM filtered\n")
+    if where:
+        assert f"WHERE search_tsv @@ tsquery AND {where}" in sql
+    assert "FULL OUTER JOIN lexical" in sql
+
+
+def test_hybrid_search_fuses_rankings(pg_conn, monkeypatch):
+    monkeypatch.setattr(db_admin, "TEXT_SEARCH_CONFIG", "english")
+    monkeypatch.delenv("TEXT_SEARCH_CONFIG", raising=False)
+    monkeypatch.setenv("VECTOR_OPS", "vector_cosine_ops")
+    with pg_conn.cursor() as cur:
+        cur.execute("SET LOCAL search_path = pg_temp, public")
+        cur.execute(
+            "CREATE TEMP TABLE videos (id BIGINT, summary TEXT NOT NULL, "
+            "path TEXT, embedding VECTOR(2))"
+        )
+        db_admin.ensure_search_columns(cur, dry_run=False)
+        cur.executemany(
+            "INSERT INTO videos (id, summary, path, embedding, transcript) "
+            "VALUES (%s, %s, %s, %s::vector, %s)",
+            [
+                (1, "Contact session", "/v/1.mp4", "[1, 0]", None),
+                (2, "Scrum machine work", "/v/2.mp4", "[0.9, 0.1]", None),
+                (3, "Breakdown work", "/v/3.mp4", "[0, 1]", "Run the 3-2-1 ruck drill"),
+            ],
+        )
+        cur.execute(
+            index_manager.hybrid_sql(),
+            {
+                "embedding": [1.0, 0.0],
+                "query": '"3-2-1 ruck drill"',
+                "candidates": 2,
+                "rrf_k": 60,
+                "limit": 3,
+            },
+        )
+        # Video 3 is no vector candidate but the only full-text match
+        assert [row[0] for row in cur.fetchall()] == [1, 3, 2]
+
+        cur.execute("SELECT search_tsv::text FROM videos WHERE id = 3")
+        assert "'ruck':" in cur.fetchone()[0]
@@ -3,12 +3,46 @@
 # This file is the sole property of Biasware LLC.
 # Unauthorized use, distribution, or reverse engineering is prohibited.
 
+from datetime import date
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from core.pipeline_models import IndexingConfig
+from core.pipeline_models import IndexingConfig, ProviderConfig
 from indexing import index_manager
+from indexing.db import DatabaseUnavailable
+from indexing.llm_metrics import llm_metrics
+from indexing.providers import ChatProvider, get_provider
+from indexing.query_cache import QueryEmbeddingCache, QueryLog
+from indexing.video_metadata import METADATA_COLUMNS
+
+
+@pytest.fixture(autouse=True)
+def fresh_query_cache():
+    cache = QueryEmbeddingCache(max_size=16, ttl_s=0)
+    log = QueryLog(None)
+    with (
+        patch("indexing.index_manager.query_cache", cache),
+        patch("indexing.index_manager.query_log", log),
+    ):
+        yield cache, log
+
+
+@pytest.fixture
+def mock_db():
+    """Patches the pooled ``connection()``; yields (connection mock, cursor mock)."""
+    with patch("indexing.index_manager.connection") as connection:
+        conn = connection.return_value.__enter__.return_value
+        yield connection, conn.cursor.return_value.__enter__.return_value
+
+
+@pytest.fixture
+def mock_openai():
+    client = MagicMock()
+    # Non-streamed so ``create`` mocks can return a whole completion
+    provider = ChatProvider(ProviderConfig("openai", {"stream": False}), client=client)
+    with patch("indexing.index_manager.get_provider", return_value=provider):
+        yield client
 
 
 def make_indexing_config(
@@ -26,32 +60,10 @@ def make_indexing_config(
     )
 
 
-@patch("indexing.index_manager.psycopg.connect")
-def test_connect_db_success(mock_connect):
-    mock_conn = MagicMock()
-    mock_connect.return_value = mock_conn
-    from indexing import index_manager
-
-    conn = index_manager.connect_db()
-    assert conn == mock_conn
-    mock_connect.assert_called_once()
-
-
-@patch("indexing.index_manager.psycopg.connect")
-def test_connect_db_failure(mock_connect):
-    mock_connect.side_effect = Exception("Connection error")
-    from indexing import index_manager
-
-    conn = index_manager.connect_db()
-    assert conn is None
-    mock_connect.assert_called_once()
-
-
-@patch("indexing.index_manager.openai_client")
-@patch("indexing.index_manager.load_srt_text")
+@patch("indexing.index_manager.load_segments")
 def test_summarize_srt_file_success(mock_load_srt, mock_openai):
     config = make_indexing_config()
-    mock_load_srt.return_value = "This is a transcript."
+    mock_load_srt.return_value = [{"text": "This is a transcript."}]
     mock_response = MagicMock()
     mock_response.choices = [MagicMock()]
     mock_response.choices[0].message.content = "Summary of transcript."
@@ -62,11 +74,10 @@ def test_summarize_srt_file_success(mock_load_srt, mock_openai):
     mock_openai.chat.completions.create.assert_called_once()
 
 
-@patch("indexing.index_manager.openai_client")
-@patch("indexing.index_manager.load_srt_text")
+@patch("indexing.index_manager.load_segments")
 def test_summarize_srt_file_empty_response(mock_load_srt, mock_openai):
     config = make_indexing_config()
-    mock_load_srt.return_value = "Transcript."
+    mock_load_srt.return_value = [{"text": "Transcript."}]
     mock_response = MagicMock()
     mock_response.choices = []
     mock_openai.chat.completions.create.return_value = mock_response
@@ -74,11 +85,10 @@ def test_summarize_srt_file_empty_response(mock_load_srt, mock_openai):
         index_manager.summarize_srt_file(config, "dummy.srt")
 
 
-@patch("indexing.index_manager.openai_client")
-@patch("indexing.index_manager.load_srt_text")
+@patch("indexing.index_manager.load_segments")
 def test_summarize_srt_file_empty_summary(mock_load_srt, mock_openai):
     config = make_indexing_config()
-    mock_load_srt.return_value = "Transcript."
+    mock_load_srt.return_value = [{"text": "Transcript."}]
     mock_response = MagicMock()
     mock_response.choices = [MagicMock()]
     mock_response.choices[0].message.content = "  "
@@ -87,33 +97,122 @@ def test_summarize_srt_file_empty_summary(mock_load_srt, mock_openai):
         index_manager.summarize_srt_file(config, "dummy.srt")
 
 
+@patch("indexing.index_manager.load_segments")
+def test_summarize_srt_file_map_reduce_long_transcript(mock_load_segments, mock_openai):
+    config = IndexingConfig(
+        {
+            "chunk_tokens": 20,
+            "reduce_strategy": "single",
+            "batch_size": 2,
+            "prompt_model": {"instructions": "Summarize."},
+        }
+    )
+    mock_load_segments.return_value = [
+        {"text": f"segment number {i} about lineout drills"} for i in range(6)
+    ]
+    prompts = []
+
+    def _create(**kwargs):
+        prompts.append("\n".join(m["content"] for m in kwargs["messages"]))
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = f"partial {len(prompts)}"
+        response.usage.prompt_tokens = 10
+        response.usage.completion_tokens = 2
+        return response
+
+    mock_openai.chat.completions.create.side_effect = _create
+
+    summary = index_manager.summarize_srt_file(config, "long.srt")
+
+    map_prompts = [p for p in prompts if "(Part " in p]
+    reduce_prompts = [p for p in prompts if config.reduce_instructions in p]
+    assert len(map_prompts) > 1
+    assert len(reduce_prompts) == 1
+    assert f"Part {len(map_prompts)}:" in reduce_prompts[0]
+    assert summary == f"partial {len(prompts)}"
+
+
+def test_build_summary_request_has_stable_prefix():
+    config = IndexingConfig(
+        {
+            "prompt_model": {
+                "system": "You are a rugby analyst.",
+                "instructions": "  Summarize the drills.\n",
+                "examples": [{"user": "Transcript A", "assistant": "Summary A"}],
+            }
+        }
+    )
+    first = index_manager.build_summary_request(config, "  first transcript ")
+    second = index_manager.build_summary_request(config, "second, longer transcript")
+
+    assert first["messages"][:-1] == second["messages"][:-1]
+    assert first["messages"][0] == {
+        "role": "system",
+        "content": "You are a rugby analyst.\n\nSummarize the drills.",
+    }
+    assert [m["role"] for m in first["messages"]] == [
+        "system",
+        "user",
+        "assistant",
+        "user",
+    ]
+    assert first["messages"][-1]["content"] == (
+        index_manager.TRANSCRIPT_HEADER + "first transcript"
+    )
+
+
+def test_summarize_records_cached_prompt_tokens(mock_openai):
+    config = make_indexing_config()
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = "Summary."
+    response.usage.prompt_tokens = 1500
+    response.usage.prompt_tokens_details.cached_tokens = 1024
+    response.usage.completion_tokens = 40
+    mock_openai.chat.completions.create.return_value = response
+
+    llm_metrics.reset()
+    with patch(
+        "indexing.index_manager.load_segments",
+        return_value=[{"text": "Transcript."}],
+    ):
+        index_manager.summarize_srt_file(config, "a.srt")
+        index_manager.summarize_srt_file(config, "b.srt")
+
+    total = llm_metrics.summary()["total"]
+    assert (total["prompt_tokens"], total["cached_tokens"]) == (3000, 2048)
+
+
+def test_indexing_config_rejects_unknown_reduce_strategy():
+    with pytest.raises(ValueError, match="Unsupported reduce_strategy"):
+        IndexingConfig({"reduce_strategy": "magic"})
+
+
 def test_summarize_srt_file_unsupported_provider():
     config = make_indexing_config(ai_provider="otherai")
     with pytest.raises(
         ValueError,
-        match="Unsupported AI provider: otherai. Only 'openai' is supported.",
+        match="Unsupported AI provider: otherai. Supported providers: openai, local.",
     ):
         index_manager.summarize_srt_file(config, "dummy.srt")
 
 
-@patch("indexing.index_manager.vector_model")
-@patch("indexing.index_manager.psycopg.connect")
-def test_vectorize_and_store_summary_success(mock_connect, mock_vector_model):
+@patch("indexing.index_manager.get_embedding_model")
+def test_vectorize_and_store_summary_success(mock_vector_model, mock_db):
+    mock_connection, mock_cursor = mock_db
     summary = "A summary of the video."
     video_path = "/videos/video1.mp4"
     mock_embedding = MagicMock()
     mock_embedding.tolist.return_value = [0.1, 0.2, 0.3]
-    mock_vector_model.encode.return_value = mock_embedding
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_connect.return_value = mock_conn
-    mock_conn.cursor.return_value = mock_cursor
+    mock_vector_model.return_value.encode.return_value = mock_embedding
 
     index_manager.vectorize_and_store_summary(summary, video_path)
 
-    mock_vector_model.encode.assert_called_once_with(summary)
-    mock_connect.assert_called_once()
-    mock_conn.cursor.assert_called_once()
+    mock_vector_model.return_value.encode.assert_called_once_with(
+        summary, normalize_embeddings=True
+    )
+    mock_connection.assert_called_once()
     mock_cursor.execute.assert_called_once()
     # Check that the SQL command matches the expected INSERT statement.
     actual_sql = mock_cursor.execute.call_args[0][0]
@@ -135,37 +234,31 @@ def test_vectorize_and_store_summary_success(mock_connect, mock_vector_model):
         video_path,
         [0.1, 0.2, 0.3],
     )
-    mock_conn.commit.assert_called_once()
-    mock_cursor.close.assert_called_once()
-    mock_conn.close.assert_called_once()
+    # Leaving the pooled connection block commits and returns it to the pool
+    mock_connection.return_value.__exit__.assert_called_once_with(None, None, None)
 
 
-@patch("indexing.index_manager.vector_model")
-@patch("indexing.index_manager.psycopg.connect")
-def test_vectorize_and_store_summary_db_error(mock_connect, mock_vector_model):
+@patch("indexing.index_manager.get_embedding_model")
+def test_vectorize_and_store_summary_db_error(mock_vector_model, mock_db):
+    mock_connection, mock_cursor = mock_db
     summary = "A summary of the video."
     video_path = "/videos/video1.mp4"
     mock_embedding = MagicMock()
     mock_embedding.tolist.return_value = [0.1, 0.2, 0.3]
-    mock_vector_model.encode.return_value = mock_embedding
-    mock_connect.side_effect = Exception("DB connection failed")
+    mock_vector_model.return_value.encode.return_value = mock_embedding
+    mock_connection.side_effect = DatabaseUnavailable("DB connection failed")
 
     index_manager.vectorize_and_store_summary(summary, video_path)
-    mock_connect.cursor.assert_not_called()
+    mock_cursor.execute.assert_not_called()
 
 
-@patch("indexing.index_manager.psycopg.connect")
-@patch("indexing.index_manager.vector_model")
-def test_query_videos_returns_paths(mock_vector_model, mock_connect):
+@patch("indexing.index_manager.get_embedding_model")
+def test_query_videos_returns_paths(mock_vector_model, mock_db):
+    mock_connection, mock_cursor = mock_db
     # Mock the vectorizer
     mock_embedding = MagicMock()
     mock_embedding.tolist.return_value = [0.1, 0.2, 0.3]
-    mock_vector_model.encode.return_value = mock_embedding
-    # Mock DB connection and cursor
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_connect.return_value = mock_conn
-    mock_conn.cursor.return_value = mock_cursor
+    mock_vector_model.return_value.encode.return_value = mock_embedding
     # Simulate DB returning 2 rows
     mock_cursor.fetchall.return_value = [
         (1, "summary1", "/path/to/video1.mp4"),
@@ -174,53 +267,462 @@ def test_query_videos_returns_paths(mock_vector_model, mock_connect):
     (summaries, paths) = index_manager.query_videos("tackle", result_limit=2)
     assert paths == ["/path/to/video1.mp4", "/path/to/video2.mp4"]
     assert summaries == ["summary1", "summary2"]
-    mock_vector_model.encode.assert_called_once_with("tackle")
-    mock_connect.assert_called_once()
+    mock_vector_model.return_value.encode.assert_called_once_with(
+        "tackle", normalize_embeddings=True
+    )
+    mock_connection.assert_called_once()
     mock_cursor.execute.assert_called()
-    mock_cursor.close.assert_called_once()
-    mock_conn.close.assert_called_once()
+    mock_connection.return_value.__exit__.assert_called_once()
 
 
-@patch("indexing.index_manager.psycopg.connect")
-@patch("indexing.index_manager.vector_model")
-def test_query_videos_empty_result(mock_vector_model, mock_connect):
+@patch("indexing.index_manager.get_embedding_model")
+def test_query_videos_empty_result(mock_vector_model, mock_db):
+    _, mock_cursor = mock_db
     mock_embedding = MagicMock()
     mock_embedding.tolist.return_value = [0.1, 0.2, 0.3]
-    mock_vector_model.encode.return_value = mock_embedding
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_connect.return_value = mock_conn
-    mock_conn.cursor.return_value = mock_cursor
+    mock_vector_model.return_value.encode.return_value = mock_embedding
     mock_cursor.fetchall.return_value = []
     result = index_manager.query_videos("try", result_limit=3)
     assert result == ([], [])
 
 
-@patch("indexing.index_manager.psycopg.connect")
-def test_video_file_indexed_success(mock_connect):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_connect.return_value = mock_conn
-    mock_conn.cursor.return_value = mock_cursor
+def test_search_settings_sql(monkeypatch):
+    monkeypatch.delenv("IVFFLAT_PROBES", raising=False)
+    monkeypatch.delenv("HNSW_EF_SEARCH", raising=False)
+    assert index_manager.search_settings_sql() is None
+    assert index_manager.search_settings_sql(probes=10, ef_search=80) == (
+        "SELECT set_config('ivfflat.probes', %s, true), "
+        "set_config('hnsw.ef_search', %s, true)",
+        ("10", "80"),
+    )
+    monkeypatch.setenv("HNSW_EF_SEARCH", "100")
+    assert index_manager.search_settings_sql() == (
+        "SELECT set_config('hnsw.ef_search', %s, true)",
+        ("100",),
+    )
+    with pytest.raises(ValueError, match="ivfflat_probes"):
+        index_manager.search_settings_sql(probes=0)
+
+
+@patch("indexing.index_manager.get_embedding_model")
+def test_query_videos_applies_accuracy_settings_before_search(
+    mock_vector_model, mock_db
+):
+    _, mock_cursor = mock_db
+    mock_vector_model.return_value.encode.return_value.tolist.return_value = [0.1]
+    mock_cursor.fetchall.return_value = []
+
+    index_manager.query_videos("scrum", result_limit=3, probes=20)
+
+    (settings_sql, settings_params), (search_sql, search_params) = [
+        c.args for c in mock_cursor.execute.call_args_list
+    ]
+    assert "set_config('ivfflat.probes', %s, true)" in settings_sql
+    assert settings_params[0] == "20"
+    assert "ORDER BY embedding" in search_sql and search_params == ([0.1], 3)
+
+
+def test_filter_sql():
+    where, params = index_manager.filter_sql(
+        {"date_from": date(2025, 8, 1), "source": None, "max_duration": 600}
+    )
+    assert where == "session_date >= %(date_from)s AND duration_s <= %(max_duration)s"
+    assert params == {"date_from": date(2025, 8, 1), "max_duration": 600}
+    assert index_manager.filter_sql({}) == ("", {})
+    with pytest.raises(ValueError, match="unknown search filters: team"):
+        index_manager.filter_sql({"team": "u18"})
+
+
+@pytest.mark.parametrize(
+    "extversion, iterative", [("0.6.2", False), ("0.8.0", True), ("1.0", True)]
+)
+@patch("indexing.index_manager.get_embedding_model")
+def test_query_videos_filtered_search_plan(
+    mock_vector_model, mock_db, monkeypatch, extversion, iterative
+):
+    monkeypatch.setattr(index_manager, "_iterative_scan", None)
+    monkeypatch.delenv("IVFFLAT_PROBES", raising=False)
+    monkeypatch.delenv("HNSW_EF_SEARCH", raising=False)
+    _, mock_cursor = mock_db
+    mock_vector_model.return_value.encode.return_value.tolist.return_value = [0.1]
+    mock_cursor.fetchone.return_value = (extversion,)
+    mock_cursor.fetchall.return_value = [(1, "summary1", "/v/1.mp4")]
+
+    result = index_manager.query_videos(
+        "scrum", result_limit=3, filters={"session_type": "tuesday_session"}
+    )
+
+    assert result == (["summary1"], ["/v/1.mp4"])
+    search_sql, search_params = mock_cursor.execute.call_args.args
+    assert search_params == {
+        "session_type": "tuesday_session",
+        "embedding": [0.1],
+        "limit": 3,
+    }
+    assert "WHERE session_type = %(session_type)s" in search_sql
+    settings = [c.args for c in mock_cursor.execute.call_args_list][1:-1]
+    if iterative:
+        # The index keeps scanning until enough rows pass the filter
+        assert "hnsw.iterative_scan" in settings[0][0]
+        assert "ORDER BY distance" in search_sql
+    else:
+        # Filter first, then rank the matching rows exactly
+        assert settings == []
+        assert "candidates AS MATERIALIZED" in search_sql
+    # The version is looked up once per process
+    index_manager.query_videos("ruck", filters={"session_type": "x"})
+    assert (
+        sum("pg_extension" in c.args[0] for c in mock_cursor.execute.call_args_list)
+        == 1
+    )
+
+
+@patch("indexing.index_manager.get_embedding_model")
+def test_query_videos_hybrid_runs_one_fused_query(mock_vector_model, mock_db):
+    mock_connection, mock_cursor = mock_db
+    mock_vector_model.return_value.encode.return_value.tolist.return_value = [0.1]
+    mock_cursor.fetchall.return_value = [(7, "3-2-1 ruck drill", "/v/7.mp4")]
+
+    result = index_manager.query_videos(
+        "3-2-1 Ruck drill", result_limit=5, ef_search=20, hybrid=True
+    )
+
+    assert result == (["3-2-1 ruck drill"], ["/v/7.mp4"])
+    # ef_search is raised so hnsw can return every vector candidate, and the
+    # setting is pipelined with the search
+    conn = mock_connection.return_value.__enter__.return_value
+    conn.pipeline.assert_called_once()
+    settings_call, search_call = mock_cursor.execute.call_args_list
+    assert settings_call.args == (
+        "SELECT set_config('hnsw.ef_search', %s, true)",
+        (str(index_manager.HYBRID_CANDIDATES),),
+    )
+    search_sql, params = search_call.args
+    assert "websearch_to_tsquery" in search_sql and "semantic s" in search_sql
+    assert params == {
+        "embedding": [0.1],
+        "query": "3-2-1 Ruck drill",
+        "candidates": index_manager.HYBRID_CANDIDATES,
+        "rrf_k": 60,
+        "limit": 5,
+    }
+
+
+@patch("indexing.index_manager.get_embedding_model")
+def test_query_videos_db_unavailable(mock_vector_model, mock_db):
+    mock_connection, _ = mock_db
+    mock_vector_model.return_value.encode.return_value.tolist.return_value = [0.1]
+    mock_connection.side_effect = DatabaseUnavailable("pool timeout")
+    assert index_manager.query_videos("try") == ([], [])
+
+
+@pytest.mark.parametrize(
+    "call, degraded",
+    [
+        (lambda: index_manager.query_videos("try"), ([], [])),
+        (lambda: index_manager.upsert_videos([("/v/1.mp4", "s", [1.0])]), 0),
+        (lambda: index_manager.video_file_indexed("/v/1.mp4"), False),
+        (lambda: index_manager.query_segments("scrum"), []),
+    ],
+)
+@patch("indexing.index_manager.register_vector_copy", return_value=0)
+@patch("indexing.index_manager.get_embedding_model")
+def test_database_errors_inside_the_block_degrade(
+    mock_vector_model, _register, mock_db, call, degraded
+):
+    import psycopg
+
+    _, mock_cursor = mock_db
+    mock_vector_model.return_value.encode.return_value.tolist.return_value = [0.1]
+    # e.g. a tree whose schema has not been migrated to the new columns
+    mock_cursor.execute.side_effect = psycopg.errors.UndefinedColumn("no column")
+    mock_cursor.copy.side_effect = psycopg.errors.UndefinedColumn("no column")
+    assert call() == degraded
+
+
+@patch("indexing.index_manager.get_embedding_model")
+def test_query_videos_reuses_cached_query_embedding(
+    mock_vector_model, mock_db, fresh_query_cache
+):
+    cache, log = fresh_query_cache
+    _, mock_cursor = mock_db
+    mock_embedding = MagicMock()
+    mock_embedding.tolist.return_value = [0.1, 0.2, 0.3]
+    mock_vector_model.return_value.encode.return_value = mock_embedding
+    mock_cursor.fetchall.return_value = []
+
+    index_manager.query_videos("Attack lineout", result_limit=2)
+    index_manager.query_videos("  attack   LINEOUT ", result_limit=2)
+
+    mock_vector_model.return_value.encode.assert_called_once_with(
+        "attack lineout", normalize_embeddings=True
+    )
+    assert mock_cursor.execute.call_args.args[1] == ([0.1, 0.2, 0.3], 2)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert log.top(1) == ["attack lineout"]
+
+
+@patch("indexing.index_manager.get_embedding_model")
+def test_warm_query_cache_encodes_top_logged_queries(
+    mock_vector_model, fresh_query_cache
+):
+    cache, log = fresh_query_cache
+    for query in ["scrum", "ruck", "ruck", "lineout", "lineout", "lineout"]:
+        log.record(query)
+    cache.put("lineout", [1.0])
+    mock_vector_model.return_value.encode.return_value = [
+        MagicMock(tolist=MagicMock(return_value=[2.0]))
+    ]
+
+    assert index_manager.warm_query_cache(top_n=2) == 1
+    mock_vector_model.return_value.encode.assert_called_once_with(
+        ["ruck"], batch_size=64, normalize_embeddings=True
+    )
+    assert cache.get("ruck") == [2.0]
+    assert "scrum" not in cache
+
+
+def test_video_file_indexed_success(mock_db):
+    _, mock_cursor = mock_db
     mock_cursor.fetchone.return_value = (True,)
     assert index_manager.video_file_indexed("/path/to/video.mp4") is True
 
 
-@patch("indexing.index_manager.psycopg.connect")
-def test_video_file_indexed_no_match(mock_connect):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_connect.return_value = mock_conn
-    mock_conn.cursor.return_value = mock_cursor
+def test_video_file_indexed_no_match(mock_db):
+    _, mock_cursor = mock_db
     mock_cursor.fetchone.return_value = (False,)
     assert index_manager.video_file_indexed("/path/to/video.mp4") is False
 
 
-@patch("indexing.index_manager.psycopg.connect")
-def test_video_file_indexed_no_match_empty(mock_connect):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_connect.return_value = mock_conn
-    mock_conn.cursor.return_value = mock_cursor
+def test_video_file_indexed_no_match_empty(mock_db):
+    _, mock_cursor = mock_db
     mock_cursor.fetchone.return_value = None
     assert index_manager.video_file_indexed("/path/to/video.mp4") is False
+
+
+def test_local_provider_defaults_and_shared_instance():
+    config = IndexingConfig(
+        {"ai_provider": "local", "provider": {"max_concurrency": 2}}
+    )
+    assert config.provider.base_url == "http://localhost:8000/v1"
+    assert config.provider.api_key_env == ""
+    provider = get_provider(config)
+    assert provider is get_provider(config)
+    client = provider.client
+    assert str(client.base_url).startswith("http://localhost:8000/v1")
+    assert client.max_retries == 0
+    provider.close()
+
+
+def test_provider_max_concurrency_caps_requests_in_flight():
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    active = peak = 0
+    lock = threading.Lock()
+
+    def _create(**kwargs):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return []  # an empty stream
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = _create
+    provider = ChatProvider(
+        ProviderConfig("local", {"max_concurrency": 2}), client=client
+    )
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(lambda _: provider.complete({}), range(12)))
+    assert peak == 2
+
+
+def test_provider_streams_and_reassembles_the_completion():
+    from types import SimpleNamespace
+
+    def chunk(content=None, finish_reason=None, usage=None):
+        choices = (
+            []
+            if usage
+            else [
+                SimpleNamespace(
+                    delta=SimpleNamespace(content=content), finish_reason=finish_reason
+                )
+            ]
+        )
+        return SimpleNamespace(model="gpt-4o-mini", choices=choices, usage=usage)
+
+    usage = SimpleNamespace(prompt_tokens=50, completion_tokens=3)
+    stream = MagicMock()
+    stream.__iter__.return_value = iter(
+        [
+            chunk(""),
+            chunk("A "),
+            chunk("summary."),
+            chunk(finish_reason="stop"),
+            chunk(usage=usage),
+        ]
+    )
+    client = MagicMock()
+    client.chat.completions.create.return_value = stream
+    provider = ChatProvider(ProviderConfig("openai"), client=client)
+
+    response = provider.complete({"model": "gpt-4o-mini", "messages": []})
+
+    client.chat.completions.create.assert_called_once_with(
+        model="gpt-4o-mini",
+        messages=[],
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    assert response.choices[0].message.content == "A summary."
+    assert response.choices[0].finish_reason == "stop"
+    assert response.usage is usage
+    assert provider.last_ttft_s is not None and provider.last_ttft_s >= 0
+    stream.close.assert_called_once()
+
+
+@patch("indexing.index_manager.upsert_videos", return_value=3)
+@patch("indexing.index_manager.get_embedding_model")
+def test_store_summaries_encodes_in_one_batch_and_writes_in_bulk(
+    mock_vector_model, mock_upsert
+):
+    import numpy as np
+
+    mock_vector_model.return_value.encode.return_value = np.array(
+        [[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]]
+    )
+    records = [("s1", "/v/1.mp4"), ("s2", "/v/2.mp4"), ("s3", "/v/3.mp4")]
+
+    assert index_manager.store_summaries(records, batch_size=16) == 3
+
+    mock_vector_model.return_value.encode.assert_called_once_with(
+        ["s1", "s2", "s3"],
+        batch_size=16,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+    )
+    mock_upsert.assert_called_once()
+    rows, metadata = mock_upsert.call_args[0]
+    assert rows[2] == ("/v/3.mp4", "s3", [0.6, 0.8])
+    assert set(metadata) == {"/v/1.mp4", "/v/2.mp4", "/v/3.mp4"}
+
+
+@patch("indexing.index_manager.register_vector_copy", return_value=4242)
+def test_upsert_videos_copies_into_stage_and_merges_once(mock_register, mock_db):
+    mock_connection, cursor = mock_db
+    copy = cursor.copy.return_value.__enter__.return_value
+    records = [("/v/1.mp4", "s1", [1.0, 0.0]), ("/v/1.mp4", "s1b", [0.0, 1.0])]
+
+    metadata = {"/v/1.mp4": {"session_date": date(2025, 8, 6), "file_size": 10}}
+
+    assert index_manager.upsert_videos(records, metadata) == 2
+
+    mock_connection.assert_called_once()
+    assert "FORMAT BINARY" in cursor.copy.call_args[0][0]
+    types = copy.set_types.call_args[0][0]
+    assert types[:4] == ["int4", "text", "text", 4242]
+    assert types[-1] == "text" and len(types) == 5 + len(METADATA_COLUMNS)
+    row = copy.write_row.call_args_list[1][0][0]
+    assert row[:4] == (1, "/v/1.mp4", "s1b", [0.0, 1.0])
+    assert dict(zip(METADATA_COLUMNS, row[4:]))["session_date"] == date(2025, 8, 6)
+    merge_sql = cursor.execute.call_args[0][0]
+    assert "DISTINCT ON (path)" in merge_sql and "ON CONFLICT (path)" in merge_sql
+    # Values missing from a write keep what is stored
+    assert "content_hash = COALESCE(EXCLUDED.content_hash, videos.content_hash)" in (
+        merge_sql
+    )
+
+
+def test_upsert_videos_db_unavailable(mock_db):
+    mock_connection, _ = mock_db
+    mock_connection.side_effect = DatabaseUnavailable("pool timeout")
+    assert index_manager.upsert_videos([("/v/1.mp4", "s", [1.0])]) == 0
+
+
+@patch("indexing.index_manager.upsert_videos", return_value=2)
+@patch("indexing.index_manager.get_embedding_model")
+def test_store_summaries_adds_transcripts(mock_vector_model, mock_upsert, tmp_path):
+    import numpy as np
+
+    mock_vector_model.return_value.encode.return_value = np.array([[1.0], [1.0]])
+    srt = tmp_path / "1.srt"
+    srt.write_text(
+        "1\n00:00:00,000 --> 00:00:02,000\nRun the 3-2-1 ruck drill.\n",
+        encoding="utf-8",
+    )
+    records = [("s1", "/v/1.mp4"), ("s2", "/v/2.mp4")]
+
+    index_manager.store_summaries(
+        records,
+        transcript_files={"/v/1.mp4": str(srt), "/v/2.mp4": str(tmp_path / "gone.srt")},
+    )
+
+    metadata = mock_upsert.call_args[0][1]
+    assert metadata["/v/1.mp4"]["transcript"] == "Run the 3-2-1 ruck drill."
+    assert "transcript" not in metadata["/v/2.mp4"]
+
+
+def test_store_summaries_empty_is_noop(mock_db):
+    mock_connection, _ = mock_db
+    assert index_manager.store_summaries([]) == 0
+    mock_connection.assert_not_called()
+
+
+@patch("indexing.index_manager.get_embedding_model")
+def test_store_segments_replaces_rows_per_video(mock_vector_model, mock_db):
+    import numpy as np
+
+    _, cursor = mock_db
+    mock_vector_model.return_value.encode.return_value = np.array(
+        [[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]]
+    )
+    windows = {
+        "/v/1.mp4": [
+            {"start_ms": 0, "end_ms": 900, "text": "a"},
+            {"start_ms": 900, "end_ms": 1800, "text": "b"},
+        ],
+        "/v/2.mp4": [{"start_ms": 0, "end_ms": 500, "text": "c"}],
+    }
+
+    assert index_manager.store_segments(windows, batch_size=8) == 3
+
+    mock_vector_model.return_value.encode.assert_called_once_with(
+        ["a", "b", "c"], batch_size=8, normalize_embeddings=True, convert_to_numpy=True
+    )
+    delete_sql, delete_params = cursor.execute.call_args[0]
+    assert "DELETE FROM video_segments" in delete_sql
+    assert delete_params == (["/v/1.mp4", "/v/2.mp4"],)
+    rows = cursor.executemany.call_args[0][1]
+    assert rows[1] == ("/v/1.mp4", 900, 1800, "b", [0.0, 1.0])
+    assert rows[2] == ("/v/2.mp4", 0, 500, "c", [0.6, 0.8])
+
+
+@patch("indexing.index_manager.get_embedding_model")
+def test_query_segments_returns_timestamped_hits(mock_vector_model, mock_db):
+    _, cursor = mock_db
+    mock_vector_model.return_value.encode.return_value.tolist.return_value = [0.1]
+    cursor.fetchall.return_value = [("/v/1.mp4", 61000, 75000, "ruck drill")]
+
+    hits = index_manager.query_segments("Ruck drill", result_limit=3)
+
+    assert hits == [
+        {"path": "/v/1.mp4", "start_ms": 61000, "end_ms": 75000, "text": "ruck drill"}
+    ]
+    sql, params = cursor.execute.call_args[0]
+    assert "FROM video_segments" in sql and "<=>" in sql
+    assert params == ([0.1], 3)
+
+
+@patch("indexing.index_manager.get_embedding_model")
+def test_query_segments_db_unavailable(mock_vector_model, mock_db):
+    mock_connection, _ = mock_db
+    mock_connection.side_effect = DatabaseUnavailable("pool timeout")
+    mock_vector_model.return_value.encode.return_value.tolist.return_value = [0.1]
+    assert index_manager.query_segments("scrum") == []
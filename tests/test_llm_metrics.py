@@ -0,0 +1,131 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for per-call LLM instrumentation."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from core.pipeline_models import IndexingConfig
+from indexing import index_manager
+from indexing.llm_metrics import LLMMetrics, estimate_cost, llm_metrics
+from indexing.providers import ChatProvider
+
+
+def test_estimate_cost_with_cache_snapshot_and_batch_discount():
+    # 1M uncached prompt + 1M cached + 1M completion on gpt-4o-mini
+    assert estimate_cost(
+        "gpt-4o-mini", 2_000_000, 1_000_000, 1_000_000
+    ) == pytest.approx(0.15 + 0.075 + 0.60)
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0) == pytest.approx(0.15)
+    assert estimate_cost("gpt-4o-mini", 1_000_000, 0, batch=True) == pytest.approx(
+        0.075
+    )
+    assert estimate_cost("my-local-model", 10, 10) is None
+    assert (
+        estimate_cost(
+            "my-local-model", 1_000_000, 0, prices={"my-local-model": [1, 1, 1]}
+        )
+        == 1
+    )
+
+
+def test_summary_aggregates_and_writes_json(tmp_path):
+    metrics = LLMMetrics()
+    usage = {
+        "prompt_tokens": 100,
+        "completion_tokens": 20,
+        "prompt_tokens_details": {"cached_tokens": 64},
+    }
+    metrics.record("gpt-4o-mini", "single", usage=usage, wall_s=1.0, ttft_s=0.5)
+    metrics.record("gpt-4o-mini", "map", usage=usage, wall_s=3.0, ttft_s=1.5, retries=2)
+    metrics.record("gpt-4o-mini", "map", wall_s=0.2, retries=5, error="RateLimitError")
+
+    summary = metrics.summary()
+    total = summary["total"]
+    assert (total["calls"], total["errors"], total["retries"]) == (3, 1, 7)
+    assert (total["prompt_tokens"], total["cached_tokens"]) == (200, 128)
+    assert total["wall_max_s"] == 3.0
+    assert summary["by_model_stage"]["gpt-4o-mini/map"]["calls"] == 2
+    assert "gpt-4o-mini/single" in metrics.report()
+
+    with open(metrics.write(str(tmp_path)), encoding="utf-8") as f:
+        written = json.load(f)
+    assert len(written["calls"]) == 3
+    assert written["summary"]["total"]["cost_usd"] == total["cost_usd"]
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    """Streams a two-chunk completion, then a usage chunk, as server-sent events."""
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        assert request["stream"] and request["stream_options"]["include_usage"]
+        base = {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "local-model",
+        }
+        chunks = [
+            {
+                "choices": [
+                    {"index": 0, "delta": {"role": "assistant", "content": "A "}}
+                ]
+            },
+            {"choices": [{"index": 0, "delta": {"content": "summary."}}]},
+            {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+            {
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": 50,
+                    "completion_tokens": 5,
+                    "total_tokens": 55,
+                },
+            },
+        ]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(f"data: {json.dumps({**base, **chunk})}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def test_complete_records_latency_ttft_and_tokens_against_local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    config = IndexingConfig(
+        {
+            "ai_provider": "local",
+            "model": "local-model",
+            "provider": {"base_url": f"http://127.0.0.1:{server.server_port}/v1"},
+        }
+    )
+    provider = ChatProvider(config.provider)
+    try:
+        llm_metrics.reset()
+        with patch("indexing.index_manager.get_provider", return_value=provider):
+            summary, _ = index_manager._complete(
+                config, index_manager.build_summary_request(config, "text"), None
+            )
+    finally:
+        provider.close()
+        server.shutdown()
+
+    assert summary == "A summary."
+    (call,) = llm_metrics.calls
+    assert call["model"] == "local-model" and call["retries"] == 0
+    assert (call["prompt_tokens"], call["completion_tokens"]) == (50, 5)
+    assert 0 < call["ttft_s"] <= call["wall_s"]
+    assert call["cost_usd"] is None
@@ -0,0 +1,91 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for indexing.moments transcript windows."""
+
+from indexing.moments import (
+    split_sentences,
+    timed_sentences,
+    transcript_windows,
+    window_sentences,
+)
+
+
+def seg(start, end, text):
+    return {"start_time": start, "end_time": end, "text": text}
+
+
+def test_split_sentences():
+    assert split_sentences("Hit low.  Drive   through! Why? ok") == [
+        "Hit low.",
+        "Drive through!",
+        "Why?",
+        "ok",
+    ]
+
+
+def test_timed_sentences_interpolates_within_a_segment():
+    sentences = timed_sentences(
+        [seg("00:00:10,000", "00:00:20,000", "Ruck now. Hold the ball.")]
+    )
+    assert [s["text"] for s in sentences] == ["Ruck now.", "Hold the ball."]
+    assert sentences[0]["start_ms"] == 10_000
+    assert 13_000 < sentences[0]["end_ms"] < sentences[1]["start_ms"] < 15_000
+    assert sentences[1]["end_ms"] == 20_000
+
+
+def test_timed_sentences_joins_sentences_across_segments():
+    sentences = timed_sentences(
+        [
+            seg("00:00:01,000", "00:00:02,000", "Good work. Now the lineout"),
+            seg("00:00:02,000", "00:00:04,000", "calls for the forwards."),
+            seg("00:00:05,000", "00:00:06,000", "no punctuation at the end"),
+        ]
+    )
+    assert [s["text"] for s in sentences] == [
+        "Good work.",
+        "Now the lineout calls for the forwards.",
+        "no punctuation at the end",
+    ]
+    assert sentences[1]["start_ms"] < 2_000
+    assert sentences[1]["end_ms"] == 4_000
+    assert sentences[2]["start_ms"] == 5_000
+
+
+def test_window_sentences_overlap_and_coverage():
+    sentences = [
+        {"start_ms": i * 1000, "end_ms": i * 1000 + 900, "text": f"S{i}."}
+        for i in range(7)
+    ]
+    windows = window_sentences(sentences, window=3, overlap=1)
+    assert [w["text"] for w in windows] == ["S0. S1. S2.", "S2. S3. S4.", "S4. S5. S6."]
+    assert windows[1]["start_ms"] == 2000
+    assert windows[1]["end_ms"] == 4900
+
+    assert window_sentences(sentences, window=0) == []
+    assert len(window_sentences(sentences[:2], window=3)) == 1
+
+
+def test_window_sentences_respects_max_chars():
+    sentences = [{"start_ms": i, "end_ms": i, "text": "x" * 10} for i in range(4)]
+    windows = window_sentences(sentences, window=4, overlap=0, max_chars=15)
+    assert [w["text"] for w in windows] == ["x" * 10 + " " + "x" * 10] * 2
+
+
+def test_transcript_windows_from_srt(tmp_path):
+    srt = tmp_path / "drill.srt"
+    srt.write_text(
+        "1\n00:00:00,000 --> 00:00:03,000\nSet up the ruck. Ball carrier down.\n\n"
+        "2\n00:00:03,000 --> 00:00:06,000\nSupport drives through.\n\n"
+        "3\n00:01:00,000 --> 00:01:04,000\nNow lineouts. Throw to the front.\n",
+        encoding="utf-8",
+    )
+    windows = transcript_windows(str(srt), window=2, overlap=0)
+    assert [(w["start_ms"], w["end_ms"]) for w in windows] == [
+        (0, 3000),
+        (3000, 61575),
+        (61696, 64000),
+    ]
+    assert windows[0]["text"] == "Set up the ruck. Ball carrier down."
@@ -0,0 +1,90 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Parity of the ONNX Runtime embedding backend with the torch model."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+st_models = pytest.importorskip("sentence_transformers.models")
+
+from sentence_transformers import SentenceTransformer  # noqa: E402
+
+from indexing.onnx_embedder import OnnxEmbedder, export_onnx_embedder  # noqa: E402
+
+WORDS = (
+    "the ruck maul lineout scrum tackle drill pass kick ball support player "
+    "low body height clear quick communication defence attack red blue green"
+).split()
+TEXTS = [
+    "attack lineout",
+    "the 3 2 1 ruck drill with low body height",
+    "quick ball for the scrum half, then clear the ruck and pass",
+    "defence communication on the tackle",
+]
+
+
+@pytest.fixture(scope="module")
+def tiny_model_dir(tmp_path_factory):
+    """A small randomly initialised BERT wrapped as a sentence-transformers model."""
+    root = tmp_path_factory.mktemp("tiny")
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *WORDS, *"0123456789,."]
+    (root / "vocab.txt").write_text("\n".join(vocab), encoding="utf-8")
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=64,
+    )
+    transformers.BertModel(config).save_pretrained(root / "hf")
+    transformers.BertTokenizerFast(str(root / "vocab.txt")).save_pretrained(root / "hf")
+
+    transformer = st_models.Transformer(str(root / "hf"), max_seq_length=32)
+    pooling = st_models.Pooling(32, pooling_mode="cls")
+    model = SentenceTransformer(
+        modules=[transformer, pooling, st_models.Normalize()], device="cpu"
+    )
+    model.save(str(root / "st"))
+    return str(root / "st")
+
+
+@pytest.fixture(scope="module")
+def exported(tiny_model_dir, tmp_path_factory):
+    out = str(tmp_path_factory.mktemp("onnx"))
+    export_onnx_embedder(tiny_model_dir, out, quantize=True)
+    return out
+
+
+def test_onnx_matches_torch_embeddings(tiny_model_dir, exported):
+    reference = SentenceTransformer(tiny_model_dir, device="cpu").encode(TEXTS)
+    onnx = OnnxEmbedder(exported).encode(TEXTS, batch_size=3)
+
+    assert onnx.shape == reference.shape
+    assert np.allclose(onnx, reference, atol=1e-4)
+    single = OnnxEmbedder(exported).encode(TEXTS[1])
+    assert single.shape == (32,)
+    assert np.allclose(single, reference[1], atol=1e-4)
+
+
+def test_int8_stays_close_to_torch(tiny_model_dir, exported):
+    reference = SentenceTransformer(tiny_model_dir, device="cpu").encode(TEXTS)
+    quantized = OnnxEmbedder(exported, quantized=True).encode(TEXTS)
+
+    cosine = (quantized * reference).sum(axis=1)
+    assert cosine.min() > 0.98
+    # Nearest neighbour of every text is unchanged
+    assert (np.argsort(-(quantized @ reference.T), axis=1)[:, 0] == np.arange(4)).all()
+
+
+def test_missing_export_has_clear_error(tmp_path):
+    with pytest.raises(FileNotFoundError, match="export_onnx_embedder"):
+        OnnxEmbedder(str(tmp_path))
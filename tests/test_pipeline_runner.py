@@ -103,3 +103,115 @@ def test_build_index_mismatch():
         ValueError, match="Mismatched video and transcription file counts"
     ):
         runner.build_index(video_files, transcription_files)
+
+
+@patch("core.pipeline_runner.store_summaries")
+@patch("core.pipeline_runner.summarize_srt_file")
+def test_build_index_concurrent_stores_completed_and_skips_failures(
+    mock_summarize, mock_store
+):
+    raw = minimal_config()
+    raw["indexing"]["batch_size"] = 3
+    runner = PipelineRunner(VideoProcessingConfig(raw))
+
+    def _summarize(cfg, srt_file, limiter):
+        assert limiter is not None
+        if srt_file == "b.srt":
+            raise ValueError("No response from OpenAI API")
+        return f"summary of {srt_file}"
+
+    mock_summarize.side_effect = _summarize
+
+    runner.build_index(["a.mp4", "b.mp4", "c.mp4"], ["a.srt", "b.srt", "c.srt"])
+
+    stored = sorted(r for call in mock_store.call_args_list for r in call.args[0])
+    assert stored == [("summary of a.srt", "a.mp4"), ("summary of c.srt", "c.mp4")]
+    # Both fit under write_batch_size, so one bulk write
+    assert mock_store.call_count == 1
+
+
+@patch("core.pipeline_runner.store_summaries")
+@patch("core.pipeline_runner.summarize_srt_file")
+def test_build_index_stores_completed_summaries_when_interrupted(
+    mock_summarize, mock_store
+):
+    raw = minimal_config()
+    raw["indexing"].update({"batch_size": 1, "write_batch_size": 2})
+    runner = PipelineRunner(VideoProcessingConfig(raw))
+
+    def _summarize(cfg, srt_file, limiter):
+        if srt_file == "b.srt":
+            raise KeyboardInterrupt
+        return f"summary of {srt_file}"
+
+    mock_summarize.side_effect = _summarize
+
+    with pytest.raises(KeyboardInterrupt):
+        runner.build_index(["a.mp4", "b.mp4"], ["a.srt", "b.srt"])
+
+    mock_store.assert_called_once()
+    assert mock_store.call_args.args[0] == [("summary of a.srt", "a.mp4")]
+
+
+@patch("core.pipeline_runner.store_segments", return_value=0)
+@patch("core.pipeline_runner.store_summaries")
+@patch("core.pipeline_runner.summarize_srt_file")
+def test_build_index_reuses_summary_for_near_duplicates(
+    mock_summarize, mock_store, mock_store_segments, tmp_path
+):
+    transcript = (
+        "1\n00:00:00,000 --> 00:00:05,000\n"
+        "Support player hits the ruck low and drives through on the whistle.\n\n"
+        "2\n00:00:05,000 --> 00:00:09,000\n"
+        "Scrum half clears, rotate after five reps and switch sides.\n"
+    )
+    a, b = tmp_path / "a.srt", tmp_path / "b.srt"
+    a.write_text(transcript, encoding="utf-8")
+    b.write_text(transcript, encoding="utf-8")
+    mock_summarize.return_value = "ruck drill"
+
+    runner = PipelineRunner(VideoProcessingConfig(minimal_config()))
+    runner.build_index(["a.mp4", "b.mp4"], [str(a), str(b)])
+
+    mock_summarize.assert_called_once()
+    stored = sorted(r for call in mock_store.call_args_list for r in call.args[0])
+    assert stored == [("ruck drill", "a.mp4"), ("ruck drill", "b.mp4")]
+
+
+@patch("core.pipeline_runner.store_segments")
+def test_index_segments_batches_whole_videos(mock_store, tmp_path):
+    cfg = minimal_config()
+    cfg["indexing"].update({"embed_batch_size": 3, "segment_window": 1})
+    runner = PipelineRunner(VideoProcessingConfig(cfg))
+    mock_store.side_effect = lambda pending, batch_size: sum(
+        len(w) for w in pending.values()
+    )
+    srt_files = []
+    for name, lines in [("a", 2), ("b", 2), ("c", 1)]:
+        srt = tmp_path / f"{name}.srt"
+        srt.write_text(
+            "\n\n".join(
+                f"{i}\n00:00:0{i},000 --> 00:00:0{i},900\nLine {i}."
+                for i in range(1, lines + 1)
+            ),
+            encoding="utf-8",
+        )
+        srt_files.append(str(srt))
+    videos = ["/v/a.mp4", "/v/b.mp4", "/v/c.mp4"]
+
+    assert (
+        runner.index_segments(videos + ["/v/missing.mp4"], srt_files + ["/nope.srt"])
+        == 5
+    )
+
+    batches = [list(call.args[0]) for call in mock_store.call_args_list]
+    assert batches == [["/v/a.mp4", "/v/b.mp4"], ["/v/c.mp4"]]
+
+
+@patch("core.pipeline_runner.store_segments")
+def test_index_segments_disabled(mock_store):
+    cfg = minimal_config()
+    cfg["indexing"]["segment_window"] = 0
+    runner = PipelineRunner(VideoProcessingConfig(cfg))
+    assert runner.index_segments(["/v/a.mp4"], ["/v/a.srt"]) == 0
+    mock_store.assert_not_called()
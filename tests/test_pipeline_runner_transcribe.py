@@ -9,6 +9,7 @@ from unittest.mock import MagicMock, patch
 
 from core.pipeline_models import VideoProcessingConfig
 from core.pipeline_runner import PipelineRunner
+from indexing.segments import read_segments
 
 
 def minimal_config(tmp_dir: str, preserve_tree: bool = True):
@@ -104,3 +105,109 @@ def test_pipeline_runner_transcribe(tmp_path) -> None:
     # Assert that whisper was invoked with the correct parameters
     # This part of the test might need to be adjusted based on the actual implementation
     # and the expected behavior of the transcribe_to_srt method.
+
+
+@patch("core.pipeline_runner.subprocess.run")
+@patch("core.pipeline_runner.convert_mp4_to_wav")
+def test_transcribe_writes_srt_and_segments_sidecar(mock_conv, mock_run, tmp_path):
+    cfg = VideoProcessingConfig(minimal_config(str(tmp_path), preserve_tree=False))
+    runner = PipelineRunner(cfg)
+
+    audio_p = tmp_path / "video.wav"
+    audio_p.write_text("wav")
+    mock_conv.return_value = str(audio_p)
+
+    def _fake_whisper(cmd, **kwargs):
+        assert cmd[cmd.index("--output_format") + 1] == "json"
+        (tmp_path / "video.json").write_text(
+            '{"segments": [{"start": 0.0, "end": 1.0, "text": " Hi", "avg_logprob": -0.2}]}',
+            encoding="utf-8",
+        )
+        return MagicMock()
+
+    mock_run.side_effect = _fake_whisper
+
+    out = runner.transcribe_to_srt(["/any/where/video.mp4"])
+
+    srt = tmp_path / "video.srt"
+    assert out == [str(srt)]
+    assert "00:00:00,000 --> 00:00:01,000\nHi" in srt.read_text(encoding="utf-8")
+    assert (tmp_path / "video.segments.json").exists()
+    assert not (tmp_path / "video.json").exists()
+
+
+@patch("core.pipeline_runner.subprocess.run")
+@patch("core.pipeline_runner.convert_mp4_to_wav")
+def test_transcribe_batches_clips_into_one_session(mock_conv, mock_run, tmp_path):
+    raw = minimal_config(str(tmp_path), preserve_tree=False)
+    raw["transcription"]["batch_size"] = 2
+    runner = PipelineRunner(VideoProcessingConfig(raw))
+
+    def _mk_audio(vf, output_dir=None):
+        p = tmp_path / (vf.rsplit("/", 1)[1][:-4] + ".wav")
+        p.write_text("wav")
+        return str(p)
+
+    def _fake_whisper(cmd, **kwargs):
+        # Simulate whisper skipping the second clip
+        (tmp_path / "a.json").write_text(
+            '{"segments": [{"start": 0.0, "end": 1.0, "text": "A"}]}', encoding="utf-8"
+        )
+        return MagicMock()
+
+    mock_conv.side_effect = _mk_audio
+    mock_run.side_effect = _fake_whisper
+
+    out = runner.transcribe_to_srt(["/v/a.mp4", "/v/b.mp4", "/v/c.mp4"])
+
+    # 3 clips with batch_size=2 -> two whisper sessions
+    assert mock_run.call_count == 2
+    first_cmd = mock_run.call_args_list[0][0][0]
+    assert first_cmd[-2:] == [str(tmp_path / "a.wav"), str(tmp_path / "b.wav")]
+    assert out == [str(tmp_path / "a.srt")]
+    assert not list(tmp_path.glob("*.wav"))
+
+
+@patch("core.pipeline_runner.extract_audio_slice")
+@patch("core.pipeline_runner.subprocess.run")
+@patch("core.pipeline_runner.convert_mp4_to_wav")
+def test_transcribe_refines_low_confidence_regions(
+    mock_conv, mock_run, mock_slice, tmp_path
+):
+    raw = minimal_config(str(tmp_path), preserve_tree=False)
+    raw["transcription"]["refinement"] = {"model_size": "medium", "padding_ms": 0}
+    runner = PipelineRunner(VideoProcessingConfig(raw))
+
+    audio_p = tmp_path / "video.wav"
+    audio_p.write_text("wav")
+    mock_conv.return_value = str(audio_p)
+    mock_slice.side_effect = lambda audio, start, end, out: out
+
+    def _fake_whisper(cmd, **kwargs):
+        model = cmd[cmd.index("--model") + 1]
+        if model == "tiny":
+            (tmp_path / "video.json").write_text(
+                '{"segments": ['
+                '{"start": 0.0, "end": 1.0, "text": "ok", "avg_logprob": -0.1},'
+                '{"start": 1.0, "end": 2.0, "text": "mumble", "avg_logprob": -2.0}]}',
+                encoding="utf-8",
+            )
+        else:
+            assert cmd[-1].endswith("video.refine0.wav")
+            (tmp_path / "video.refine0.json").write_text(
+                '{"segments": [{"start": 0.0, "end": 1.0, "text": "clear"}]}',
+                encoding="utf-8",
+            )
+        return MagicMock()
+
+    mock_run.side_effect = _fake_whisper
+
+    runner.transcribe_to_srt(["/any/where/video.mp4"])
+
+    assert mock_run.call_count == 2
+    mock_slice.assert_called_once()
+    assert mock_slice.call_args[0][1:3] == (1000, 2000)
+    segs = read_segments(str(tmp_path / "video.segments.json"))
+    assert [(s["text"], s["tier"]) for s in segs] == [("ok", 1), ("clear", 2)]
+    assert segs[1]["start_ms"] == 1000
+    assert not (tmp_path / "video.refine0.json").exists()
@@ -0,0 +1,122 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for the query embedding cache and query log."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from indexing.query_cache import QueryEmbeddingCache, QueryLog, normalize_query
+from indexing.registry import lowercases_input
+
+
+def test_normalize_query_folds_case_only_on_request():
+    assert normalize_query("  Attack\tLINEOUT \n") == "Attack LINEOUT"
+    assert normalize_query("  Attack\tLINEOUT \n", casefold=True) == "attack lineout"
+    assert normalize_query("３-2-1 ruck", casefold=True) == "3-2-1 ruck"
+
+
+def test_lowercases_input_follows_the_tokenizer():
+    from tokenizers import Tokenizer, normalizers
+    from tokenizers.models import WordLevel
+
+    tokenizer = Tokenizer(WordLevel({"a": 0}, unk_token="a"))
+    model = MagicMock(spec=["tokenizer"], tokenizer=tokenizer)
+    assert not lowercases_input(model)
+    tokenizer.normalizer = normalizers.Lowercase()
+    assert lowercases_input(model)
+    assert lowercases_input(MagicMock(tokenizer=MagicMock(do_lower_case=True)))
+    # e.g. the embedding service client
+    assert not lowercases_input(object())
+
+
+def test_cache_evicts_least_recently_used():
+    cache = QueryEmbeddingCache(max_size=2, ttl_s=0)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    assert cache.get("a") == [1.0]  # "b" is now least recently used
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    assert cache.get("c") == [3.0]
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.75
+
+
+def test_cache_expires_entries_after_ttl():
+    cache = QueryEmbeddingCache(max_size=4, ttl_s=10)
+    with patch("indexing.query_cache.time.monotonic", return_value=100.0):
+        cache.put("a", [1.0])
+    with patch("indexing.query_cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") == [1.0]
+    with patch("indexing.query_cache.time.monotonic", return_value=111.0):
+        assert "a" not in cache
+        assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_cache_disabled_when_size_is_zero():
+    cache = QueryEmbeddingCache(max_size=0)
+    cache.put("a", [1.0])
+    assert cache.get("a") is None
+    assert cache.stats()["hit_rate"] == 0.0
+
+
+def test_query_log_ranks_persists_and_reloads(tmp_path):
+    path = tmp_path / "query_log.json"
+    log = QueryLog(str(path), save_every=0)
+    for query in ["scrum", "lineout", "ruck", "lineout", "ruck", "lineout"]:
+        log.record(query)
+    assert log.top(2) == ["lineout", "ruck"]
+    assert not path.exists()
+
+    log.save()
+    assert json.loads(path.read_text()) == {"lineout": 3, "ruck": 2, "scrum": 1}
+    assert QueryLog(str(path)).top(3) == ["lineout", "ruck", "scrum"]
+
+
+def test_query_log_saves_periodically_and_prunes(tmp_path):
+    path = tmp_path / "nested" / "query_log.json"
+    log = QueryLog(str(path), max_entries=2, save_every=3)
+    log.record("a")
+    log.record("a")
+    assert not path.exists()
+    log.record("b")
+    log.wait()  # saved off the recording thread
+    assert json.loads(path.read_text()) == {"a": 2, "b": 1}
+
+    log.record("c")
+    assert len(log.top(10)) == 2
+    assert log.top(1) == ["a"]
+
+
+def test_query_log_saves_merge_counts_of_processes_sharing_the_file(tmp_path):
+    path = tmp_path / "query_log.json"
+    first = QueryLog(str(path), save_every=0)
+    second = QueryLog(str(path), save_every=0)
+    first.record("lineout")
+    first.record("scrum")
+    second.record("lineout")
+    first.save()
+    second.save()
+    first.save()  # nothing new: must not count its searches twice
+
+    assert json.loads(path.read_text()) == {"lineout": 2, "scrum": 1}
+    assert second.top(2) == ["lineout", "scrum"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "query_log.json",
+        "query_log.json.lock",
+    ]
+
+
+def test_query_log_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "query_log.json"
+    path.write_text("{not json")
+    assert QueryLog(str(path)).top(5) == []
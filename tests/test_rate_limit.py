@@ -0,0 +1,107 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for indexing.rate_limit token buckets and backoff."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import httpx
+import openai
+import pytest
+
+from indexing.rate_limit import RateLimiter, TokenBucket, call_with_backoff
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def rate_limit_error(retry_after=None):
+    headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("slow down", response=response, body=None)
+
+
+def test_token_bucket_waits_for_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(60, capacity=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    # Empty: one token per second at 60/min
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_token_bucket_unlimited_and_oversized_requests():
+    clock = FakeClock()
+    assert TokenBucket(0, clock=clock, sleep=clock.sleep).acquire(10**6) == 0.0
+    bucket = TokenBucket(100, clock=clock, sleep=clock.sleep)
+    # Larger than capacity is clamped so it does not block forever
+    assert bucket.acquire(10**6) == 0.0
+
+
+def test_call_with_backoff_honours_retry_after_and_adapts_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(120, 0, clock=clock, sleep=clock.sleep)
+    func = MagicMock(side_effect=[rate_limit_error(retry_after=3), "ok"])
+
+    assert call_with_backoff(func, limiter=limiter, sleep=clock.sleep) == "ok"
+    assert func.call_count == 2
+    assert 3.0 in clock.sleeps
+    # halved by the 429, then nudged back up by the success
+    assert limiter.requests.rate_per_minute == pytest.approx(66.0)
+
+
+def test_call_with_backoff_gives_up_after_max_retries():
+    clock = FakeClock()
+    func = MagicMock(side_effect=rate_limit_error())
+    with pytest.raises(openai.RateLimitError):
+        call_with_backoff(func, max_retries=2, sleep=clock.sleep)
+    assert func.call_count == 3
+    assert len(clock.sleeps) == 2
+
+
+def test_call_with_backoff_does_not_retry_other_errors():
+    func = MagicMock(side_effect=ValueError("bad"))
+    with pytest.raises(ValueError):
+        call_with_backoff(func, sleep=lambda s: None)
+    func.assert_called_once()
+
+
+def test_max_concurrency_bounds_nested_pools():
+    limiter = RateLimiter(max_concurrency=3)
+    lock = threading.Lock()
+    active = peak = 0
+
+    def request():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+
+    def worker(_):
+        # Each outer worker fans out again, like map calls inside build_index
+        with ThreadPoolExecutor(max_workers=3) as inner:
+            list(inner.map(lambda _: call_with_backoff(request, limiter), range(3)))
+
+    with ThreadPoolExecutor(max_workers=3) as outer:
+        list(outer.map(worker, range(3)))
+    assert peak == 3
@@ -0,0 +1,66 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for the lazy model registry and cheap entry point imports."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from indexing.registry import LazyResource
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_lazy_resource_builds_once_across_threads():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    resource = LazyResource("thing", factory)
+    assert not resource.loaded
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(resource.get()))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    resource.release()
+    assert not resource.loaded
+    resource.get()
+    assert len(calls) == 2
+
+
+def test_cli_import_is_cheap_and_skips_heavy_modules():
+    probe = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import core.cli, indexing.index_manager\n"
+        "elapsed = time.perf_counter() - start\n"
+        "heavy = [m for m in ('torch', 'sentence_transformers', 'openai') if m in sys.modules]\n"
+        "print(json.dumps({'seconds': elapsed, 'heavy': heavy}))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result["heavy"] == []
+    assert result["seconds"] < 1.0
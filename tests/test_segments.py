@@ -0,0 +1,138 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for structured transcript segment sidecars."""
+
+import pytest
+
+from indexing.segments import (
+    low_confidence_regions,
+    merge_tiers,
+    ms_to_timestamp,
+    read_segments,
+    segments_from_whisper,
+    segments_path_for,
+    timestamp_to_ms,
+    write_segments,
+    write_srt,
+)
+from indexing.srt_parser import (
+    load_segments,
+    load_srt_text,
+    parse_srt_with_timestamps,
+)
+
+
+def test_timestamp_roundtrip():
+    assert ms_to_timestamp(83456) == "00:01:23,456"
+    assert timestamp_to_ms("01:00:00,001") == 3_600_001
+    assert timestamp_to_ms(ms_to_timestamp(4_567_890)) == 4_567_890
+
+
+def test_segments_from_whisper_skips_blank_and_scores_confidence():
+    result = {
+        "segments": [
+            {"start": 0.0, "end": 1.5, "text": " Hello ", "avg_logprob": 0.0},
+            {"start": 1.5, "end": 2.0, "text": "   ", "avg_logprob": -0.1},
+            {"start": 2.0, "end": 3.25, "text": "Ruck", "avg_logprob": -0.5},
+        ]
+    }
+    segs = segments_from_whisper(result)
+    assert [s["text"] for s in segs] == ["Hello", "Ruck"]
+    assert segs[0]["start_ms"] == 0 and segs[0]["end_ms"] == 1500
+    assert segs[0]["confidence"] == 1.0
+    assert 0.6 < segs[1]["confidence"] < 0.61
+
+
+def test_loaders_prefer_sidecar(tmp_path):
+    srt = tmp_path / "clip.srt"
+    # SRT deliberately disagrees with the sidecar to prove which one is read
+    srt.write_text("1\n00:00:00,000 --> 00:00:01,000\nfrom srt\n", encoding="utf-8")
+    segs = [{"start_ms": 0, "end_ms": 1200, "text": "from sidecar", "confidence": 0.9}]
+    write_segments(segs, segments_path_for(str(srt)))
+
+    assert load_segments(str(srt)) == segs
+    assert load_srt_text(str(srt)) == "from sidecar"
+    parsed = parse_srt_with_timestamps(str(srt))
+    assert parsed[0]["end_time"] == "00:00:01,200"
+    assert parsed[0]["duration"] == pytest.approx(1.2)
+
+
+def test_load_segments_falls_back_to_srt(tmp_path):
+    srt = tmp_path / "clip.srt"
+    write_srt(
+        [
+            {"start_ms": 0, "end_ms": 2000, "text": "one"},
+            {"start_ms": 2000, "end_ms": 3500, "text": "two"},
+        ],
+        str(srt),
+    )
+    segs = load_segments(str(srt))
+    assert [(s["start_ms"], s["end_ms"], s["text"]) for s in segs] == [
+        (0, 2000, "one"),
+        (2000, 3500, "two"),
+    ]
+    assert segs[0]["confidence"] is None
+
+
+def test_read_segments_rejects_unknown_version(tmp_path):
+    p = tmp_path / "x.segments.json"
+    p.write_text('{"version": 99, "segments": []}', encoding="utf-8")
+    with pytest.raises(ValueError, match="Unsupported segments version"):
+        read_segments(str(p))
+
+
+def test_low_confidence_regions_flags_and_merges():
+    result = {
+        "segments": [
+            {"start": 0.0, "end": 1.0, "avg_logprob": -0.2},
+            {"start": 1.0, "end": 2.0, "avg_logprob": -1.5},
+            {"start": 2.0, "end": 3.0, "no_speech_prob": 0.9},
+            {"start": 5.0, "end": 6.0, "compression_ratio": 3.1},
+        ]
+    }
+    regions = low_confidence_regions(
+        result,
+        min_avg_logprob=-1.0,
+        max_no_speech_prob=0.6,
+        max_compression_ratio=2.4,
+        padding_ms=100,
+    )
+    assert regions == [(900, 3100), (4900, 6100)]
+
+
+def test_merge_tiers_replaces_region_and_keeps_rest():
+    base = [
+        {"start_ms": 0, "end_ms": 1000, "text": "keep", "tier": 1},
+        {"start_ms": 1000, "end_ms": 2000, "text": "bad", "tier": 1},
+    ]
+    replacement = [{"start_ms": 900, "end_ms": 2100, "text": "good", "tier": 2}]
+    merged = merge_tiers(base, (1000, 2000), replacement)
+    assert [(s["text"], s["tier"]) for s in merged] == [("keep", 1), ("good", 2)]
+    assert (merged[1]["start_ms"], merged[1]["end_ms"]) == (1000, 2000)
+    # An empty second pass never loses the tier-1 text
+    assert merge_tiers(base, (1000, 2000), []) == base
+
+
+def test_merge_tiers_trims_padded_region_to_replaced_segments():
+    base = [
+        {"start_ms": 0, "end_ms": 2000, "text": "a", "tier": 1},
+        {"start_ms": 2000, "end_ms": 4000, "text": "b", "tier": 1},
+        {"start_ms": 4000, "end_ms": 6000, "text": "c", "tier": 1},
+    ]
+    # Region of "b" padded by 250 ms; the refinement also re-hears the padding
+    replacement = [
+        {"start_ms": 1750, "end_ms": 1950, "text": "end of a", "tier": 2},
+        {"start_ms": 1950, "end_ms": 4050, "text": "better b", "tier": 2},
+        {"start_ms": 4050, "end_ms": 4250, "text": "start of c", "tier": 2},
+    ]
+    merged = merge_tiers(base, (1750, 4250), replacement)
+    assert [(s["text"], s["start_ms"], s["end_ms"]) for s in merged] == [
+        ("a", 0, 2000),
+        ("better b", 2000, 4000),
+        ("c", 4000, 6000),
+    ]
+    # Only padding was re-transcribed: nothing to replace
+    assert merge_tiers(base, (1750, 4250), replacement[:1]) == base
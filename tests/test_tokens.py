@@ -0,0 +1,28 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests for indexing.tokens counting and chunking helpers."""
+
+from indexing.tokens import chunk_texts, estimate_tokens, group_by_tokens
+
+
+def test_estimate_tokens_empty_and_positive():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("ruck") >= 1
+
+
+def test_group_by_tokens_preserves_order_and_budget():
+    texts = [f"word{i} " * 5 for i in range(10)]
+    budget = estimate_tokens(texts[0]) * 3 + 3
+    groups = group_by_tokens(texts, budget)
+    assert [t for g in groups for t in g] == texts
+    assert all(sum(estimate_tokens(t) + 1 for t in g) <= budget for g in groups)
+    assert len(groups) > 1
+
+
+def test_group_by_tokens_oversized_text_is_its_own_group():
+    big = "scrum " * 200
+    assert group_by_tokens(["a", big, "b"], 10) == [["a"], [big], ["b"]]
+    assert chunk_texts(["a", "b"], 100) == ["a b"]
@@ -0,0 +1,37 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+import struct
+
+import numpy as np
+import pytest
+
+from indexing.vector_copy import encode_vector, register_vector_copy
+
+
+def test_encode_vector_matches_pgvector_binary_layout():
+    data = encode_vector([1.0, -0.5, 0.25])
+    assert struct.unpack("!HH3f", data) == (3, 0, 1.0, -0.5, 0.25)
+    assert encode_vector(np.array([0.5], dtype=np.float64)) == struct.pack(
+        "!HHf", 1, 0, 0.5
+    )
+
+
+def test_encode_vector_rejects_matrices():
+    with pytest.raises(ValueError, match="1-D"):
+        encode_vector([[1.0], [2.0]])
+
+
+def test_binary_copy_round_trip(pg_conn):
+    embeddings = [[0.6, 0.8, 0.0], np.array([0.0, 0.0, 1.0], dtype=np.float32)]
+    with pg_conn.cursor() as cur:
+        oid = register_vector_copy(cur)
+        cur.execute("CREATE TEMP TABLE stage (id INT, embedding VECTOR(3))")
+        with cur.copy("COPY stage (id, embedding) FROM STDIN (FORMAT BINARY)") as copy:
+            copy.set_types(["int4", oid])
+            for i, embedding in enumerate(embeddings):
+                copy.write_row((i, embedding))
+        cur.execute("SELECT embedding::text FROM stage ORDER BY id")
+        assert [row[0] for row in cur.fetchall()] == ["[0.6,0.8,0]", "[0,0,1]"]
@@ -0,0 +1,86 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+"""Tests that search queries use the distance operator of the vector index."""
+
+from unittest.mock import MagicMock, patch
+
+import psycopg
+import pytest
+
+from indexing import index_manager
+from indexing.vector_metric import DISTANCE_OPERATORS, distance_operator, vector_ops
+
+
+@pytest.mark.parametrize("ops,operator", list(DISTANCE_OPERATORS.items()))
+def test_operator_follows_vector_ops(monkeypatch, ops, operator):
+    monkeypatch.setenv("VECTOR_OPS", ops)
+    assert vector_ops() == ops
+    assert distance_operator() == operator
+    assert f"embedding {operator} %s::vector" in index_manager.nearest_sql(
+        "videos", "id"
+    )
+
+
+def test_unknown_vector_ops_falls_back_to_cosine(monkeypatch):
+    monkeypatch.setenv("VECTOR_OPS", "vector_hamming_ops")
+    assert vector_ops() == "vector_cosine_ops"
+    assert distance_operator() == "<=>"
+
+
+@patch("indexing.index_manager.connection")
+@patch("indexing.index_manager.get_embedding_model")
+def test_query_videos_orders_by_configured_operator(
+    mock_vector_model, mock_connection, monkeypatch
+):
+    monkeypatch.setenv("VECTOR_OPS", "vector_ip_ops")
+    mock_vector_model.return_value.encode.return_value = MagicMock(
+        tolist=MagicMock(return_value=[0.6, 0.8])
+    )
+    conn = mock_connection.return_value.__enter__.return_value
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = []
+    with patch("indexing.index_manager.query_cache", MagicMock(get=lambda key: None)):
+        index_manager.query_videos("ruck", result_limit=3)
+    sql = cursor.execute.call_args[0][0]
+    assert "ORDER BY embedding <#> %s::vector" in sql
+
+
+def _explain(conn, ops: str, operator_ops: str) -> str:
+    """Plan of the search query (with ``operator_ops``'s operator) against a
+    temporary ``videos`` table indexed with ``ops``."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "CREATE TEMP TABLE videos (id BIGINT, summary TEXT, path TEXT, "
+            "embedding VECTOR(3)) ON COMMIT DROP"
+        )
+        cur.execute(
+            "INSERT INTO videos SELECT i, 's', 'p' || i, "
+            "ARRAY[cos(i), sin(i), 0.5]::vector FROM generate_series(1, 500) i"
+        )
+        cur.execute(
+            f"CREATE INDEX videos_embedding_ivfflat ON videos "
+            f"USING ivfflat (embedding {ops}) WITH (lists = 4)"
+        )
+        cur.execute("ANALYZE videos")
+        # Make any usable index cheaper than a sequential scan
+        cur.execute("SET LOCAL enable_seqscan = off")
+    with patch.dict("os.environ", {"VECTOR_OPS": operator_ops}):
+        sql = index_manager.nearest_sql("videos", "id, summary, path")
+    with psycopg.ClientCursor(conn) as cur:
+        cur.execute("EXPLAIN " + sql, ([1.0, 0.0, 0.5], 5))
+        plan = "\n".join(row[0] for row in cur.fetchall())
+    conn.rollback()
+    return plan
+
+
+@pytest.mark.parametrize("ops", list(DISTANCE_OPERATORS))
+def test_explain_search_uses_ivfflat_index(pg_conn, ops):
+    assert "Index Scan using videos_embedding_ivfflat" in _explain(pg_conn, ops, ops)
+
+
+def test_explain_mismatched_operator_cannot_use_index(pg_conn):
+    plan = _explain(pg_conn, "vector_cosine_ops", "vector_l2_ops")
+    assert "videos_embedding_ivfflat" not in plan
@@ -0,0 +1,123 @@
+# Copyright (c) 2025 Biasware LLC
+# Proprietary and Confidential. All Rights Reserved.
+# This file is the sole property of Biasware LLC.
+# Unauthorized use, distribution, or reverse engineering is prohibited.
+
+import hashlib
+import subprocess
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from indexing import video_metadata
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("tuesday_session_08_06_2025_mp4", (date(2025, 8, 6), "tuesday_session")),
+        ("Saturday-Match-1-9-2024", (date(2024, 1, 9), "saturday-match")),
+        ("2025_08_06", (date(2025, 8, 6), None)),
+        ("contact_2025-08-06_cam2", (date(2025, 8, 6), "contact")),
+        ("M2U00030", (None, None)),
+        ("session_13_40_2025", (None, None)),
+        ("clip_120_2025", (None, None)),
+    ],
+)
+def test_parse_session_name(name, expected):
+    assert video_metadata.parse_session_name(name) == expected
+
+
+def test_session_of_uses_nearest_dated_folder():
+    path = "/data/raw/videos/tuesday_session_08_06_2025_mp4/day2/M2U00030.mp4"
+    assert video_metadata.session_of(path) == (date(2025, 8, 6), "tuesday_session")
+    assert video_metadata.session_of("/videos/drills_2025_03_01.mp4") == (
+        date(2025, 3, 1),
+        "drills",
+    )
+
+
+@patch("indexing.video_metadata.probe_duration", return_value=2412.5)
+def test_video_metadata_probes_file(mock_probe, tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_MODEL", "BAAI/bge-small-en")
+    folder = tmp_path / "tuesday_session_08_06_2025_mp4"
+    folder.mkdir()
+    video = folder / "M2U00030.mp4"
+    video.write_bytes(b"\x00" * 3000)
+
+    meta = video_metadata.video_metadata(str(video), summary_model="gpt-4o-mini")
+
+    assert meta == {
+        "session_date": date(2025, 8, 6),
+        "session_type": "tuesday_session",
+        "source": "tuesday_session_08_06_2025_mp4",
+        "duration_s": 2412.5,
+        "file_size": 3000,
+        "content_hash": hashlib.sha256(b"3000:" + b"\x00" * 3000).hexdigest(),
+        "summary_model": "gpt-4o-mini",
+        "embedding_model": "BAAI/bge-small-en",
+    }
+    assert set(meta) == set(video_metadata.METADATA_COLUMNS)
+    mock_probe.assert_called_once_with(str(video))
+
+
+def test_content_hash_reads_only_both_ends_of_large_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_metadata, "FINGERPRINT_BYTES", 4)
+    video = tmp_path / "match.mp4"
+    video.write_bytes(b"head" + b"middle" + b"tail")
+    expected = hashlib.sha256(b"14:headtail").hexdigest()
+    assert video_metadata.content_hash(str(video)) == expected
+
+    video.write_bytes(b"head" + b"MIDDLE" + b"tail")
+    assert video_metadata.content_hash(str(video)) == expected
+    video.write_bytes(b"head" + b"middle!" + b"tail")
+    assert video_metadata.content_hash(str(video)) != expected
+
+
+@patch("indexing.video_metadata.probe_duration", return_value=60.0)
+def test_video_metadata_probes_each_file_version_once(mock_probe, tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"abc")
+    with patch(
+        "indexing.video_metadata.content_hash", wraps=video_metadata.content_hash
+    ) as mock_hash:
+        video_metadata.video_metadata(str(video))
+        video_metadata.video_metadata(str(video))
+        assert mock_hash.call_count == mock_probe.call_count == 1
+
+        video.write_bytes(b"abcd")  # new size: probed again
+        assert video_metadata.video_metadata(str(video))["file_size"] == 4
+        assert mock_hash.call_count == mock_probe.call_count == 2
+
+
+def test_video_metadata_of_missing_file_keeps_parsed_values(tmp_path):
+    meta = video_metadata.video_metadata(
+        str(tmp_path / "tuesday_session_08_06_2025_mp4" / "gone.mp4")
+    )
+    assert meta["session_date"] == date(2025, 8, 6)
+    assert meta["file_size"] is meta["content_hash"] is meta["duration_s"] is None
+
+
+@patch("indexing.video_metadata.subprocess.run")
+def test_probe_duration(mock_run):
+    mock_run.return_value.stdout = "61.440000\n"
+    assert video_metadata.probe_duration("a.mp4") == 61.44
+    mock_run.side_effect = FileNotFoundError("ffprobe")
+    assert video_metadata.probe_duration("a.mp4") is None
+    mock_run.side_effect = subprocess.CalledProcessError(1, "ffprobe")
+    assert video_metadata.probe_duration("a.mp4") is None
+
+
+@patch("indexing.video_metadata.probe_duration", return_value=None)
+def test_describe_videos_dedupes_paths(mock_probe, tmp_path):
+    videos = [tmp_path / "a.mp4", tmp_path / "b.mp4"]
+    for v in videos:
+        v.write_bytes(v.name.encode())
+    paths = [str(videos[0]), str(videos[1]), str(videos[0])]
+
+    described = video_metadata.describe_videos(paths, summary_model="m")
+
+    assert list(described) == [str(videos[0]), str(videos[1])]
+    assert described[str(videos[1])]["file_size"] == 5
+    assert mock_probe.call_count == 2